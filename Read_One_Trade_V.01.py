@@ -1,52 +1,21 @@
 # === IMPOR LIBRARY ===
+# Hanya library ringan yang diimpor sebelum tampilan pertama; pandas, Plotly,
+# Pillow, PyAutoGUI dan modul lokal dimuat setelah judul & sidebar tergambar.
 import os
-import platform
-import logging
 import time
-import threading
 import base64
+import logging
+import platform
+import threading
+import importlib.util
 from io import BytesIO
 from datetime import datetime, timedelta
-import csv
-from PIL import Image, ImageDraw
 
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
-import schedule
 
-requests = None
-try:
-    import requests
-except ImportError:
-    st.error("Library 'requests' tidak ditemukan. Harap install library tersebut.")
-    st.stop()
+from utils.metrics import metrics, timed, start_metrics_server
 
-pyautogui = None
-ImageGrab = None
-if platform.system() in ["Windows", "Darwin"] or os.environ.get('DISPLAY'):
-    try:
-        import pyautogui
-        from PIL import ImageGrab
-    except ImportError:
-        logging.warning("PyAutoGUI atau Pillow (ImageGrab) tidak dapat diimpor. Fungsi screenshot mungkin tidak tersedia.")
-        pyautogui = None
-        ImageGrab = None
-else:
-    logging.info("PyAutoGUI dan ImageGrab tidak diimpor karena tidak ada lingkungan display atau bukan Windows/Darwin.")
-
-try:
-    from modules.indodax_api import (get_indodax_summary, get_trade_volume,
-                                     load_indodax_pairs, get_candlestick_data,
-                                     fetch_all_tickers)
-    from modules.indicators import apply_indicators
-    from modules.telegram_bot import send_telegram_message, send_telegram_photo
-    from modules.signal_engine import scan_signals
-    from utils.helpers import get_top_movers
-except ImportError as e:
-    st.error(f"Gagal mengimpor modul lokal: {e}. Pastikan struktur folder dan file sudah benar.")
-    logging.error(f"ImportError modul lokal: {e}", exc_info=True)
-    st.stop()
+RERUN_STARTED = time.perf_counter()
 
 # === KONFIGURASI AWAL & STATE ===
 st.set_page_config(layout="wide", page_title="Read ONE Trade", page_icon="📈")
@@ -55,19 +24,109 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 default_session_keys = {
-    "SENT_SIGNALS": [],
     "TRADE_HISTORY": [],
     "USER_LOGGED_IN": False,
     "CURRENT_PAGE": "Home",
-    "startup_notified": False,
-    "auto_scan_started": False,
-    "last_screenshot_time": None
 }
 
 for key, default_value in default_session_keys.items():
     if key not in st.session_state:
         st.session_state[key] = default_value
 
+# === load_logo ===
+LOGO_CACHE_PATH = os.path.join("data", "cache", "logo_240.png")
+LOGO_CACHE_SIZE = 240  # piksel, 2x lebar tampilan terbesar (sidebar 120px)
+
+# Versi kecil logo disimpan di disk sehingga Pillow hanya dipakai jika salinan belum ada
+# atau logo.png berubah; di dalam proses hasilnya di-cache, bukan di-encode ulang tiap rerun.
+@st.cache_resource
+def load_logo(logo_path="logo.png", cache_path=LOGO_CACHE_PATH, size=LOGO_CACHE_SIZE):
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(logo_path):
+            with open(cache_path, "rb") as f:
+                logo_bytes = f.read()
+            return logo_bytes, base64.b64encode(logo_bytes).decode()
+    except OSError:
+        pass
+
+    from PIL import Image, ImageDraw
+    logo_img = None
+    if os.path.exists(logo_path):
+        try:
+            logo_img = Image.open(logo_path)
+            if logo_img.mode not in ("RGB", "RGBA"):
+                logo_img = logo_img.convert("RGB")
+            logo_img.thumbnail((size, size))
+        except Exception as e:
+            logo_img = None
+            logger.warning(f"Gagal memuat logo dari file '{logo_path}': {e}. Menggunakan logo default.")
+    else:
+        logger.warning(f"File logo '{logo_path}' tidak ditemukan. Menggunakan logo default.")
+
+    is_default = logo_img is None
+    if is_default:
+        logo_img = Image.new("RGB", (100, 100), color="gray")
+        try:
+            draw = ImageDraw.Draw(logo_img)
+            draw.text((15, 40), "LOGO", fill="white")
+        except Exception as e:
+             logger.warning(f"Gagal menggambar teks pada logo default: {e}")
+
+    buffered = BytesIO()
+    logo_img.save(buffered, format="PNG")
+    logo_bytes = buffered.getvalue()
+    if not is_default:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path + ".tmp", "wb") as f:
+                f.write(logo_bytes)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan salinan logo ke '{cache_path}': {e}")
+    return logo_bytes, base64.b64encode(logo_bytes).decode()
+
+# === LOGO DAN JUDUL ===
+# Digambar sebelum impor modul berat dan sebelum panggilan jaringan apa pun (first paint).
+APP_LOGO, base64_logo = load_logo()
+st.markdown(
+    f"""
+    <div style="display: flex; align-items: center; margin-bottom: 20px;">
+        <img src="data:image/png;base64,{base64_logo}" width="50" style="margin-right:15px; border-radius: 5px;">
+        <h1 style="display:inline; vertical-align: middle;">Read ONE Trade</h1>
+    </div>
+    """,
+    unsafe_allow_html=True
+)
+st.sidebar.image(APP_LOGO, width=120)
+st.sidebar.header("Pengaturan Utama")
+metrics.observe("ui.first_paint", time.perf_counter() - RERUN_STARTED)
+
+# === IMPOR MODUL LOKAL ===
+if importlib.util.find_spec("requests") is None:
+    st.error("Library 'requests' tidak ditemukan. Harap install library tersebut.")
+    st.stop()
+
+try:
+    with timed("ui.imports"):
+        import pandas as pd
+        from modules.indodax_api import (get_indodax_summary, get_trade_volume,
+                                         load_indodax_pairs, load_indodax_pairs_cached,
+                                         get_candlestick_data, fetch_all_tickers)
+        from modules.indicators import apply_indicators, apply_indicators_incremental
+        from modules.telegram_bot import send_telegram_photo, enqueue_telegram_message
+        from modules.signal_engine import scan_signals
+        from modules.scanner import run_scan_pass
+        from modules.signal_store import get_signal_store
+        from modules.scheduler import get_scheduler
+        from modules.charts import (candlestick_figure, technical_figure, prepare_candlestick_data,
+                                    build_candlestick_figure, apply_live_bars)
+        from modules.live_feed import create_live_feed, bar_from_row
+        from utils.helpers import get_top_movers, format_price, build_market_table, style_market_table
+except ImportError as e:
+    st.error(f"Gagal mengimpor modul lokal: {e}. Pastikan struktur folder dan file sudah benar.")
+    logging.error(f"ImportError modul lokal: {e}", exc_info=True)
+    st.stop()
+
 # === get_app_config ===
 def get_app_config():
     try:
@@ -87,46 +146,58 @@ APP_CONFIG = get_app_config()
 TELEGRAM_TOKEN = APP_CONFIG["telegram_token"]
 TELEGRAM_CHAT_ID = APP_CONFIG["telegram_chat_id"]
 
-# === FUNGSI PEMBANTU ===
-
-# === format_price ===
-def format_price(price, pair_symbol):
-    try:
-        price = float(price)
-        pair_symbol = str(pair_symbol).lower()
-        if any(currency in pair_symbol for currency in ["usdt", "usdc", "usd"]):
-            return f"{price:,.8f}"
-        elif "idr" in pair_symbol:
-            return f"{price:,.0f}" if price >= 1 else f"{price:,.6f}"
-        else:
-            return f"{price:,.2f}"
-    except (ValueError, TypeError):
-        return str(price)
+# === KONFIGURASI SCHEDULER & AUTO-SCAN ===
+AUTO_SCAN_JOB = "auto_scan"
+SCREENSHOT_JOB = "periodic_screenshot"
+SCREENSHOT_INTERVAL_MAP = {
+    "Nonaktif": 0, "15 Menit": 900, "30 Menit": 1800, "1 Jam": 3600,
+    "2 Jam": 7200, "4 Jam": 14400
+}
+AUTO_SCAN_MAX_WORKERS = int(st.secrets.get("auto_scan_max_workers", 8))
+AUTO_SCAN_PAIR_TIMEOUT = float(st.secrets.get("auto_scan_pair_timeout", 30))
+AUTO_SCAN_INTERVAL_SECONDS = 3600
+RUN_EMBEDDED_SCANNER = bool(st.secrets.get("run_embedded_scanner", True))
+METRICS_JOB = "metrics_file"
+METRICS_PORT = st.secrets.get("metrics_port")  # opsional: endpoint Prometheus /metrics
+METRICS_FILE = st.secrets.get("metrics_file")  # opsional: file teks Prometheus untuk textfile collector
+METRICS_FILE_INTERVAL_SECONDS = 60
+SIGNAL_TABLE_ROWS = 5  # bar terakhir yang ditampilkan di tabel sinyal pair terpilih
+CANDLE_HISTORY_LIMIT = 500  # jumlah candle maksimum dari trade store lokal untuk chart & sinyal
+# Panjang riwayat chart; di atas lebar piksel chart, candle & garis di-downsample di server.
+CHART_HISTORY_OPTIONS = {"500 Bar": 500, "5.000 Bar": 5_000, "20.000 Bar": 20_000, "50.000 Bar": 50_000}
+# Interval refresh otomatis (detik) per bagian halaman; 0 = hanya saat interaksi/rerun penuh.
+SECTION_REFRESH_SECONDS = {
+    "pair_summary": 15,
+    "candle_chart": 60,
+    "signals": 60,
+    "global_market": 30,
+    "top_movers": 30,
+    **{k: int(v) for k, v in st.secrets.get("section_refresh_seconds", {}).items()},
+}
+# Mode live: harga & candle terakhir dari feed background, diperbarui di tempat tiap LIVE_REFRESH_SECONDS.
+LIVE_REFRESH_SECONDS = float(st.secrets.get("live_refresh_seconds", 0.5))
+LIVE_FEED_KIND = st.secrets.get("live_feed", "polling")  # "polling" (API Indodax) atau "replay" (file trades lokal)
+LIVE_REPLAY_FILE = st.secrets.get("live_replay_file", os.path.join("benchmarks", "fixtures", "btc_idr_trades.json"))
+LIVE_REPLAY_SPEED = float(st.secrets.get("live_replay_speed", 1.0))
 
-# === load_logo ===
-def load_logo(logo_path="logo.png"):
-    if os.path.exists(logo_path):
-        try:
-            logo_img = Image.open(logo_path)
-            if logo_img.mode not in ("RGB", "RGBA"):
-                logo_img = logo_img.convert("RGB")
-            return logo_img
-        except Exception as e:
-            logger.warning(f"Gagal memuat logo dari file '{logo_path}': {e}. Menggunakan logo default.")
-    else:
-        logger.warning(f"File logo '{logo_path}' tidak ditemukan. Menggunakan logo default.")
+# === FUNGSI PEMBANTU ===
 
-    default_logo = Image.new("RGB", (100, 100), color="gray")
+# === load_image_grab ===
+# PyAutoGUI/ImageGrab baru diimpor saat screenshot pertama diambil, bukan saat startup.
+def load_image_grab():
+    if not (platform.system() in ["Windows", "Darwin"] or os.environ.get('DISPLAY')):
+        return None
     try:
-        draw = ImageDraw.Draw(default_logo)
-        draw.text((15, 40), "LOGO", fill="white")
-    except Exception as e:
-         logger.warning(f"Gagal menggambar teks pada logo default: {e}")
-
-    return default_logo
+        import pyautogui  # noqa: F401
+        from PIL import ImageGrab
+        return ImageGrab
+    except ImportError:
+        logger.warning("PyAutoGUI atau Pillow (ImageGrab) tidak dapat diimpor. Fungsi screenshot mungkin tidak tersedia.")
+        return None
 
 # === take_and_send_screenshot ===
 def take_and_send_screenshot(filepath="ui_screenshot.png", caption=""):
+    ImageGrab = load_image_grab()
     if ImageGrab:
         try:
             ss = ImageGrab.grab()
@@ -140,53 +211,22 @@ def take_and_send_screenshot(filepath="ui_screenshot.png", caption=""):
         logger.info("📸 Screenshot dinonaktifkan (ImageGrab tidak tersedia).")
 
 # === periodic_screenshot_job ===
-def periodic_screenshot_job(interval_seconds):
+def periodic_screenshot_job():
     now = datetime.now()
-    if interval_seconds > 0:
-        if st.session_state.last_screenshot_time is None or \
-           (now - st.session_state.last_screenshot_time).total_seconds() >= interval_seconds:
-            take_and_send_screenshot(caption=f"Periodic UI Screenshot ({now.strftime('%Y-%m-%d %H:%M:%S')})")
-            st.session_state.last_screenshot_time = now
-
-# === run_periodic_screenshot_scheduler ===
-def run_periodic_screenshot_scheduler(interval_seconds):
-    if interval_seconds > 0:
-        schedule.every(interval_seconds).seconds.do(periodic_screenshot_job, interval_seconds)
-        logger.info(f"Screenshot periodik diatur setiap {interval_seconds} detik.")
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
-    else:
-        logger.info("Screenshot periodik dinonaktifkan.")
+    take_and_send_screenshot(caption=f"Periodic UI Screenshot ({now.strftime('%Y-%m-%d %H:%M:%S')})")
 
 # === plot_technical_charts ===
 def plot_technical_charts(df, pair_symbol):
-    fig = go.Figure()
-    fig.add_trace(go.Candlestick(
-        x=df.index, open=df['open'], high=df['high'], low=df['low'], close=df['close'], name='Candlestick'
-    ))
-    if 'sma' in df.columns:
-        fig.add_trace(go.Scatter(x=df.index, y=df['sma'], name='SMA', line=dict(color='orange')))
-    if 'rsi' in df.columns:
-        fig.add_trace(go.Scatter(x=df.index, y=df['rsi'], name='RSI', yaxis='y2', line=dict(color='purple')))
-
-    fig.update_layout(
-        title=f'Analisis Teknikal {pair_symbol.upper()}',
-        yaxis_title='Harga',
-        yaxis2=dict(title='RSI', overlaying='y', side='right', showgrid=False),
-        xaxis_rangeslider_visible=False,
-        template="plotly_dark",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(technical_figure(df, pair_symbol), use_container_width=True)
 
 # === scan_selected_pair_signals ===
 def scan_selected_pair_signals(pair_symbol, candle_df, summary_data):
-    signals_df = scan_signals(pair_symbol, candle_df)
+    # Tabel hanya menampilkan SIGNAL_TABLE_ROWS bar terakhir (+1 bar sebelumnya untuk MACD cross);
+    # alert cukup mengevaluasi bar terakhir.
+    signals_df = scan_signals(pair_symbol, candle_df.iloc[-(SIGNAL_TABLE_ROWS + 1):]).tail(SIGNAL_TABLE_ROWS)
     if not signals_df.empty:
-        st.dataframe(signals_df.tail(5))
-        last_signal_info = signals_df.iloc[-1]
+        st.dataframe(signals_df)
+        last_signal_info = scan_signals(pair_symbol, candle_df, last_bar_only=True).iloc[-1]
 
         signal_messages = []
         if pd.notna(last_signal_info.get('macd_signal_label')) and last_signal_info.get('macd_signal_label'):
@@ -196,12 +236,11 @@ def scan_selected_pair_signals(pair_symbol, candle_df, summary_data):
 
         if signal_messages:
             current_signal_text = "; ".join(signal_messages)
-            signal_already_sent = any(
-                s['pair'] == pair_symbol and s['signal_text'] == current_signal_text
-                for s in st.session_state.SENT_SIGNALS
-            )
+            signal_store = get_signal_store()
+            signal_tf = st.session_state.get('signal_interval_tf')
+            candle_ts = candle_df['date'].iloc[-1] if 'date' in candle_df.columns else candle_df.index[-1]
 
-            if not signal_already_sent:
+            if signal_store.check_and_mark(pair_symbol, signal_tf, current_signal_text, candle_ts):
                 msg_parts = [
                     f"📢 Sinyal Terdeteksi pada {pair_symbol.upper()} ({st.session_state.get('signal_interval_display', 'N/A')})",
                     *signal_messages
@@ -211,129 +250,67 @@ def scan_selected_pair_signals(pair_symbol, candle_df, summary_data):
 
                 final_msg = "\n".join(msg_parts)
 
-                if send_telegram_message(final_msg, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID):
-                    st.success(f"Sinyal terkirim ke Telegram! 🚀\n{final_msg}")
-                    st.session_state.SENT_SIGNALS.append({
-                        'pair': pair_symbol,
-                        'signal_text': current_signal_text,
-                        'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
+                if enqueue_telegram_message(final_msg, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID):
+                    st.success(f"Sinyal masuk antrean pengiriman Telegram! 🚀\n{final_msg}")
                     with open("signal_logs.txt", "a", encoding="utf-8") as f:
                         f.write(f"{datetime.now()} - {pair_symbol} - {final_msg}\n")
                 else:
+                    signal_store.unmark(pair_symbol, signal_tf, current_signal_text, candle_ts)
                     st.error("Gagal mengirim sinyal ke Telegram.")
             else:
                 st.info(f"Sinyal '{current_signal_text}' untuk {pair_symbol.upper()} sudah pernah dikirim.")
     else:
         st.write("Tidak ada sinyal MACD/Volume Spike terdeteksi untuk pair ini.")
 
-# === generate_market_signal ===
-def generate_market_signal(buy_vol, sell_vol):
-    if buy_vol > sell_vol * 1.2: return "STRONG BUY"
-    if buy_vol > sell_vol: return "BUY"
-    if buy_vol == sell_vol: return "HOLD"
-    if sell_vol > buy_vol * 1.2: return "STRONG SELL"
-    return "SELL"
-
-# === get_position_suggestion ===
-def get_position_suggestion(signal):
-    if signal in ["STRONG BUY", "BUY"]: return "Pertimbangkan LONG"
-    if signal in ["STRONG SELL", "SELL"]: return "Pertimbangkan SHORT"
-    return "-"
-
-# === style_signal_column ===
-def style_signal_column(val):
-    color_map = {
-        "STRONG BUY": "background-color: green; color: white",
-        "BUY": "background-color: lightgreen; color: black",
-        "HOLD": "background-color: gray; color: white",
-        "SELL": "background-color: orange; color: black",
-        "STRONG SELL": "background-color: red; color: white"
-    }
-    return color_map.get(val, "")
-
 # === auto_scan_all_pairs_job ===
-def auto_scan_all_pairs_job(available_pairs):
-    logger.info("Memulai auto-scan semua pair...")
-    alerted_pairs_info = []
-    for p in available_pairs:
-        try:
-            df = get_candlestick_data(p, tf='1h', limit=100)
-            if df is not None and not df.empty:
-                df_with_indicators = apply_indicators(df.copy())
-                latest = df_with_indicators.iloc[-1]
-                alerts = []
-                if latest.get('rsi', 50) > 70: alerts.append(f"RSI Overbought ({latest['rsi']:.2f})")
-                elif latest.get('rsi', 50) < 30: alerts.append(f"RSI Oversold ({latest['rsi']:.2f})")
-
-                macd = latest.get('macd')
-                macd_signal = latest.get('macd_signal')
-                macd_hist = latest.get('macd_hist')
-                if macd is not None and macd_signal is not None and macd_hist is not None:
-                    prev_macd_hist = df_with_indicators['macd_hist'].iloc[-2] if len(df_with_indicators) > 1 else 0
-                    if macd > macd_signal and prev_macd_hist <= 0:
-                        alerts.append("MACD Bullish Crossover")
-                    elif macd < macd_signal and prev_macd_hist >= 0:
-                        alerts.append("MACD Bearish Crossover")
-
-                if alerts:
-                    signal_message = f"🚨 Sinyal Auto-Scan pada {p.upper()} (1H):\n" + "\n".join([f"- {a}" for a in alerts])
-                    send_telegram_message(signal_message, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
-                    alerted_pairs_info.append({'pair': p, 'signals': alerts, 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-                    logger.info(f"Sinyal auto-scan terdeteksi di {p.upper()}: {', '.join(alerts)}")
-        except Exception as e:
-            logger.warning(f"Error saat auto-scan pair {p}: {e}")
-            time.sleep(1)
+def auto_scan_all_pairs_job(available_pairs=None):
+    if available_pairs is None:
+        available_pairs = load_indodax_pairs()
+    return run_scan_pass(
+        available_pairs, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, tf='1h',
+        max_workers=AUTO_SCAN_MAX_WORKERS, pair_timeout=AUTO_SCAN_PAIR_TIMEOUT
+    )
 
-    if alerted_pairs_info:
-        try:
-            with open("auto_scan_log.csv", "a", newline='', encoding="utf-8") as f:
-                writer = csv.writer(f)
-                if f.tell() == 0:
-                    writer.writerow(["Timestamp", "Pair", "Detected Signals"])
-                for item in alerted_pairs_info:
-                    writer.writerow([item['timestamp'], item['pair'], ", ".join(item['signals'])])
-            logger.info(f"Hasil auto-scan disimpan ke auto_scan_log.csv. Sinyal pada: {', '.join([i['pair'] for i in alerted_pairs_info])}")
-        except IOError as e:
-            logger.error(f"Gagal menulis ke auto_scan_log.csv: {e}")
+# === start_background_services ===
+# Dijalankan sekali per proses (bukan per sesi browser): semua sesi berbagi scheduler yang sama.
+@st.cache_resource
+def start_background_services():
+    scheduler = get_scheduler()
+    if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
+        # Notifikasi startup lewat antrean/thread agar tidak menahan render halaman.
+        enqueue_telegram_message("✅ Sistem Read ONE Trade aktif dan berjalan Lancar!", TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
+        threading.Thread(target=take_and_send_screenshot, kwargs={"caption": "Tampilan Awal UI Aktif"},
+                         name="startup-screenshot", daemon=True).start()
+    # Jika auto-scan dijalankan oleh daemon terpisah (python -m modules.scanner), dashboard hanya menampilkan data.
+    if RUN_EMBEDDED_SCANNER:
+        scheduler.register(AUTO_SCAN_JOB, auto_scan_all_pairs_job, AUTO_SCAN_INTERVAL_SECONDS)
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+    if METRICS_FILE:
+        scheduler.register(METRICS_JOB, lambda: metrics.write_prometheus_file(METRICS_FILE), METRICS_FILE_INTERVAL_SECONDS)
+    return scheduler
+
+# === get_live_feed ===
+# Satu feed per proses; feed hanya mem-poll pair+timeframe yang sedang dibaca oleh sesi mana pun.
+@st.cache_resource
+def get_live_feed():
+    if LIVE_FEED_KIND == "replay":
+        return create_live_feed("replay", path=LIVE_REPLAY_FILE, speed=LIVE_REPLAY_SPEED)
+    return create_live_feed(LIVE_FEED_KIND)
+
+# === update_screenshot_job ===
+def update_screenshot_job():
+    interval_seconds = SCREENSHOT_INTERVAL_MAP[st.session_state.screenshot_interval_label_select]
+    scheduler = get_scheduler()
+    if interval_seconds > 0:
+        scheduler.register(SCREENSHOT_JOB, periodic_screenshot_job, interval_seconds)
     else:
-        logger.info("Auto-scan selesai: tidak ada sinyal baru yang signifikan terdeteksi.")
-    return alerted_pairs_info
-
-# === run_auto_scan_scheduler ===
-def run_auto_scan_scheduler(available_pairs):
-    schedule.every(1).hours.do(auto_scan_all_pairs_job, available_pairs)
-    logger.info("Auto-scan semua pair diatur untuk berjalan setiap jam.")
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+        scheduler.unregister(SCREENSHOT_JOB)
 
 # === TAMPILAN UI ===
 
-# === LOGO DAN JUDUL ===
-APP_LOGO = load_logo()
-if APP_LOGO:
-    buffered = BytesIO()
-    APP_LOGO.save(buffered, format="PNG")
-    base64_logo = base64.b64encode(buffered.getvalue()).decode()
-
-    st.markdown(
-        f"""
-        <div style="display: flex; align-items: center; margin-bottom: 20px;">
-            <img src="data:image/png;base64,{base64_logo}" width="50" style="margin-right:15px; border-radius: 5px;">
-            <h1 style="display:inline; vertical-align: middle;">Read ONE Trade</h1>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-else:
-    st.title("Read ONE Trade")
-
 # === SIDEBAR ===
-st.sidebar.image(APP_LOGO, width=120)
-st.sidebar.header("Pengaturan Utama")
-
-available_pairs = load_indodax_pairs()
+available_pairs = load_indodax_pairs_cached()
 if not available_pairs:
     st.error("Gagal mengambil daftar pair dari Indodax API. Aplikasi tidak dapat melanjutkan.")
     logger.error("Gagal memuat daftar pair Indodax.")
@@ -377,54 +354,98 @@ with st.sidebar.expander("⏱️ Pengaturan Sinyal Pair Terpilih", expanded=Fals
     st.session_state.signal_interval_display = selected_signal_interval_display
 
     if st.button("🔄 Reset Sinyal Terkirim", key="reset_sent_signals_button"):
-        st.session_state.SENT_SIGNALS = []
+        get_signal_store().clear()
         st.success("✅ Daftar sinyal yang sudah terkirim berhasil di-reset.")
 
+# === Sidebar Mode Live ===
+live_mode = st.sidebar.toggle(
+    "⚡ Mode Live", value=False, key="live_mode",
+    help="Harga dan candle terakhir diperbarui di tempat setiap beberapa ratus milidetik tanpa memuat ulang halaman."
+)
+live_feed = get_live_feed() if live_mode else None
+
+# === SCHEDULER BACKGROUND (SATU PER PROSES) ===
+background_scheduler = start_background_services()
+
 # === Sidebar Pengaturan Screenshot Periodik ===
 with st.sidebar.expander("🖼️ Pengaturan Screenshot Periodik", expanded=False):
-    screenshot_interval_map = {
-        "Nonaktif": 0, "15 Menit": 900, "30 Menit": 1800, "1 Jam": 3600,
-        "2 Jam": 7200, "4 Jam": 14400
-    }
-    selected_screenshot_interval_label = st.selectbox(
+    # Pengaturan ini berlaku untuk scheduler bersama; nilai awal mengikuti job yang sedang aktif.
+    screenshot_labels = list(SCREENSHOT_INTERVAL_MAP.keys())
+    active_screenshot_interval = background_scheduler.get_interval(SCREENSHOT_JOB)
+    st.selectbox(
         "Interval Screenshot ke Telegram",
-        options=list(screenshot_interval_map.keys()),
-        index=0,
-        key="screenshot_interval_label_select"
+        options=screenshot_labels,
+        index=list(SCREENSHOT_INTERVAL_MAP.values()).index(active_screenshot_interval)
+        if active_screenshot_interval in SCREENSHOT_INTERVAL_MAP.values() else 0,
+        key="screenshot_interval_label_select",
+        on_change=update_screenshot_job
     )
-    st.session_state.screenshot_interval_seconds = screenshot_interval_map[selected_screenshot_interval_label]
 
-st.sidebar.info(f"Versi Aplikasi: 1.0.0 | Terakhir update: {datetime.now().strftime('%Y-%m-%d')}")
+# === Sidebar Status Scheduler ===
+@st.fragment
+def render_scheduler_status(scheduler):
+    if not st.toggle("🕒 Status Scheduler Background", value=False, key="show_scheduler_status"):
+        return
+    scheduler_status = scheduler.status()
+    if scheduler_status:
+        st.dataframe(pd.DataFrame(scheduler_status).set_index("job"), use_container_width=True)
+    else:
+        st.info("Belum ada job terdaftar.")
+    if st.button("▶️ Jalankan Auto-Scan Sekarang", key="run_auto_scan_now"):
+        scheduler.run_now(AUTO_SCAN_JOB)
+        st.success("Auto-scan dijadwalkan untuk segera berjalan.")
 
-# === NOTIFIKASI STARTUP & INISIALISASI THREAD ===
-if not st.session_state.startup_notified:
-    if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-        send_telegram_message("✅ Sistem Read ONE Trade aktif dan berjalan Lancar!", TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
-        take_and_send_screenshot(caption="Tampilan Awal UI Aktif")
-    st.session_state.startup_notified = True
-
-if 'screenshot_thread' not in st.session_state and st.session_state.screenshot_interval_seconds > 0:
-    screenshot_thread = threading.Thread(
-        target=run_periodic_screenshot_scheduler,
-        args=(st.session_state.screenshot_interval_seconds,),
-        daemon=True
-    )
-    screenshot_thread.start()
-    st.session_state.screenshot_thread = screenshot_thread
-    logger.info("Thread untuk screenshot periodik dimulai.")
+with st.sidebar:
+    render_scheduler_status(background_scheduler)
 
-if not st.session_state.auto_scan_started:
-    auto_scan_thread = threading.Thread(target=run_auto_scan_scheduler, args=(available_pairs,), daemon=True)
-    auto_scan_thread.start()
-    st.session_state.auto_scan_started = True
-    logger.info("Thread untuk auto-scan semua pair dimulai.")
+st.sidebar.info(f"Versi Aplikasi: 1.0.0 | Terakhir update: {datetime.now().strftime('%Y-%m-%d')}")
 
 # === KONTEN UTAMA ===
+# Setiap bagian adalah st.fragment: interaksi di dalamnya (mis. ukuran chart) hanya
+# menjalankan ulang bagian itu, dan tiap bagian memuat datanya sendiri dengan interval
+# refresh masing-masing. Toggle menggantikan expander karena isi expander yang tertutup
+# tetap dieksekusi; bagian yang dimatikan tidak menghitung apa pun.
 st.subheader(f"Analisis Pair: {selected_pair.upper()}")
 
+# === load_pair_candles ===
+def load_pair_candles(pair, tf, limit=CANDLE_HISTORY_LIMIT):
+    candle_df = get_candlestick_data(pair, tf=tf, limit=limit, history=True)
+    if candle_df.empty:
+        return None
+    return apply_indicators_incremental(candle_df, pair, tf)
+
+# === load_live_chart_history ===
+# Mode live: riwayat candle + indikator dan data chart hasil downsampling disimpan per sesi dan
+# hanya dimuat ulang tiap SECTION_REFRESH_SECONDS["candle_chart"]; tiap tick cukup menerapkan delta dari feed.
+def load_live_chart_history(pair, tf, limit):
+    key = (pair, tf, limit)
+    refresh_seconds = SECTION_REFRESH_SECONDS["candle_chart"]
+    cached = st.session_state.get("live_chart_history")
+    if cached is None or cached["key"] != key or (refresh_seconds and time.monotonic() - cached["loaded_at"] > refresh_seconds):
+        candle_df = load_pair_candles(pair, tf, limit=limit)
+        cached = {"key": key, "loaded_at": time.monotonic(), "df": candle_df, "data": None, "last_bar": None}
+        if candle_df is not None:
+            # Bar terakhir masih terbentuk: disiapkan terpisah dan digantikan versi terbaru dari feed.
+            cached["data"] = prepare_candlestick_data(candle_df.iloc[:-1])
+            cached["last_bar"] = bar_from_row(candle_df.iloc[-1])
+        st.session_state.live_chart_history = cached
+    return cached
+
 # === INFORMASI PAIR SAAT INI ===
-with st.expander("📊 Informasi Pair Saat Ini", expanded=True):
-    summary_data = get_indodax_summary(selected_pair)
+@st.fragment(run_every=LIVE_REFRESH_SECONDS if live_mode else SECTION_REFRESH_SECONDS["pair_summary"] or None)
+def render_pair_summary(pair, tf, feed=None):
+    if not st.toggle("📊 Informasi Pair Saat Ini", value=True, key="show_pair_summary"):
+        return
+    with timed("ui.pair_info"):
+        # Ringkasan 24 jam tetap dari cache TTL ticker; di mode live harga terakhir datang dari feed.
+        summary_data = get_indodax_summary(pair)
+        if feed is not None:
+            feed.subscribe(pair, tf)
+            live = feed.latest(pair, tf)
+            if summary_data and live and live["price"] is not None:
+                summary_data = {**summary_data, "last": live["price"],
+                                "high": max(summary_data.get('high', 0), live["price"]),
+                                "low": min(summary_data.get('low', 0) or live["price"], live["price"])}
     if summary_data:
         price_now = summary_data.get('last', 0)
         price_low_24h = summary_data.get('low', 0)
@@ -437,172 +458,185 @@ with st.expander("📊 Informasi Pair Saat Ini", expanded=True):
             delta_from_low_str = f"{delta_from_low_val:.2f}%"
 
         cols = st.columns(4)
-        cols[0].metric("Harga Sekarang", format_price(price_now, selected_pair), delta=delta_from_low_str if delta_from_low_val >=0 else None, delta_color="normal")
-        cols[1].metric("24j Tertinggi", format_price(price_high_24h, selected_pair))
-        cols[2].metric("24j Terendah", format_price(price_low_24h, selected_pair))
+        cols[0].metric("Harga Sekarang", format_price(price_now, pair), delta=delta_from_low_str if delta_from_low_val >=0 else None, delta_color="normal")
+        cols[1].metric("24j Tertinggi", format_price(price_high_24h, pair))
+        cols[2].metric("24j Terendah", format_price(price_low_24h, pair))
         cols[3].metric("Kenaikan dari Terendah", delta_from_low_str)
     else:
-        st.warning(f"Tidak dapat mengambil informasi ringkasan untuk {selected_pair}.")
-
-# === Memuat data candlestick ===
-main_placeholder = st.empty()
-with main_placeholder.container():
-    with st.spinner(f'Memuat data candlestick & indikator untuk {selected_pair.upper()}...'):
-        candle_df = get_candlestick_data(selected_pair, tf=st.session_state.signal_interval_tf)
-        if candle_df.empty:
-            st.warning(f"Tidak dapat mengambil data candlestick untuk {selected_pair} dengan interval {st.session_state.signal_interval_display}.")
-        else:
-            candle_df_with_indicators = apply_indicators(candle_df.copy())
+        st.warning(f"Tidak dapat mengambil informasi ringkasan untuk {pair}.")
+
+render_pair_summary(selected_pair, st.session_state.signal_interval_tf, live_feed)
 
 # === CANDLESTICK CHART ===
-if not candle_df.empty and 'candle_df_with_indicators' in locals():
-    with st.expander(f"📈 Candlestick Chart: {selected_pair.upper()} ({st.session_state.signal_interval_display})", expanded=True):
-        chart_size_options = {"Kecil": 300, "Sedang": 450, "Besar": 600}
-        selected_chart_size_label = st.selectbox("Pilih Ukuran Chart", list(chart_size_options.keys()), index=1)
-        chart_height = chart_size_options[selected_chart_size_label]
-
-        fig_candle = go.Figure()
-        fig_candle.add_trace(go.Candlestick(
-            x=candle_df_with_indicators.index,
-            open=candle_df_with_indicators['open'], high=candle_df_with_indicators['high'],
-            low=candle_df_with_indicators['low'], close=candle_df_with_indicators['close'],
-            name='Candlestick', increasing_line_color='green', decreasing_line_color='red'
-        ))
-        fig_candle.add_trace(go.Bar(
-            x=candle_df_with_indicators.index, y=candle_df_with_indicators['volume'],
-            name='Volume', marker_color='rgba(0,100,255,0.3)', yaxis='y2'
-        ))
-        if 'sma_50' in candle_df_with_indicators.columns:
-            fig_candle.add_trace(go.Scatter(
-                x=candle_df_with_indicators.index, y=candle_df_with_indicators['sma_50'],
-                mode='lines', name='SMA 50', line=dict(color='orange')
-            ))
-        if 'bb_upper' in candle_df_with_indicators.columns and 'bb_lower' in candle_df_with_indicators.columns:
-             fig_candle.add_trace(go.Scatter(x=candle_df_with_indicators.index, y=candle_df_with_indicators['bb_upper'], mode='lines', name='BB Upper', line=dict(color='rgba(173,216,230,0.5)', dash='dot')))
-             fig_candle.add_trace(go.Scatter(x=candle_df_with_indicators.index, y=candle_df_with_indicators['bb_lower'], mode='lines', name='BB Lower', line=dict(color='rgba(173,216,230,0.5)', dash='dot'), fill='tonexty', fillcolor='rgba(173,216,230,0.1)'))
-
-        fig_candle.update_layout(
-            title=f"Candlestick & Volume: {selected_pair.upper()} ({st.session_state.signal_interval_display})",
-            xaxis_rangeslider_visible=False,
-            template="plotly_dark",
-            height=chart_height,
-            xaxis_title="Waktu",
-            yaxis_title="Harga",
-            yaxis=dict(domain=[0.3, 1]),
-            yaxis2=dict(domain=[0, 0.25], title="Volume", showgrid=False),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            plot_bgcolor='rgba(17,17,17,0.9)', paper_bgcolor='rgba(0,0,0,0)',
+@st.fragment(run_every=LIVE_REFRESH_SECONDS if live_mode else SECTION_REFRESH_SECONDS["candle_chart"] or None)
+def render_candle_chart(pair, tf, tf_display, feed=None):
+    if not st.toggle(f"📈 Candlestick Chart: {pair.upper()} ({tf_display})", value=True, key="show_candle_chart"):
+        return
+    chart_size_options = {"Kecil": 300, "Sedang": 450, "Besar": 600}
+    size_col, history_col = st.columns(2)
+    selected_chart_size_label = size_col.selectbox("Pilih Ukuran Chart", list(chart_size_options.keys()), index=1, key="chart_size")
+    chart_height = chart_size_options[selected_chart_size_label]
+    selected_history_label = history_col.selectbox("Riwayat Chart", list(CHART_HISTORY_OPTIONS.keys()), index=0, key="chart_history")
+
+    history_limit = CHART_HISTORY_OPTIONS[selected_history_label]
+    live_history = None
+    with st.spinner(f'Memuat data candlestick & indikator untuk {pair.upper()}...'):
+        if feed is None:
+            candle_df_with_indicators = load_pair_candles(pair, tf, limit=history_limit)
+        else:
+            live_history = load_live_chart_history(pair, tf, history_limit)
+            candle_df_with_indicators = live_history["df"]
+    if candle_df_with_indicators is None:
+        st.warning(f"Tidak dapat mengambil data candlestick untuk {pair} dengan interval {tf_display}.")
+        return
+
+    # Streamlit tidak mengirim event zoom Plotly ke Python; rentang waktu dipilih lewat slider
+    # sehingga bagian yang diperbesar di-downsample ulang dengan resolusi penuh.
+    x_range = None
+    first_date, last_date = candle_df_with_indicators['date'].iloc[0], candle_df_with_indicators['date'].iloc[-1]
+    if len(candle_df_with_indicators) > 1 and last_date > first_date:
+        visible = st.slider(
+            "Rentang Waktu", min_value=first_date.to_pydatetime(), max_value=last_date.to_pydatetime(),
+            value=(first_date.to_pydatetime(), last_date.to_pydatetime()), format="DD/MM/YY HH:mm", key="chart_range"
         )
+        if visible != (first_date.to_pydatetime(), last_date.to_pydatetime()):
+            x_range = tuple(pd.Timestamp(v).value / 1e6 for v in visible)
+
+    chart_title = f"Candlestick & Volume: {pair.upper()} ({tf_display})"
+    with timed("ui.chart"):
+        if live_history is not None and x_range is None:
+            # Tick live: riwayat yang sudah di-downsample dipakai ulang, hanya bar terakhir dari feed yang berubah.
+            feed.subscribe(pair, tf)
+            # Versi dari feed (di akhir list) menggantikan bar terakhir riwayat dengan ts yang sama.
+            live_bars = [live_history["last_bar"]] + feed.bars_since(pair, tf, live_history["last_bar"]["ts"])
+            fig_candle = build_candlestick_figure(apply_live_bars(live_history["data"], live_bars), chart_title, chart_height)
+        else:
+            fig_candle = candlestick_figure(candle_df_with_indicators, chart_title, chart_height, x_range=x_range)
         st.plotly_chart(fig_candle, use_container_width=True)
 
+render_candle_chart(selected_pair, st.session_state.signal_interval_tf, st.session_state.signal_interval_display, live_feed)
+
 # === SINYAL MACD & VOLUME SPIKE (Pair Terpilih) ===
-if not candle_df.empty and 'candle_df_with_indicators' in locals():
-    with st.expander("📈 Sinyal MACD & Volume Spike (Pair Terpilih)", expanded=True):
-        scan_selected_pair_signals(selected_pair, candle_df_with_indicators, summary_data)
-else:
-    st.info(f"Data candlestick untuk {selected_pair.upper()} tidak tersedia untuk pemindaian sinyal.")
+@st.fragment(run_every=SECTION_REFRESH_SECONDS["signals"] or None)
+def render_pair_signals(pair, tf):
+    if not st.toggle("📈 Sinyal MACD & Volume Spike (Pair Terpilih)", value=True, key="show_pair_signals"):
+        return
+    candle_df_with_indicators = load_pair_candles(pair, tf)
+    if candle_df_with_indicators is None:
+        st.info(f"Data candlestick untuk {pair.upper()} tidak tersedia untuk pemindaian sinyal.")
+        return
+    scan_selected_pair_signals(pair, candle_df_with_indicators, get_indodax_summary(pair))
+
+render_pair_signals(selected_pair, st.session_state.signal_interval_tf)
 
 # === VISUALISASI TEKNIKAL & SCANNER PAIR LAIN ===
-with st.expander("📉 Visualisasi Teknikal & Scanner Pair Lain", expanded=False):
+@st.fragment
+def render_other_pair_scanner(pairs, default_pair):
+    if not st.toggle("📉 Visualisasi Teknikal & Scanner Pair Lain", value=False, key="show_other_pair_scanner"):
+        return
     scanner_pair = st.selectbox(
         "Pilih Pair untuk Analisis Teknikal Cepat",
-        available_pairs,
-        index=available_pairs.index(selected_pair)
+        pairs,
+        index=pairs.index(default_pair)
     )
     if st.button(f"Tampilkan Analisis Teknikal untuk {scanner_pair.upper()}", key="scan_other_pair"):
         with st.spinner(f"Memuat data & indikator untuk {scanner_pair.upper()}..."):
-            df_chart_scanner = get_candlestick_data(scanner_pair, tf='1H')
+            df_chart_scanner = get_candlestick_data(scanner_pair, tf='1H', limit=CANDLE_HISTORY_LIMIT, history=True)
             if df_chart_scanner is not None and not df_chart_scanner.empty:
-                df_chart_scanner_indicators = apply_indicators(df_chart_scanner.copy())
+                df_chart_scanner_indicators = apply_indicators(df_chart_scanner)
                 plot_technical_charts(df_chart_scanner_indicators, scanner_pair)
             else:
                 st.warning(f"Tidak dapat memuat data chart untuk {scanner_pair.upper()}.")
 
+render_other_pair_scanner(available_pairs, selected_pair)
+
 # === DETEKSI PASAR GLOBAL ===
-with st.expander("📡 Deteksi Pasar Global", expanded=True):
+@st.fragment(run_every=SECTION_REFRESH_SECONDS["global_market"] or None)
+def render_global_market():
+    if not st.toggle("📡 Deteksi Pasar Global", value=True, key="show_global_market"):
+        return
     with st.spinner("Memuat data ticker semua pair..."):
         all_tickers_data = fetch_all_tickers()
 
     if all_tickers_data:
-        df_market = pd.DataFrame.from_dict(all_tickers_data, orient='index')
-        df_market.index.name = 'Pair' # Nama indeks diatur di sini
-
-        required_cols = ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']
-        for col in required_cols:
-            if col not in df_market.columns:
-                logger.warning(f"Kolom '{col}' tidak ditemukan di data ticker. Ditambahkan dengan nilai default 0.")
-                df_market[col] = 0
-
-        for col in ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']:
-             df_market[col] = pd.to_numeric(df_market[col], errors='coerce').fillna(0)
-
-        df_market['Harga'] = [format_price(price, pair) for price, pair in zip(df_market['last'], df_market.index)]
-        df_market['Volume IDR (24j)'] = df_market['vol_idr'].apply(lambda x: f"{x:,.0f} IDR")
-        df_market['Volume Buy'] = df_market['buy'].apply(lambda x: f"{x:,.0f}")
-        df_market['Volume Sell'] = df_market['sell'].apply(lambda x: f"{x:,.0f}")
-        df_market['Rasio B/S'] = df_market.apply(lambda x: "Demand > Supply" if x['buy'] > x['sell'] else ("Supply > Demand" if x['sell'] > x['buy'] else "Seimbang"), axis=1)
-        df_market['Sinyal Pasar'] = df_market.apply(lambda x: generate_market_signal(x['buy'], x['sell']), axis=1)
-        df_market['Saran Posisi'] = df_market['Sinyal Pasar'].apply(get_position_suggestion)
-
-        df_market['Spike (%)'] = df_market.apply(
-            lambda x: ((x['high'] - x['low']) / x['low'] * 100) if x['low'] > 0 else 0, axis=1
-        )
-        df_market['Spike (%)'] = df_market['Spike (%)'].apply(lambda x: f"{x:.2f}%")
-
-        df_market = df_market.sort_values(by='vol_idr', ascending=False)
+        df_market = build_market_table(all_tickers_data)
 
-        cols_to_display = ['Harga', 'Volume IDR (24j)', 'Volume Buy', 'Volume Sell', 'Rasio B/S', 'Sinyal Pasar', 'Saran Posisi', 'Spike (%)']
-
-        # --- BAGIAN INI YANG DIPERBAIKI ---
-        styled_df_market = df_market[cols_to_display].style \
-            .applymap(style_signal_column, subset=['Sinyal Pasar']) \
-            .set_properties(**{'text-align': 'right'}, subset=['Harga', 'Volume IDR (24j)', 'Volume Buy', 'Volume Sell', 'Spike (%)']) \
-            .set_properties(**{'text-align': 'left'}, subset=['Rasio B/S', 'Saran Posisi']) \
-            .set_properties(**{'text-align': 'center'}, subset=['Sinyal Pasar']) \
-            .format({'Harga': '{}', 'Volume Buy': '{}', 'Volume Sell': '{}', 'Spike (%)': '{}'})
-        # --- AKHIR BAGIAN DIPERBAIKI ---
-
-        st.dataframe(styled_df_market, use_container_width=True, height=600)
+        with timed("ui.market_table"):
+            styled_df_market = style_market_table(df_market)
+            st.dataframe(styled_df_market, use_container_width=True, height=600)
     else:
         st.warning("❗ Tidak ada data ticker global yang tersedia dari Indodax saat ini.")
 
+render_global_market()
+
 # === TOP MOVERS (24 Jam) ===
-with st.expander("🔥 Top Movers (24 Jam)", expanded=True):
+@st.fragment(run_every=SECTION_REFRESH_SECONDS["top_movers"] or None)
+def render_top_movers():
+    if not st.toggle("🔥 Top Movers (24 Jam)", value=True, key="show_top_movers"):
+        return
+    all_tickers_data = fetch_all_tickers()
     if all_tickers_data:
-        top_gainers, top_losers, top_volume_movers = get_top_movers(all_tickers_data)
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.write("#🚀 Top Gainers")
-            if not top_gainers.empty:
-                st.dataframe(top_gainers[['last', 'change']].style.format({
-                    'last': lambda x: format_price(x, 'idr'),
-                    'change': '{:.2f}%'
-                }).set_caption("Persentase kenaikan tertinggi"))
-            else:
-                st.info("Tidak ada data top gainers.")
-        with col2:
-            st.write("#🔻 Top Losers")
-            if not top_losers.empty:
-                st.dataframe(top_losers[['last', 'change']].style.format({
-                    'last': lambda x: format_price(x, 'idr'),
-                    'change': '{:.2f}%'
-                }).set_caption("Persentase penurunan terdalam"))
-            else:
-                st.info("Tidak ada data top losers.")
-        with col3:
-            st.write("#💰 Top Volume")
-            if not top_volume_movers.empty:
-                st.dataframe(top_volume_movers[['vol_idr']].style.format({
-                    'vol_idr': '{:,.0f} IDR'
-                }).set_caption("Volume perdagangan tertinggi dalam IDR"))
-            else:
-                st.info("Tidak ada data top volume.")
+        with timed("ui.top_movers"):
+            top_gainers, top_losers, top_volume_movers = get_top_movers(all_tickers_data)
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.write("#🚀 Top Gainers")
+                if not top_gainers.empty:
+                    st.dataframe(top_gainers[['last', 'change']].style.format({
+                        'last': lambda x: format_price(x, 'idr'),
+                        'change': '{:.2f}%'
+                    }).set_caption("Persentase kenaikan tertinggi"))
+                else:
+                    st.info("Tidak ada data top gainers.")
+            with col2:
+                st.write("#🔻 Top Losers")
+                if not top_losers.empty:
+                    st.dataframe(top_losers[['last', 'change']].style.format({
+                        'last': lambda x: format_price(x, 'idr'),
+                        'change': '{:.2f}%'
+                    }).set_caption("Persentase penurunan terdalam"))
+                else:
+                    st.info("Tidak ada data top losers.")
+            with col3:
+                st.write("#💰 Top Volume")
+                if not top_volume_movers.empty:
+                    st.dataframe(top_volume_movers[['vol_idr']].style.format({
+                        'vol_idr': '{:,.0f} IDR'
+                    }).set_caption("Volume perdagangan tertinggi dalam IDR"))
+                else:
+                    st.info("Tidak ada data top volume.")
     else:
         st.warning("Tidak dapat menampilkan Top Movers karena data ticker global tidak tersedia.")
 
+render_top_movers()
+
+# === DIAGNOSTIK PERFORMA ===
+@st.fragment
+def render_diagnostics():
+    if not st.toggle("🩺 Diagnostik Performa", value=False, key="show_diagnostics"):
+        return
+    metrics_rows = metrics.summary()
+    if metrics_rows:
+        st.dataframe(pd.DataFrame(metrics_rows).set_index("stage"), use_container_width=True)
+    else:
+        st.info("Belum ada data timing yang tercatat.")
+    diag_col1, diag_col2 = st.columns(2)
+    diag_col1.download_button(
+        "⬇️ Unduh Metrik (Prometheus)", data=metrics.prometheus_text(),
+        file_name="readonetrade_metrics.prom", mime="text/plain"
+    )
+    if diag_col2.button("🧹 Reset Metrik", key="reset_metrics_button"):
+        metrics.reset()
+        st.success("✅ Metrik performa berhasil di-reset.")
+    st.caption("Durasi per stage (API, indikator, sinyal, Telegram, UI) dalam milidetik, dari sampel terakhir proses ini.")
+
+render_diagnostics()
+
 # === Footer ===
 st.markdown("---")
 st.markdown(f"<p style='text-align: center; color: grey;'>Develop By : OTOH © {datetime.now().year}</p>", unsafe_allow_html=True)
 
+metrics.observe("ui.rerun", time.perf_counter() - RERUN_STARTED)
+
 logger.info("Pemuatan halaman utama selesai.")
@@ -0,0 +1,91 @@
+"""Fixture JSON Indodax untuk benchmark dan penskalaannya ke jumlah pair/trade tertentu.
+
+File di benchmarks/fixtures/ mengikuti format respons /api/tickers dan
+/api/{pair}/trades apa adanya dan dapat diperbarui dari API live dengan
+benchmarks/record_fixtures.py. Untuk skala besar, pair dan trade disintesis
+dengan bootstrap dari distribusi fixture (return harga, jeda waktu, amount,
+tipe) memakai seed tetap sehingga setiap run identik.
+"""
+import os
+import json
+import random
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TICKERS_FIXTURE = os.path.join(FIXTURES_DIR, "tickers.json")
+TRADES_FIXTURE = os.path.join(FIXTURES_DIR, "btc_idr_trades.json")
+
+
+def load_tickers_fixture(path=TICKERS_FIXTURE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_trades_fixture(path=TRADES_FIXTURE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _scale_number(value, factor):
+    number = float(value) * factor
+    return str(int(round(number))) if number >= 1000 else f"{number:.8f}"
+
+
+def scaled_tickers(n_pairs, seed=0, template=None):
+    """Payload /api/tickers dengan n_pairs pair; pair fixture dipakai dulu, sisanya variasi acak."""
+    template = (template or load_tickers_fixture())["tickers"]
+    rnd = random.Random(seed)
+    names = list(template)
+    tickers = {}
+    for i in range(n_pairs):
+        source_name = names[i % len(names)]
+        source = template[source_name]
+        if i < len(names):
+            tickers[source_name] = dict(source)
+            continue
+        base, quote = source_name.split("_", 1)
+        factor = rnd.uniform(0.2, 5.0)
+        ticker = {}
+        for key, value in source.items():
+            if key in ("server_time", "name"):
+                ticker[key] = value
+            elif key.startswith("vol_"):
+                ticker[key] = _scale_number(value, rnd.uniform(0.05, 3.0))
+            else:
+                ticker[key] = _scale_number(value, factor)
+        tickers[f"{base}{i}_{quote}"] = ticker
+    return {"tickers": tickers}
+
+
+def scaled_trades(n_trades, seed=0, template=None, end_time=None, first_tid=None):
+    """List trade format /api/{pair}/trades (terbaru dulu) sebanyak n_trades.
+
+    Return harga, jeda antar trade, amount dan tipe diambil acak dari fixture
+    sehingga karakteristiknya sama dengan data yang direkam.
+    """
+    template = template or load_trades_fixture()
+    ordered = sorted(template, key=lambda t: (int(t["date"]), int(t["tid"])))
+    prices = np.array([float(t["price"]) for t in ordered])
+    dates = np.array([int(t["date"]) for t in ordered])
+    amounts = np.array([float(t["amount"]) for t in ordered])
+    log_returns = np.diff(np.log(prices)) if len(prices) > 1 else np.zeros(1)
+    gaps = np.diff(dates) if len(dates) > 1 else np.ones(1, dtype=int)
+    buy_ratio = np.mean([t.get("type") == "buy" for t in ordered]) if ordered else 0.5
+
+    rng = np.random.default_rng(seed)
+    path = prices[-1] * np.exp(np.cumsum(rng.choice(log_returns, n_trades)))
+    times = (end_time or int(dates[-1])) - np.cumsum(rng.choice(gaps, n_trades))[::-1]
+    sizes = rng.choice(amounts, n_trades)
+    is_buy = rng.random(n_trades) < buy_ratio
+    first_tid = first_tid or int(ordered[-1]["tid"]) + 1
+
+    trades = []
+    for i in range(n_trades - 1, -1, -1):
+        trades.append({
+            "date": str(int(times[i])),
+            "price": _scale_number(path[i], 1.0),
+            "amount": f"{sizes[i]:.8f}",
+            "tid": str(first_tid + i),
+            "type": "buy" if is_buy[i] else "sell",
+        })
+    return trades
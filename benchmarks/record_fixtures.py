@@ -0,0 +1,35 @@
+"""Rekam ulang fixture benchmark dari API Indodax live.
+
+Jalankan dari root repo:  python -m benchmarks.record_fixtures [--pair btc_idr]
+"""
+import sys
+import json
+import argparse
+
+import requests
+
+from modules.indodax_api import INDODAX_BASE_URL
+from benchmarks.fixtures import TICKERS_FIXTURE, TRADES_FIXTURE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.record_fixtures")
+    parser.add_argument("--pair", default="btc_idr", help="pair untuk fixture trades")
+    parser.add_argument("--max-pairs", type=int, default=20, help="jumlah pair (volume IDR terbesar) di fixture tickers")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    tickers = requests.get(f"{INDODAX_BASE_URL}/tickers", timeout=10).json()
+    top = sorted(tickers["tickers"].items(), key=lambda kv: float(kv[1].get("vol_idr", 0)), reverse=True)
+    with open(TICKERS_FIXTURE, "w", encoding="utf-8") as f:
+        json.dump({"tickers": dict(top[:args.max_pairs])}, f)
+
+    trades = requests.get(f"{INDODAX_BASE_URL}/{args.pair}/trades", timeout=10).json()
+    with open(TRADES_FIXTURE, "w", encoding="utf-8") as f:
+        json.dump(trades, f)
+
+    print(f"Fixture disimpan: {min(len(top), args.max_pairs)} ticker, {len(trades)} trade {args.pair}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
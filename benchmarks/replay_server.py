@@ -0,0 +1,225 @@
+"""Server replay lokal pengganti API Indodax (tanpa jaringan).
+
+Menyajikan /api/tickers, /api/{pair}/ticker dan /api/{pair}/trades dari
+fixture rekaman (atau file rekaman lain) yang diskalakan ke sejumlah pair.
+Opsional: trade baru disintesis terus dengan laju tertentu per pair, latensi
+tambahan per permintaan dan injeksi error HTTP, sehingga dashboard dan
+scanner bisa diuji beban end-to-end secara offline, mis. 10x jumlah pair
+produksi.
+
+Jalankan server dari root repo:
+
+    python -m benchmarks.replay_server --pairs 2000 --trade-rate 0.5 --latency-ms 80 --error-rate 0.01
+
+Lalu arahkan app/scanner ke server dari direktori kerja terpisah, karena
+data/ (trade store, arsip candle, salinan daftar pair) relatif terhadap
+direktori kerja dan tidak boleh tercampur data sintetis:
+
+    INDODAX_BASE_URL=http://127.0.0.1:8765/api streamlit run <repo>/Read_One_Trade_V.01.py
+    PYTHONPATH=<repo> python -m modules.scanner --api-base-url http://127.0.0.1:8765/api --once
+"""
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+from benchmarks.fixtures import (scaled_tickers, scaled_trades, load_tickers_fixture, load_trades_fixture,
+                                 TICKERS_FIXTURE, TRADES_FIXTURE)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Klien yang menutup koneksi keep-alive (mis. proses scanner selesai) bukan error server.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class ReplayServer:
+    """Menyajikan /api/tickers, /api/{pair}/ticker dan /api/{pair}/trades dari fixture.
+
+    Payload diserialisasi sekali per pair sehingga waktu yang diukur adalah
+    sisi klien (HTTP, parse JSON, pemrosesan), bukan pembuatan data. Dengan
+    trade_rate > 0, setiap permintaan /trades menambahkan trade sintetis
+    sebanyak waktu yang berlalu x trade_rate (jendela tetap n_trades terbaru,
+    seperti API asli) dan harga `last` ticker pair itu ikut bergerak.
+    """
+
+    def __init__(self, n_pairs=20, n_trades=1000, seed=0, trade_rate=0.0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, tickers_template=None, trades_template=None):
+        self.tickers = scaled_tickers(n_pairs, seed=seed, template=tickers_template)
+        self.pairs = list(self.tickers["tickers"])
+        self.n_trades = n_trades
+        self.seed = seed
+        self.trade_rate = trade_rate  # trade baru per detik per pair
+        self.latency = latency  # detik tambahan per permintaan
+        self.jitter = jitter  # detik acak tambahan (0..jitter) di atas latency
+        self.error_rate = error_rate  # fraksi permintaan yang dijawab error_status
+        self.error_status = error_status
+        self.stats = {"requests": 0, "errors": 0, "trades_generated": 0}
+        self._trades_template = trades_template or load_trades_fixture()
+        self._started = time.time()
+        self._payloads = {"tickers": json.dumps(self.tickers).encode()}
+        self._live = {}  # pair -> {"trades", "since", "generation"} untuk trade_rate > 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _payload(self, key, build):
+        with self._lock:
+            body = self._payloads.get(key)
+            if body is None:
+                body = self._payloads[key] = json.dumps(build()).encode()
+            return body
+
+    def _initial_trades(self, pair):
+        # Dengan trade_rate, trade awal berakhir saat server mulai agar trade baru menyambung.
+        end_time = int(self._started) if self.trade_rate else None
+        return scaled_trades(self.n_trades, seed=self.seed + self.pairs.index(pair),
+                             template=self._trades_template, end_time=end_time)
+
+    def _advance(self, pair, now):
+        """Tambahkan trade sintetis yang jatuh tempo untuk `pair` (dipanggil dengan lock)."""
+        state = self._live.get(pair)
+        if state is None:
+            state = self._live[pair] = {"trades": self._initial_trades(pair), "since": self._started, "generation": 0}
+        due = int((now - state["since"]) * self.trade_rate)
+        if due <= 0:
+            return
+        state["generation"] += 1
+        newest = state["trades"][0]
+        fresh = scaled_trades(due, seed=[self.seed, self.pairs.index(pair), state["generation"]],
+                              template=state["trades"], first_tid=int(newest["tid"]) + 1)
+        # Waktu trade baru disebar rata di (since, now]; list terbaru dulu seperti API asli.
+        times = np.linspace(state["since"], now, due + 1)[1:][::-1]
+        for trade, ts in zip(fresh, times):
+            trade["date"] = str(max(int(ts), int(newest["date"])))
+        state["trades"] = (fresh + state["trades"])[:self.n_trades]
+        state["since"] += due / self.trade_rate
+        self.stats["trades_generated"] += due
+        self.tickers["tickers"][pair]["last"] = fresh[0]["price"]
+        self._payloads.pop(("trades", pair), None)
+        self._payloads.pop(("ticker", pair), None)
+        self._payloads.pop("tickers", None)
+
+    def prebuild(self):
+        """Serialisasi semua payload di muka agar tidak ikut terukur."""
+        for pair in self.pairs:
+            self.handle(f"/api/{pair}/ticker")
+            self.handle(f"/api/{pair}/trades")
+
+    def handle(self, path):
+        """Mengembalikan (status, body) untuk path permintaan."""
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return self.error_status, b'{"error":"injected_error"}'
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if parts == ["api", "tickers"]:
+            return 200, self._payload("tickers", lambda: self.tickers)
+        if len(parts) == 3 and parts[0] == "api" and parts[1] in self.tickers["tickers"]:
+            pair = parts[1]
+            if parts[2] == "ticker":
+                return 200, self._payload(("ticker", pair), lambda: {"ticker": self.tickers["tickers"][pair]})
+            if parts[2] == "trades":
+                if self.trade_rate:
+                    with self._lock:
+                        self._advance(pair, time.time())
+                    return 200, self._payload(("trades", pair), lambda: self._live[pair]["trades"])
+                return 200, self._payload(("trades", pair), lambda: self._initial_trades(pair))
+        return 404, b'{"error":"invalid_pair"}'
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + extra)
+
+    def start(self, host="127.0.0.1", port=0):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # tanpa ini header & body terpisah kena jeda delayed-ACK ~40 ms
+
+            def do_GET(self):
+                replay._delay()
+                status, body = replay.handle(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _ReplayHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="replay-server", daemon=True).start()
+        return self.base_url
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replay_server",
+                                     description="Server replay lokal pengganti API Indodax.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--pairs", type=int, default=20, help="jumlah pair di /tickers (fixture + variasi sintetis)")
+    parser.add_argument("--trades", type=int, default=1000, help="jumlah trade per respons /trades")
+    parser.add_argument("--trade-rate", type=float, default=0.0, help="trade baru per detik per pair (0 = statis)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latensi tambahan per permintaan")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="latensi acak tambahan 0..jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraksi permintaan yang dijawab error")
+    parser.add_argument("--error-status", type=int, default=503, help="status HTTP untuk error injeksi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tickers-file", default=TICKERS_FIXTURE, help="rekaman /api/tickers sebagai template")
+    parser.add_argument("--trades-file", default=TRADES_FIXTURE, help="rekaman /api/{pair}/trades sebagai template")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = ReplayServer(
+        n_pairs=args.pairs, n_trades=args.trades, seed=args.seed, trade_rate=args.trade_rate,
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate, error_status=args.error_status,
+        tickers_template=load_tickers_fixture(args.tickers_file), trades_template=load_trades_fixture(args.trades_file),
+    )
+    base_url = server.start(args.host, args.port)
+    logger.info(f"Replay server {len(server.pairs)} pair aktif di {base_url} (set INDODAX_BASE_URL={base_url}).")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info(f"Replay server dihentikan: {server.stats}")
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
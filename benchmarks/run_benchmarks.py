@@ -0,0 +1,402 @@
+"""Benchmark jalur utama ingest -> indikator -> sinyal -> render.
+
+Jalankan dari root repo:
+
+    python -m benchmarks.run_benchmarks                 # semua stage, semua skala
+    python -m benchmarks.run_benchmarks --quick         # skala kecil saja
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<run>.json
+
+Setiap stage diukur pada skala realistis (1/100/500 pair, 100 s.d. 100k
+trade) terhadap replay server lokal (benchmarks/replay_server.py) berisi
+fixture Indodax. Latensi diukur tanpa tracemalloc, lalu satu run terpisah
+mengukur puncak memori.
+Hasil disimpan sebagai JSON agar bisa dibandingkan antar run.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import scaled_trades
+from benchmarks.replay_server import ReplayServer
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PAIR_SCALES = (1, 100, 500)
+TRADE_SCALES = (100, 1_000, 10_000, 100_000)
+BAR_SCALES = (500, 5_000)
+QUICK_SCALES = {"pairs": (1, 100), "trades": (100, 10_000), "bars": (500,)}
+CANDLE_BARS = 500  # jumlah candle per pair, sama dengan CANDLE_HISTORY_LIMIT dashboard
+SCAN_TRADES_PER_PAIR = 1000  # kira-kira isi satu respons /trades
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.2  # p50 lebih lambat >20% dianggap regresi
+
+
+def _synthetic_candles(n_bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 1_000_000 * np.exp(np.cumsum(rng.normal(0, 0.004, n_bars)))
+    spread = close * rng.uniform(0, 0.006, n_bars)
+    return pd.DataFrame({
+        'date': pd.date_range("2025-01-01", periods=n_bars, freq="h"),
+        'open': np.r_[close[0], close[:-1]],
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.gamma(1.5, 2.0, n_bars) * (1 + 4 * (rng.random(n_bars) < 0.03)),
+    })
+
+
+# === Stage benchmark ===
+# Setiap stage: prepare(scale, ctx) -> (run, jumlah item yang diproses). Stage dengan
+# fresh=True disiapkan ulang sebelum setiap pengulangan (mengukur kondisi cold).
+
+def _point_api_at(server):
+    from modules import indodax_api as api
+    api.set_base_url(server.base_url)
+    return api
+
+
+def prepare_fetch_tickers(n_pairs, ctx):
+    api = _point_api_at(ctx.server(n_pairs))
+
+    def run():
+        api.clear_cache()
+        api.fetch_all_tickers()
+    return run, n_pairs
+
+
+def prepare_market_table(n_pairs, ctx):
+    from utils import helpers
+    api = _point_api_at(ctx.server(n_pairs))
+    tickers = api.fetch_all_tickers()
+
+    def run():
+        helpers._market_table_cache.update(key=None, table=None)
+        helpers.build_market_table(tickers)
+    return run, n_pairs
+
+
+def prepare_top_movers(n_pairs, ctx):
+    from utils.helpers import get_top_movers
+    tickers = _point_api_at(ctx.server(n_pairs)).fetch_all_tickers()
+    return (lambda: get_top_movers(tickers)), n_pairs
+
+
+def prepare_render_market_table(n_pairs, ctx):
+    from utils import helpers
+    tickers = _point_api_at(ctx.server(n_pairs)).fetch_all_tickers()
+    df_market = helpers.build_market_table(tickers)
+
+    def run():
+        # Styler yang sama dengan dashboard; to_html memaksa semua gaya & format benar-benar dihitung.
+        helpers.style_market_table(df_market).to_html()
+    return run, n_pairs
+
+
+def prepare_parse_trades(n_trades, ctx):
+    from modules.trades import TradesSnapshot
+    body = json.dumps(scaled_trades(n_trades, seed=1)).encode()
+    return (lambda: TradesSnapshot.from_json("btc_idr", json.loads(body))), n_trades
+
+
+def prepare_ohlcv(n_trades, ctx):
+    from modules.trades import TradesSnapshot
+    snapshot = TradesSnapshot.from_json("btc_idr", scaled_trades(n_trades, seed=1))
+    return (lambda: snapshot.ohlcv('5min')), n_trades
+
+
+def prepare_candle_archive(n_trades, ctx):
+    from modules.trades import TradesSnapshot
+    from modules.trade_store import TradeStore
+    from modules.candles import CandleSeries
+    snapshot = TradesSnapshot.from_json("btc_idr", scaled_trades(n_trades, seed=1))
+    directory = ctx.tempdir()
+
+    def run():
+        # Cold: simpan trade ke store baru lalu bangun arsip 1 menit + 1 jam.
+        store = TradeStore("btc_idr", os.path.join(directory, "trades"))
+        store.append_snapshot(snapshot)
+        CandleSeries("btc_idr", store, os.path.join(directory, "candles")).ohlcv('1h', limit=CANDLE_BARS)
+    return run, n_trades
+
+
+def _candle_frames(n_pairs):
+    return [_synthetic_candles(CANDLE_BARS, seed) for seed in range(n_pairs)]
+
+
+def prepare_indicators_ta(n_pairs, ctx):
+    from modules.indicators import apply_indicators
+    frames = _candle_frames(n_pairs)
+
+    def run():
+        for df in frames:
+            apply_indicators(df.copy(), backend="ta")
+    return run, n_pairs
+
+
+def prepare_indicators_numpy(n_pairs, ctx):
+    from modules.indicators import apply_indicators
+    frames = _candle_frames(n_pairs)
+
+    def run():
+        for df in frames:
+            apply_indicators(df.copy(), backend="numpy")
+    return run, n_pairs
+
+
+def prepare_indicators_incremental(n_pairs, ctx):
+    from modules.indicators import apply_indicators_incremental
+    frames = _candle_frames(n_pairs)
+    for i, df in enumerate(frames):
+        apply_indicators_incremental(df.copy(), f"bench{i}", "bench")
+    ticks = {"n": 0}
+
+    def run():
+        # Kondisi stabil: hanya bar terakhir yang berubah (candle belum close).
+        ticks["n"] += 1
+        for i, df in enumerate(frames):
+            df.loc[df.index[-1], 'close'] *= 1 + 1e-4 * (-1) ** ticks["n"]
+            apply_indicators_incremental(df, f"bench{i}", "bench")
+    return run, n_pairs
+
+
+def prepare_signals(n_pairs, ctx):
+    from modules.indicators import apply_indicators
+    from modules.signal_engine import scan_signals
+    frames = [apply_indicators(df) for df in _candle_frames(n_pairs)]
+
+    def run():
+        for i, df in enumerate(frames):
+            scan_signals(f"pair{i}", df)
+    return run, n_pairs
+
+
+def prepare_render_chart(n_bars, ctx):
+    import plotly.io as pio
+    from modules.charts import candlestick_figure
+    from modules.indicators import apply_indicators
+    df = apply_indicators(_synthetic_candles(n_bars, seed=0))
+
+    def run():
+        # Sama dengan chart candlestick dashboard (downsampling server), termasuk serialisasi JSON figure.
+        pio.to_json(candlestick_figure(df, "Candlestick & Volume", 450), validate=False)
+    return run, n_bars
+
+
+def prepare_scan_pass(n_pairs, ctx):
+    from modules import indicators, trade_store, candles
+    from modules.scanner import run_concurrent_scan, evaluate_pair
+    server = ctx.server(n_pairs, n_trades=SCAN_TRADES_PER_PAIR)
+    _point_api_at(server)
+    pairs = server.pairs[:n_pairs]
+
+    # Cold: direktori kerja baru (data/trades, data/candles relatif) dan registry kosong.
+    directory = ctx.tempdir()
+    trade_store._stores.clear()
+    candles._series.clear()
+    indicators._incremental_engines.clear()
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            run_concurrent_scan(pairs, lambda p: evaluate_pair(p, tf='1h'), max_workers=8)
+        finally:
+            os.chdir(cwd)
+    return run, n_pairs
+
+
+STAGES = {
+    # nama: (fungsi prepare, jenis skala, fresh)
+    "fetch_tickers": (prepare_fetch_tickers, "pairs", False),
+    "market_table": (prepare_market_table, "pairs", False),
+    "top_movers": (prepare_top_movers, "pairs", False),
+    "render_market_table": (prepare_render_market_table, "pairs", False),
+    "parse_trades": (prepare_parse_trades, "trades", False),
+    "ohlcv": (prepare_ohlcv, "trades", False),
+    "candle_archive": (prepare_candle_archive, "trades", True),
+    "indicators_ta": (prepare_indicators_ta, "pairs", False),
+    "indicators_numpy": (prepare_indicators_numpy, "pairs", False),
+    "indicators_incremental": (prepare_indicators_incremental, "pairs", False),
+    "signals": (prepare_signals, "pairs", False),
+    "render_chart": (prepare_render_chart, "bars", False),
+    "scan_pass": (prepare_scan_pass, "pairs", True),
+}
+
+
+class BenchContext:
+    """Sumber daya bersama antar stage: replay server per skala dan direktori sementara."""
+
+    def __init__(self):
+        self._servers = {}
+        self._tempdirs = []
+
+    def server(self, n_pairs, n_trades=SCAN_TRADES_PER_PAIR):
+        key = (n_pairs, n_trades)
+        if key not in self._servers:
+            server = ReplayServer(n_pairs=n_pairs, n_trades=n_trades)
+            server.prebuild()
+            server.start()
+            self._servers[key] = server
+        return self._servers[key]
+
+    def tempdir(self):
+        path = tempfile.mkdtemp(prefix="bench-")
+        self._tempdirs.append(path)
+        return path
+
+    def close(self):
+        for server in self._servers.values():
+            server.stop()
+        for path in self._tempdirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def measure(prepare, scale, ctx, repeats, fresh):
+    """Ukur latensi (tanpa tracemalloc) lalu puncak memori dari satu run terpisah."""
+    run, items = prepare(scale, ctx)
+    if not fresh:
+        run()  # pemanasan: import, cache koneksi, JIT pandas
+
+    latencies = []
+    for _ in range(repeats):
+        if fresh:
+            run, items = prepare(scale, ctx)
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - started)
+
+    if fresh:
+        run, items = prepare(scale, ctx)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    lat = np.array(latencies)
+    p50 = float(np.percentile(lat, 50))
+    return {
+        "items": items,
+        "repeats": repeats,
+        "mean_s": float(lat.mean()),
+        "p50_s": p50,
+        "p95_s": float(np.percentile(lat, 95)),
+        "min_s": float(lat.min()),
+        "throughput_per_s": items / p50 if p50 > 0 else None,
+        "peak_mem_mb": peak / 1e6,
+    }
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def run_benchmarks(stages=None, quick=False, repeats=DEFAULT_REPEATS):
+    scales = QUICK_SCALES if quick else {"pairs": PAIR_SCALES, "trades": TRADE_SCALES, "bars": BAR_SCALES}
+    ctx = BenchContext()
+    results = []
+    try:
+        for name in stages or STAGES:
+            prepare, unit, fresh = STAGES[name]
+            for scale in scales[unit]:
+                # Stage cold berskala besar cukup diulang lebih sedikit.
+                n = max(1, repeats // 2) if fresh and scale >= 100 else repeats
+                try:
+                    result = measure(prepare, scale, ctx, n, fresh)
+                except Exception as e:
+                    logger.error(f"Benchmark {name} ({scale} {unit}) gagal: {e}", exc_info=True)
+                    continue
+                result.update(stage=name, scale=scale, unit=unit)
+                results.append(result)
+                print(f"{name:<24} {scale:>7} {unit:<6} p50 {result['p50_s'] * 1e3:10.2f} ms  "
+                      f"p95 {result['p95_s'] * 1e3:10.2f} ms  {result['throughput_per_s'] or 0:12.0f} {unit}/s  "
+                      f"peak {result['peak_mem_mb']:8.2f} MB", flush=True)
+    finally:
+        ctx.close()
+    return {"meta": _metadata(), "results": results}
+
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Bandingkan p50 per (stage, skala); mengembalikan list regresi."""
+    base = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nPerbandingan dengan {baseline['meta'].get('git_commit')} ({baseline['meta'].get('timestamp')}):")
+    for r in current["results"]:
+        ref = base.get((r["stage"], r["scale"]))
+        if ref is None or not ref["p50_s"]:
+            continue
+        ratio = r["p50_s"] / ref["p50_s"]
+        mem_ratio = r["peak_mem_mb"] / ref["peak_mem_mb"] if ref["peak_mem_mb"] else None
+        flag = "REGRESI" if ratio > 1 + threshold else ("lebih cepat" if ratio < 1 - threshold else "")
+        if flag == "REGRESI":
+            regressions.append((r["stage"], r["scale"], ratio))
+        mem = f"{mem_ratio:5.2f}x" if mem_ratio is not None else "  -  "
+        print(f"{r['stage']:<24} {r['scale']:>7}  waktu {ratio:5.2f}x  memori {mem}  {flag}")
+    return regressions
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_benchmarks",
+                                     description="Benchmark jalur ingest -> indikator -> sinyal -> render.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="stage yang dijalankan (default: semua)")
+    parser.add_argument("--quick", action="store_true", help="skala kecil saja (untuk cek cepat)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--output", help="file JSON hasil (default: benchmarks/results/<waktu>.json)")
+    parser.add_argument("--compare", help="file JSON hasil sebelumnya sebagai pembanding")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="batas perlambatan p50 yang dianggap regresi (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    report = run_benchmarks(args.stages, args.quick, args.repeats)
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_results(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regresi melebihi {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Laporan waktu impor & cold start entry point Streamlit.
+
+Jalankan dari root repo:
+
+    python -m benchmarks.startup_report [--repeats 5] [--top 15]
+
+Setiap profil impor diukur di interpreter baru (subprocess) agar cache modul
+tidak ikut terhitung. "eager" adalah semua yang dulu diimpor di puncak
+Read_One_Trade_V.01.py sebelum apa pun tergambar; "first_paint" adalah yang
+kini diimpor sebelum judul & sidebar tampil; "deferred" adalah modul yang
+dimuat setelahnya. Selain itu diukur biaya logo (decode/encode Pillow vs
+salinan kecil di disk) dan daftar pair (salinan disk vs panggilan API).
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import statistics
+import subprocess
+from io import BytesIO
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCAL_MODULES = [
+    "modules.indodax_api", "modules.indicators", "modules.telegram_bot", "modules.signal_engine",
+    "modules.scanner", "modules.signal_store", "modules.scheduler", "utils.helpers",
+]
+IMPORT_PROFILES = {
+    "eager": ["streamlit", "pandas", "plotly.graph_objs", "PIL.Image", "PIL.ImageDraw", "requests", *LOCAL_MODULES],
+    "first_paint": ["streamlit", "utils.metrics"],
+    "deferred": ["pandas", *LOCAL_MODULES],
+}
+DEFAULT_REPEATS = 5
+DEFAULT_TOP = 15
+
+
+def _import_once(modules):
+    """Impor `modules` di interpreter baru; kembalikan (detik, {modul: kumulatif detik})."""
+    code = (
+        "import time\n"
+        "t = time.perf_counter()\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + "print(time.perf_counter() - t)\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if not name[1:2].isspace():  # hanya impor tingkat atas
+            cumulative[name.strip()] = int(parts[1]) / 1e6
+    return float(proc.stdout.strip().splitlines()[-1]), cumulative
+
+
+def profile_imports(repeats=DEFAULT_REPEATS):
+    results = {}
+    for name, modules in IMPORT_PROFILES.items():
+        runs = [_import_once(modules) for _ in range(repeats)]
+        times = [r[0] for r in runs]
+        results[name] = {
+            "modules": modules,
+            "median_ms": statistics.median(times) * 1000,
+            "min_ms": min(times) * 1000,
+            "top": sorted(runs[-1][1].items(), key=lambda kv: kv[1], reverse=True),
+        }
+    return results
+
+
+def _best_of(fn, repeats=50):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def profile_logo(logo_path=os.path.join(REPO_ROOT, "logo.png"), size=240):
+    """Biaya logo per rerun dulu (decode+encode Pillow ukuran penuh) vs kini (baca salinan kecil di disk)."""
+    from PIL import Image
+
+    def pillow_roundtrip():
+        img = Image.open(logo_path)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        buffered = BytesIO()
+        img.save(buffered, format="PNG")
+        return base64.b64encode(buffered.getvalue()).decode()
+
+    thumbnail = Image.open(logo_path)
+    thumbnail.thumbnail((size, size))
+    buffered = BytesIO()
+    thumbnail.save(buffered, format="PNG")
+    thumbnail_bytes = buffered.getvalue()
+
+    def cached_thumbnail():
+        return base64.b64encode(BytesIO(thumbnail_bytes).read()).decode()
+
+    return {
+        "pillow_ms": _best_of(pillow_roundtrip, repeats=5) * 1000,
+        "cached_ms": _best_of(cached_thumbnail) * 1000,
+        "pillow_kb": len(pillow_roundtrip()) / 1024,
+        "cached_kb": len(cached_thumbnail()) / 1024,
+    }
+
+
+def profile_pairs():
+    sys.path.insert(0, REPO_ROOT)
+    from modules.indodax_api import load_cached_pairs, PAIRS_CACHE_PATH
+
+    cache_path = os.path.join(REPO_ROOT, PAIRS_CACHE_PATH)
+    pairs, _ = load_cached_pairs(cache_path)
+    if not pairs:
+        return {"cached_ms": None, "pairs": 0}
+    return {"cached_ms": _best_of(lambda: load_cached_pairs(cache_path), repeats=20) * 1000, "pairs": len(pairs)}
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup_report")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="jumlah interpreter baru per profil")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="jumlah impor terberat yang ditampilkan")
+    parser.add_argument("--output", help="simpan laporan sebagai JSON ke path ini")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    imports = profile_imports(args.repeats)
+    logo = profile_logo()
+    pairs = profile_pairs()
+
+    print(f"{'profil impor':<14}{'median':>12}{'min':>12}")
+    for name, result in imports.items():
+        print(f"{name:<14}{result['median_ms']:>10.1f}ms{result['min_ms']:>10.1f}ms")
+    gain = imports["eager"]["median_ms"] - imports["first_paint"]["median_ms"]
+    print(f"\nFirst paint lebih cepat ~{gain:.0f} ms dibanding impor eager (median {args.repeats} run).")
+
+    print(f"\nImpor terberat pada profil eager (kumulatif):")
+    for module, seconds in imports["eager"]["top"][:args.top]:
+        print(f"  {seconds * 1000:>8.1f} ms  {module}")
+
+    print(f"\nLogo per rerun: Pillow decode+encode {logo['pillow_ms']:.1f} ms / {logo['pillow_kb']:.0f} KB base64 "
+          f"vs salinan kecil {logo['cached_ms']:.3f} ms / {logo['cached_kb']:.0f} KB (kini sekali per proses).")
+    if pairs["cached_ms"] is None:
+        print("Daftar pair: belum ada salinan disk (dibuat setelah panggilan API pertama).")
+    else:
+        print(f"Daftar pair: salinan disk {pairs['pairs']} pair dibaca dalam {pairs['cached_ms']:.2f} ms tanpa jaringan.")
+
+    if args.output:
+        report = {"imports": {k: {**v, "top": v["top"][:args.top]} for k, v in imports.items()},
+                  "logo": logo, "pairs": pairs}
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nLaporan disimpan ke {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
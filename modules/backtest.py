@@ -0,0 +1,263 @@
+"""Backtest aturan sinyal atas riwayat candle yang tersimpan di arsip lokal.
+
+Jalankan dengan:  python -m modules.backtest --tf 1h --horizons 1 4 24
+
+Semua pair diproses sekaligus sebagai matriks (bar x pair): seri yang lebih
+pendek diberi padding NaN di depan sehingga EMA/rolling pandas menghasilkan
+nilai yang sama dengan perhitungan per pair. Sweep parameter dijalankan
+paralel di beberapa proses.
+"""
+import os
+import sys
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.indicators import MACD_FAST, MACD_SLOW, MACD_SIGNAL, RSI_WINDOW, BB_WINDOW, BB_DEV, VOLUME_SMA_WINDOW
+from modules.signal_engine import (
+    SIGNAL_LABELS, SIGNAL_MACD_CROSS, SIGNAL_VOLUME_SPIKE, SIGNAL_RSI_OVERSOLD, SIGNAL_RSI_OVERBOUGHT,
+    SIGNAL_BB_BREAKOUT, SIGNAL_BB_BREAKDOWN, SIGNAL_COMBO_SPIKE,
+    RSI_OVERSOLD_LEVEL, RSI_OVERBOUGHT_LEVEL, COMBO_PRICE_CHANGE_PCT,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKTEST_PARAMS = {
+    'macd_fast': MACD_FAST,
+    'macd_slow': MACD_SLOW,
+    'macd_signal': MACD_SIGNAL,
+    'rsi_window': RSI_WINDOW,
+    'rsi_oversold': RSI_OVERSOLD_LEVEL,
+    'rsi_overbought': RSI_OVERBOUGHT_LEVEL,
+    'bb_window': BB_WINDOW,
+    'bb_dev': BB_DEV,
+    'volume_window': VOLUME_SMA_WINDOW,
+    'volume_multiplier': 2,
+    'combo_price_change_pct': COMBO_PRICE_CHANGE_PCT,
+}
+DEFAULT_HORIZONS = (1, 4, 12, 24)  # forward return dalam jumlah bar
+
+MACD_BEARISH_CROSS = "MACD Bearish Cross"
+
+# Arah yang dianggap "benar" per sinyal: +1 harga naik, -1 harga turun.
+SIGNAL_DIRECTIONS = {
+    SIGNAL_LABELS[SIGNAL_MACD_CROSS]: 1,
+    MACD_BEARISH_CROSS: -1,
+    SIGNAL_LABELS[SIGNAL_RSI_OVERSOLD]: 1,
+    SIGNAL_LABELS[SIGNAL_RSI_OVERBOUGHT]: -1,
+    SIGNAL_LABELS[SIGNAL_BB_BREAKOUT]: 1,
+    SIGNAL_LABELS[SIGNAL_BB_BREAKDOWN]: -1,
+    SIGNAL_LABELS[SIGNAL_VOLUME_SPIKE]: 1,
+    SIGNAL_LABELS[SIGNAL_COMBO_SPIKE]: 1,
+}
+
+
+# Fungsi untuk memuat riwayat candle semua pair dari arsip sebagai matriks (bar x pair)
+def load_candle_matrix(pairs=None, tf='1h', max_bars=None):
+    """Mengembalikan (pairs, close, volume); seri pendek diberi padding NaN di depan."""
+    from modules.candles import get_candle_series
+    from modules.trade_store import TRADE_STORE_DIR
+
+    if pairs is None:
+        names = os.listdir(TRADE_STORE_DIR) if os.path.isdir(TRADE_STORE_DIR) else []
+        pairs = sorted(name[:-len(".trades")] for name in names if name.endswith(".trades"))
+
+    series = {}
+    for pair in pairs:
+        try:
+            records = get_candle_series(pair).records(tf, limit=max_bars)
+        except Exception as e:
+            logger.error(f"Gagal memuat riwayat candle {pair}: {e}")
+            continue
+        if len(records):
+            series[pair] = records
+
+    n_bars = max((len(r) for r in series.values()), default=0)
+    close = np.full((n_bars, len(series)), np.nan)
+    volume = np.full((n_bars, len(series)), np.nan)
+    for j, records in enumerate(series.values()):
+        close[n_bars - len(records):, j] = records["close"]
+        volume[n_bars - len(records):, j] = records["volume"]
+    return list(series), close, volume
+
+
+def compute_signal_masks(close, volume, params=None):
+    """Hitung mask boolean (bar x pair) untuk setiap sinyal dengan parameter `params`."""
+    p = dict(DEFAULT_BACKTEST_PARAMS, **(params or {}))
+    close = pd.DataFrame(close)
+    volume = pd.DataFrame(volume)
+
+    # MACD (EMA adjust=False seperti ta); NaN padding di depan dilewati oleh ewm
+    ema_fast = close.ewm(span=p['macd_fast'], min_periods=p['macd_fast'], adjust=False).mean()
+    ema_slow = close.ewm(span=p['macd_slow'], min_periods=p['macd_slow'], adjust=False).mean()
+    macd = ema_fast - ema_slow
+    macd_signal = macd.ewm(span=p['macd_signal'], min_periods=p['macd_signal'], adjust=False).mean()
+    above = (macd > macd_signal).to_numpy()
+    prev_hist = (macd - macd_signal).shift(1).to_numpy()
+
+    # RSI Wilder; bar pertama tiap pair dianggap tanpa perubahan
+    diff = close.diff()
+    diff = diff.where(diff.notna() | close.isna(), 0.0)
+    avg_up = diff.clip(lower=0).ewm(alpha=1 / p['rsi_window'], min_periods=p['rsi_window'], adjust=False).mean()
+    avg_down = (-diff).clip(lower=0).ewm(alpha=1 / p['rsi_window'], min_periods=p['rsi_window'], adjust=False).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_down.to_numpy() == 0, 100.0, 100 - 100 / (1 + avg_up.to_numpy() / avg_down.to_numpy()))
+    rsi[np.isnan(avg_down.to_numpy())] = np.nan
+
+    # Bollinger Bands (std ddof=0)
+    rolling = close.rolling(p['bb_window'], min_periods=p['bb_window'])
+    bb_mean, bb_std = rolling.mean(), rolling.std(ddof=0)
+    bb_upper = (bb_mean + p['bb_dev'] * bb_std).to_numpy()
+    bb_lower = (bb_mean - p['bb_dev'] * bb_std).to_numpy()
+
+    volume_sma = volume.rolling(p['volume_window'], min_periods=p['volume_window']).mean().to_numpy()
+    volume_spike = volume.to_numpy() > p['volume_multiplier'] * volume_sma
+
+    close_np = close.to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change = (close_np / close.shift(1).to_numpy() - 1) * 100
+
+    return {
+        SIGNAL_LABELS[SIGNAL_MACD_CROSS]: above & (prev_hist <= 0),
+        MACD_BEARISH_CROSS: (macd < macd_signal).to_numpy() & (prev_hist >= 0),
+        SIGNAL_LABELS[SIGNAL_RSI_OVERSOLD]: rsi < p['rsi_oversold'],
+        SIGNAL_LABELS[SIGNAL_RSI_OVERBOUGHT]: rsi > p['rsi_overbought'],
+        SIGNAL_LABELS[SIGNAL_BB_BREAKOUT]: close_np > bb_upper,
+        SIGNAL_LABELS[SIGNAL_BB_BREAKDOWN]: close_np < bb_lower,
+        SIGNAL_LABELS[SIGNAL_VOLUME_SPIKE]: volume_spike,
+        SIGNAL_LABELS[SIGNAL_COMBO_SPIKE]: volume_spike & (price_change > p['combo_price_change_pct']),
+    }
+
+
+def forward_returns(close, horizon):
+    """Return close[t + horizon] / close[t] - 1 (NaN jika belum ada bar ke depan)."""
+    out = np.full_like(close, np.nan)
+    if horizon < len(close):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+
+def evaluate_signals(close, volume, params=None, horizons=DEFAULT_HORIZONS):
+    """Statistik per sinyal dan horizon: jumlah, frekuensi, hit rate dan forward return."""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    masks = compute_signal_masks(close, volume, params)
+    valid_bars = int(np.isfinite(close).sum())
+    returns = {h: forward_returns(close, h) for h in horizons}
+
+    rows = []
+    for signal, mask in masks.items():
+        direction = SIGNAL_DIRECTIONS[signal]
+        count = int(mask.sum())
+        for h, fwd in returns.items():
+            r = fwd[mask]
+            r = r[np.isfinite(r)]
+            rows.append({
+                'signal': signal,
+                'horizon': h,
+                'signals': count,
+                'pairs_with_signal': int(mask.any(axis=0).sum()),
+                'frequency_per_1000_bars': count / valid_bars * 1000 if valid_bars else 0.0,
+                'evaluated': len(r),
+                'hit_rate': float((direction * r > 0).mean()) if len(r) else np.nan,
+                'mean_return_pct': float(r.mean() * 100) if len(r) else np.nan,
+                'median_return_pct': float(np.median(r) * 100) if len(r) else np.nan,
+                'mean_directional_return_pct': float((direction * r).mean() * 100) if len(r) else np.nan,
+            })
+    return pd.DataFrame(rows)
+
+
+# === Sweep parameter paralel ===
+_worker_data = {}
+
+def _init_sweep_worker(close, volume, horizons):
+    _worker_data.update(close=close, volume=volume, horizons=horizons)
+
+
+def _run_sweep_combo(params):
+    report = evaluate_signals(_worker_data['close'], _worker_data['volume'], params, _worker_data['horizons'])
+    for key, value in params.items():
+        report[key] = value
+    return report
+
+
+def expand_grid(grid):
+    """{'rsi_window': [7, 14], 'bb_dev': [2, 2.5]} -> list dict kombinasi parameter."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_parameter_sweep(close, volume, grid, horizons=DEFAULT_HORIZONS, max_workers=None):
+    """Evaluasi setiap kombinasi parameter di `grid` secara paralel antar core.
+
+    Matriks close/volume dikirim sekali per proses worker (initializer), bukan
+    per kombinasi. Mengembalikan satu DataFrame dengan kolom parameter.
+    """
+    combos = expand_grid(grid)
+    if not combos:
+        return pd.DataFrame()
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(combos) == 1:
+        _init_sweep_worker(close, volume, horizons)
+        reports = [_run_sweep_combo(params) for params in combos]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(combos)), initializer=_init_sweep_worker,
+                                 initargs=(close, volume, horizons)) as executor:
+            reports = list(executor.map(_run_sweep_combo, combos))
+    return pd.concat(reports, ignore_index=True)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.backtest",
+        description="Backtest aturan sinyal atas riwayat candle di arsip lokal."
+    )
+    parser.add_argument("--tf", default='1h', help="timeframe candle, mis. 1h atau 15min")
+    parser.add_argument("--pairs", nargs="*", help="daftar pair (default: semua pair di trade store)")
+    parser.add_argument("--max-bars", type=int, help="hanya pakai N bar terakhir per pair")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(DEFAULT_HORIZONS))
+    parser.add_argument("--sweep", action="append", default=[], metavar="PARAM=V1,V2",
+                        help="parameter yang di-sweep, mis. rsi_oversold=20,25,30 (boleh berulang)")
+    parser.add_argument("--workers", type=int, help="jumlah proses untuk sweep (default: jumlah core)")
+    parser.add_argument("--output", help="simpan hasil ke file CSV")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    pairs, close, volume = load_candle_matrix(args.pairs, args.tf, args.max_bars)
+    if not pairs:
+        logger.error("Tidak ada riwayat candle tersimpan untuk di-backtest.")
+        return 1
+    logger.info(f"Backtest {len(pairs)} pair x {close.shape[0]} bar ({args.tf}).")
+
+    grid = {}
+    for item in args.sweep:
+        key, _, values = item.partition("=")
+        if key not in DEFAULT_BACKTEST_PARAMS:
+            logger.error(f"Parameter sweep tidak dikenal: {key}")
+            return 1
+        grid[key] = [float(v) if "." in v else int(v) for v in values.split(",") if v]
+
+    if grid:
+        report = run_parameter_sweep(close, volume, grid, args.horizons, args.workers)
+    else:
+        report = evaluate_signals(close, volume, horizons=args.horizons)
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        logger.info(f"Hasil backtest disimpan ke {args.output}")
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(report.round(3).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+import logging
+import threading
+import numpy as np
+
+from modules.file_lock import exclusive_lock
+
+logger = logging.getLogger(__name__)
+
+CANDLE_ARCHIVE_DIR = os.path.join("data", "candles")
+
+# Satu record fixed-width per candle (urut timestamp naik); dibaca lewat np.memmap.
+CANDLE_RECORD_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+# ts penanda bar yang sudah tidak valid di ekor file (nilai maksimum, sehingga kolom ts tetap urut).
+STALE_TS = np.iinfo(np.int64).max
+
+
+class CandleArchive:
+    """Arsip candle satu pair+timeframe dalam file biner fixed-width di disk.
+
+    Candle bisa dibaca tanpa salinan melalui np.memmap. Update hanya menulis
+    ulang ekor arsip mulai dari bar pertama yang berubah (biasanya bar
+    terakhir yang belum close). File tidak pernah dipendekkan saat dipakai,
+    sehingga view memmap yang sedang dibaca (juga di proses lain) tetap aman:
+    jika arsip menyusut, bar lama di ekor ditimpa record bertanda STALE_TS dan
+    panjang logis arsip berakhir di record bertanda pertama.
+    """
+
+    def __init__(self, pair, seconds, directory=CANDLE_ARCHIVE_DIR):
+        self.pair = pair
+        self.seconds = seconds
+        self.path = os.path.join(directory, pair, f"{seconds}s.candles")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._repair_tail()
+        self._size = self._file_size()
+
+    def _repair_tail(self):
+        # Buang record terakhir yang terpotong (mis. proses mati saat menulis).
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f, exclusive_lock(f):
+            # Di bawah kunci: penulis di proses lain sudah selesai, ekor yang tersisa benar-benar terpotong.
+            size = os.fstat(f.fileno()).st_size
+            extra = size % CANDLE_RECORD_DTYPE.itemsize
+            if extra:
+                logger.warning(f"Arsip candle {self.pair} ({self.seconds}s): membuang {extra} byte record yang tidak lengkap.")
+                f.truncate(size - extra)
+
+    def _file_size(self):
+        # Jumlah record utuh di file; proses lain (dashboard/daemon scanner) bisa ikut menulis arsip.
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // CANDLE_RECORD_DTYPE.itemsize
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records())
+
+    def _records(self):
+        # Panjang logis dibaca ulang dari file setiap kali: ukuran file lalu ekor bertanda STALE_TS.
+        count = self._file_size()
+        if count == 0:
+            self._size = 0
+            return np.empty(0, dtype=CANDLE_RECORD_DTYPE)
+        records = np.memmap(self.path, dtype=CANDLE_RECORD_DTYPE, mode="r", shape=(count,))
+        if records["ts"][-1] == STALE_TS:
+            records = records[:int(np.searchsorted(records["ts"], STALE_TS, side="left"))]
+        self._size = len(records)
+        return records
+
+    @property
+    def last_ts(self):
+        """Timestamp (detik epoch) awal candle terakhir, None jika arsip kosong."""
+        with self._lock:
+            records = self._records()
+            return int(records["ts"][-1]) if len(records) else None
+
+    def read(self, since=None, limit=None):
+        """Record candle (view memmap) dengan ts >= since, dibatasi `limit` candle terakhir."""
+        with self._lock:
+            records = self._records()
+        if since is not None:
+            records = records[np.searchsorted(records["ts"], since, side="left"):]
+        if limit:
+            records = records[-limit:]
+        return records
+
+    def write_from(self, records):
+        """Timpa arsip mulai dari ts record pertama dengan `records` (urut ts naik)."""
+        if len(records) == 0:
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._lock, os.fdopen(fd, "r+b") as f, exclusive_lock(f):
+            # Posisi tulis dihitung dari isi file di bawah kunci, bukan dari ukuran yang diingat proses ini.
+            existing = self._records()
+            pos = int(np.searchsorted(existing["ts"], records["ts"][0], side="left"))
+            del existing
+            end = pos + len(records)
+            f.seek(pos * CANDLE_RECORD_DTYPE.itemsize)
+            f.write(np.ascontiguousarray(records, dtype=CANDLE_RECORD_DTYPE).tobytes())
+            if end < self._size:
+                # Bar lama di belakang data baru tidak lagi valid (jarang: trade dihapus). File tidak
+                # dipotong agar memmap yang sedang dibaca tidak SIGBUS; bar itu ditandai STALE_TS.
+                logger.warning(f"Arsip candle {self.pair} ({self.seconds}s): menandai {self._size - end} bar lama tidak valid.")
+                stale = np.zeros(self._size - end, dtype=CANDLE_RECORD_DTYPE)
+                stale["ts"] = STALE_TS
+                f.write(stale.tobytes())
+            f.flush()
+            self._size = end
@@ -0,0 +1,163 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+from modules.trades import OHLCV_COLUMNS, timeframe_seconds, normalize_timeframe
+from modules.trade_store import get_trade_store
+from modules.candle_archive import CandleArchive, CANDLE_ARCHIVE_DIR, CANDLE_RECORD_DTYPE
+
+logger = logging.getLogger(__name__)
+
+BASE_TIMEFRAME = '1min'
+BASE_TIMEFRAME_SECONDS = 60
+
+
+def _aggregate(ts, opens, highs, lows, closes, volumes, seconds):
+    """Gabungkan bar (atau trade dengan o=h=l=c=harga) ke bucket `seconds`; bucket kosong dilewati."""
+    if len(ts) == 0:
+        return np.empty(0, dtype=CANDLE_RECORD_DTYPE)
+    buckets = ts - ts % seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    out = np.empty(len(starts), dtype=CANDLE_RECORD_DTYPE)
+    out["ts"] = buckets[starts]
+    out["open"] = opens[starts]
+    out["high"] = np.maximum.reduceat(highs, starts)
+    out["low"] = np.minimum.reduceat(lows, starts)
+    out["close"] = closes[ends]
+    out["volume"] = np.add.reduceat(volumes, starts)
+    return out
+
+
+def _aggregate_records(records, seconds):
+    return _aggregate(records["ts"], records["open"], records["high"], records["low"],
+                      records["close"], records["volume"], seconds)
+
+
+def _to_frame(records):
+    return pd.DataFrame({
+        'date': pd.to_datetime(records["ts"], unit='s'),
+        'open': records["open"],
+        'high': records["high"],
+        'low': records["low"],
+        'close': records["close"],
+        'volume': records["volume"],
+    }, columns=OHLCV_COLUMNS)
+
+
+class CandleSeries:
+    """Candle multi-timeframe satu pair yang diturunkan dari satu seri bar dasar 1 menit.
+
+    Bar dasar dan setiap timeframe turunan (5min, 1H, 1D, ...) disimpan di
+    arsip candle on-disk (CandleArchive). Saat dibuka, arsip hanya mengejar
+    ketertinggalan dari bar terakhirnya; setelah itu hanya trade baru yang
+    diagregasi dan hanya bucket yang tersentuh (biasanya bar terakhir yang
+    belum selesai) yang ditulis ulang. Restart dan lookback panjang dilayani
+    dari arsip tanpa membaca ulang seluruh trade.
+    """
+
+    def __init__(self, pair, store=None, directory=CANDLE_ARCHIVE_DIR):
+        self.pair = pair
+        self.store = store if store is not None else get_trade_store(pair)
+        self.directory = directory
+        self._base = CandleArchive(pair, BASE_TIMEFRAME_SECONDS, directory)
+        self._derived = {}  # detik -> CandleArchive
+        self._last_tid = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Serap trade baru dari store. Mengembalikan True jika ada bar yang berubah."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self):
+        if self.store.last_tid == self._last_tid:
+            return False
+
+        last_base = self._base.last_ts
+        if self._last_tid == 0 or last_base is None:
+            # Pertama kali dibuka: kejar ketertinggalan dari bar terakhir arsip (atau bangun penuh).
+            changed_from = last_base or 0
+        else:
+            # Trade baru dipilih lewat tid, bukan date: trade terlambat (date sebelum bar dasar
+            # terakhir) tetap terbaca dan bar dibangun ulang mulai dari bucket-nya.
+            new = self.store.snapshot(after_tid=self._last_tid)
+            if new.empty:
+                self._last_tid = self.store.last_tid
+                return False
+            oldest = int(new.timestamps.min())
+            changed_from = min(oldest - oldest % BASE_TIMEFRAME_SECONDS, last_base)
+
+        last_tid = self.store.last_tid
+        snapshot = self.store.snapshot(since=changed_from)
+        self._last_tid = max(last_tid, int(snapshot.tids.max()) if not snapshot.empty else 0)
+        if snapshot.empty:
+            return False
+        prices = snapshot.prices
+        self._base.write_from(_aggregate(snapshot.timestamps, prices, prices, prices, prices,
+                                         snapshot.amounts, BASE_TIMEFRAME_SECONDS))
+
+        for archive in self._derived.values():
+            self._rebuild_from(archive, changed_from)
+        return True
+
+    def _rebuild_from(self, archive, start_ts):
+        bucket_start = start_ts - start_ts % archive.seconds
+        archive.write_from(_aggregate_records(self._base.read(since=bucket_start), archive.seconds))
+
+    def _archive_for(self, seconds):
+        if seconds == BASE_TIMEFRAME_SECONDS:
+            return self._base
+        archive = self._derived.get(seconds)
+        if archive is None:
+            archive = CandleArchive(self.pair, seconds, self.directory)
+            # Kejar ketertinggalan dari bar terakhir arsip (atau bangun penuh jika arsip baru).
+            self._rebuild_from(archive, archive.last_ts or 0)
+            self._derived[seconds] = archive
+        return archive
+
+    def ohlcv(self, tf='5min', limit=None):
+        """DataFrame OHLCV (kolom date, open, high, low, close, volume) untuk timeframe tf."""
+        seconds = timeframe_seconds(tf)
+        if seconds is not None and seconds % BASE_TIMEFRAME_SECONDS:
+            # Lebih halus dari bar dasar: agregasi langsung dari trade.
+            return self.store.snapshot().ohlcv(tf, limit=limit)
+
+        with self._lock:
+            self._refresh_locked()
+            if len(self._base) == 0:
+                return pd.DataFrame()
+            if seconds is None:
+                frame = self._resample(_to_frame(self._base.read()), tf)
+                return frame.tail(limit).reset_index(drop=True) if limit else frame
+            return _to_frame(self._archive_for(seconds).read(limit=limit))
+
+    def records(self, tf='1H', since=None, limit=None):
+        """Record candle arsip (view memmap, tanpa salinan) untuk timeframe berpanjang tetap."""
+        seconds = timeframe_seconds(tf)
+        if seconds is None or seconds % BASE_TIMEFRAME_SECONDS:
+            raise ValueError(f"Timeframe {tf} tidak didukung arsip candle")
+        with self._lock:
+            self._refresh_locked()
+            return self._archive_for(seconds).read(since=since, limit=limit)
+
+    @staticmethod
+    def _resample(frame, tf):
+        # Timeframe kalender (mis. bulanan) tidak punya panjang tetap.
+        ohlc = frame.set_index('date').resample(normalize_timeframe(tf)).agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        ).dropna(subset=['open'])
+        return ohlc.reset_index()
+
+
+_series = {}
+_series_lock = threading.Lock()
+
+# Fungsi untuk mendapatkan CandleSeries bersama untuk satu pair
+def get_candle_series(pair):
+    with _series_lock:
+        series = _series.get(pair)
+        if series is None:
+            series = _series[pair] = CandleSeries(pair)
+        return series
@@ -0,0 +1,237 @@
+"""Figure Plotly untuk dashboard dengan downsampling di sisi server.
+
+Riwayat panjang (mis. bar 1 menit selama berminggu-minggu) tidak dikirim
+utuh ke browser: candle digabung per bucket dengan OHLC tetap utuh
+(open pertama, high maks, low min, close terakhir, volume dijumlah) dan
+garis indikator dipangkas dengan LTTB (Largest-Triangle-Three-Buckets)
+hingga kira-kira selebar piksel chart. Semua trace dikirim sebagai array
+NumPy sehingga Plotly menyerialisasinya sebagai typed array base64, dan
+sumbu waktu memakai epoch milidetik (float64) alih-alih string tanggal.
+"""
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PIXEL_WIDTH = 1600  # lebar plot kira-kira pada layout wide Streamlit di layar 1080p
+PIXELS_PER_CANDLE = 3  # candle lebih sempit dari ini tidak terbaca (body + wick)
+
+
+# Fungsi untuk mengubah kolom tanggal menjadi epoch milidetik (float64) untuk sumbu tanggal Plotly
+def to_epoch_ms(dates):
+    values = np.asarray(dates)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+# Fungsi untuk menggabungkan candle menjadi paling banyak max_buckets bucket berisi jumlah bar yang sama
+def downsample_ohlc(x, open_, high, low, close, volume, max_buckets):
+    """Kembalikan dict array x/open/high/low/close/volume; high/low/volume tiap bucket tetap akurat."""
+    n = len(x)
+    if n <= max_buckets:
+        return {"x": x, "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+    starts = np.linspace(0, n, max_buckets, endpoint=False).astype(np.int64)
+    ends = np.r_[starts[1:], n] - 1
+    return {
+        "x": x[starts],
+        "open": open_[starts],
+        "high": np.fmax.reduceat(high, starts),
+        "low": np.fmin.reduceat(low, starts),
+        "close": close[ends],
+        "volume": np.add.reduceat(np.nan_to_num(volume), starts),
+    }
+
+
+# Fungsi untuk memilih indeks titik garis dengan algoritma LTTB
+def lttb_indices(x, y, n_out):
+    """Indeks n_out titik yang paling mempertahankan bentuk visual garis (x, y).
+
+    Titik NaN (mis. masa pemanasan indikator) dilewati; titik pertama dan
+    terakhir yang valid selalu ikut.
+    """
+    valid = np.flatnonzero(np.isfinite(y))
+    n = len(valid)
+    if n_out >= n or n_out < 3:
+        return valid
+    xs, ys = x[valid], y[valid]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    # Rata-rata tiap bucket dihitung sekaligus; bucket "berikutnya" untuk bucket terakhir adalah titik terakhir.
+    counts = np.diff(np.r_[edges, n])
+    avg_x = np.add.reduceat(xs, edges) / counts
+    avg_y = np.add.reduceat(ys, edges) / counts
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Luas segitiga (titik terpilih sebelumnya, kandidat, rata-rata bucket berikutnya); faktor 1/2 diabaikan.
+        area = np.abs((xs[a] - avg_x[i + 1]) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (avg_y[i + 1] - ys[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return valid[selected]
+
+
+# Fungsi untuk memotong data ke rentang waktu yang terlihat (epoch ms, inklusif)
+def _visible_slice(x, x_range):
+    if x_range is None:
+        return slice(0, len(x))
+    start = int(np.searchsorted(x, x_range[0], side="left"))
+    end = int(np.searchsorted(x, x_range[1], side="right"))
+    return slice(start, max(end, start + 1))
+
+
+def _column(df, name, sl):
+    return df[name].to_numpy(dtype=np.float64)[sl]
+
+
+def prepare_chart_data(df, line_columns=(), paired_columns=None, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    """Data chart siap pakai dari DataFrame candle + indikator.
+
+    Candle digabung hingga pixel_width / PIXELS_PER_CANDLE bucket dan setiap
+    kolom di line_columns dipangkas dengan LTTB hingga pixel_width titik.
+    paired_columns ({kolom: kolom_acuan}) memakai indeks LTTB kolom acuan,
+    mis. BB lower mengikuti BB upper agar area fill di antaranya tetap sejajar.
+    """
+    dates = df['date'] if 'date' in df.columns else df.index
+    x_all = to_epoch_ms(dates)
+    sl = _visible_slice(x_all, x_range)
+    x = x_all[sl]
+    data = {
+        "n_source": len(x),
+        "candles": downsample_ohlc(
+            x, _column(df, 'open', sl), _column(df, 'high', sl), _column(df, 'low', sl),
+            _column(df, 'close', sl), _column(df, 'volume', sl), max(1, pixel_width // PIXELS_PER_CANDLE)
+        ),
+        "lines": {},
+    }
+    data["bars_per_candle"] = max(1, len(x) // max(1, len(data["candles"]["x"])))
+    paired_columns = paired_columns or {}
+    indices = {}
+    for col in line_columns:
+        if col not in df.columns:
+            continue
+        y = _column(df, col, sl)
+        reference = paired_columns.get(col)
+        if reference in indices:
+            idx = indices[reference]
+        else:
+            idx = indices[col] = lttb_indices(x, y, pixel_width)
+        data["lines"][col] = (x[idx], y[idx])
+    return data
+
+
+# Fungsi untuk menyiapkan data chart candlestick dashboard (candle + SMA 50 + Bollinger Bands)
+def prepare_candlestick_data(df, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    return prepare_chart_data(df, line_columns=('sma_50', 'bb_upper', 'bb_lower'),
+                              paired_columns={'bb_lower': 'bb_upper'}, x_range=x_range, pixel_width=pixel_width)
+
+
+# Fungsi untuk menerapkan bar live (delta dari feed) ke data chart yang sudah disiapkan
+def apply_live_bars(data, bars):
+    """Salinan `data` dengan bar live (dict ts/open/high/low/close/volume, ts epoch ms) diterapkan.
+
+    Tanpa downsampling, bar dengan ts sama dengan candle terakhir menggantikannya
+    dan bar yang lebih baru ditambahkan. Jika candle sudah digabung per bucket,
+    bar live digabung ke bucket terakhir (high maks, low min, close terakhir,
+    volume dijumlah) agar jumlah candle yang dikirim tetap sama.
+
+    Bar dengan ts sama adalah versi berbeda dari bar yang sama; hanya yang
+    terakhir di `bars` dipakai agar volumenya tidak terhitung dua kali.
+    """
+    if not bars:
+        return data
+    latest = {}
+    for bar in bars:
+        latest[bar["ts"]] = bar
+    candles = {key: np.array(values, dtype=np.float64) for key, values in data["candles"].items()}
+    merge = data["bars_per_candle"] > 1
+    for bar in sorted(latest.values(), key=lambda b: b["ts"]):
+        last_x = candles["x"][-1] if len(candles["x"]) else None
+        if last_x is not None and bar["ts"] < last_x:
+            continue
+        if last_x is not None and merge:
+            candles["high"][-1] = max(candles["high"][-1], bar["high"])
+            candles["low"][-1] = min(candles["low"][-1], bar["low"])
+            candles["close"][-1] = bar["close"]
+            candles["volume"][-1] += bar["volume"]
+            continue
+        if last_x is not None and bar["ts"] == last_x:
+            for key in ("open", "high", "low", "close", "volume"):
+                candles[key][-1] = bar[key]
+            continue
+        for key, value in (("x", bar["ts"]), ("open", bar["open"]), ("high", bar["high"]),
+                           ("low", bar["low"]), ("close", bar["close"]), ("volume", bar["volume"])):
+            candles[key] = np.append(candles[key], value)
+    return {**data, "candles": candles}
+
+
+# Fungsi untuk membangun figure candlestick + volume + SMA/BB seperti di dashboard
+def candlestick_figure(df, title, height, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    return build_candlestick_figure(prepare_candlestick_data(df, x_range=x_range, pixel_width=pixel_width), title, height)
+
+
+# Fungsi untuk membangun figure candlestick dari data hasil prepare_candlestick_data / apply_live_bars
+def build_candlestick_figure(data, title, height):
+    import plotly.graph_objs as go
+
+    candles, lines = data["candles"], data["lines"]
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=candles["x"], open=candles["open"], high=candles["high"], low=candles["low"], close=candles["close"],
+        name='Candlestick', increasing_line_color='green', decreasing_line_color='red'
+    ))
+    fig.add_trace(go.Bar(
+        x=candles["x"], y=candles["volume"],
+        name='Volume', marker_color='rgba(0,100,255,0.3)', yaxis='y2'
+    ))
+    if 'sma_50' in lines:
+        fig.add_trace(go.Scatter(x=lines['sma_50'][0], y=lines['sma_50'][1], mode='lines', name='SMA 50', line=dict(color='orange')))
+    if 'bb_upper' in lines and 'bb_lower' in lines:
+        fig.add_trace(go.Scatter(x=lines['bb_upper'][0], y=lines['bb_upper'][1], mode='lines', name='BB Upper', line=dict(color='rgba(173,216,230,0.5)', dash='dot')))
+        fig.add_trace(go.Scatter(x=lines['bb_lower'][0], y=lines['bb_lower'][1], mode='lines', name='BB Lower', line=dict(color='rgba(173,216,230,0.5)', dash='dot'), fill='tonexty', fillcolor='rgba(173,216,230,0.1)'))
+
+    if data["bars_per_candle"] > 1:
+        title = f"{title} · 1 candle ≈ {data['bars_per_candle']} bar"
+    fig.update_layout(
+        title=title,
+        xaxis_rangeslider_visible=False,
+        template="plotly_dark",
+        height=height,
+        xaxis=dict(type='date', title="Waktu"),
+        yaxis_title="Harga",
+        yaxis=dict(domain=[0.3, 1]),
+        yaxis2=dict(domain=[0, 0.25], title="Volume", showgrid=False),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor='rgba(17,17,17,0.9)', paper_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
+
+
+# Fungsi untuk membangun figure analisis teknikal cepat (candlestick + SMA + RSI)
+def technical_figure(df, pair_symbol, x_range=None, pixel_width=DEFAULT_PIXEL_WIDTH):
+    import plotly.graph_objs as go
+
+    data = prepare_chart_data(df, line_columns=('sma', 'rsi'), x_range=x_range, pixel_width=pixel_width)
+    candles, lines = data["candles"], data["lines"]
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=candles["x"], open=candles["open"], high=candles["high"], low=candles["low"], close=candles["close"],
+        name='Candlestick'
+    ))
+    if 'sma' in lines:
+        fig.add_trace(go.Scatter(x=lines['sma'][0], y=lines['sma'][1], name='SMA', line=dict(color='orange')))
+    if 'rsi' in lines:
+        fig.add_trace(go.Scatter(x=lines['rsi'][0], y=lines['rsi'][1], name='RSI', yaxis='y2', line=dict(color='purple')))
+
+    fig.update_layout(
+        title=f'Analisis Teknikal {pair_symbol.upper()}',
+        xaxis=dict(type='date'),
+        yaxis_title='Harga',
+        yaxis2=dict(title='RSI', overlaying='y', side='right', showgrid=False),
+        xaxis_rangeslider_visible=False,
+        template="plotly_dark",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
@@ -0,0 +1,19 @@
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa kunci antar proses, jalankan hanya satu penulis per direktori data
+    fcntl = None
+
+
+# Fungsi untuk mengunci file secara eksklusif antar proses (dashboard dan daemon scanner) selama blok berjalan
+@contextlib.contextmanager
+def exclusive_lock(f):
+    if fcntl is None:
+        yield f
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield f
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -1,11 +1,29 @@
 import ta
 import pandas as pd
+import numpy as np
 import logging
+import threading
+from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
+
+from modules.ring_buffer import CandleRingBuffer
+from utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
-def apply_indicators(df):
+# Parameter sama dengan default `ta` yang dipakai apply_indicators.
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_WINDOW = 14
+BB_WINDOW, BB_DEV = 20, 2
+VOLUME_SMA_WINDOW = 20
+
+# Backend default apply_indicators: "ta" (library ta) atau "numpy" (compute_indicators_np)
+INDICATOR_BACKEND = "ta"
+
+@timed("indicators.batch")
+def apply_indicators(df, backend=None):
     """Menerapkan indikator teknikal pada DataFrame candlestick."""
+    backend = backend or INDICATOR_BACKEND
     try:
         if df.empty:
             logger.warning("DataFrame kosong diterima")
@@ -16,6 +34,13 @@ def apply_indicators(df):
             logger.error(f"Kolom yang diperlukan tidak ada: {required_columns}")
             return df
 
+        if backend == "numpy":
+            values = compute_indicators_np(df['close'].to_numpy(dtype=np.float64),
+                                           df['volume'].to_numpy(dtype=np.float64))
+            for col, arr in values.items():
+                df[col] = arr
+            return df
+
         # MACD Indicators
         df['macd'] = ta.trend.macd(df['close'])
         df['macd_signal'] = ta.trend.macd_signal(df['close'])
@@ -37,3 +62,297 @@ def apply_indicators(df):
     except Exception as e:
         logger.error(f"Error dalam apply_indicators: {str(e)}", exc_info=True)
         return df
+
+
+# === Backend NumPy tervektorisasi ===
+def compute_indicators_np(close, volume):
+    """Hitung semua indikator dalam satu lintasan atas array float64.
+
+    close dan volume boleh 1-D (bars) atau 2-D (pairs x bars) sehingga satu
+    panggilan bisa mencakup semua pair sekaligus. EMA cepat/lambat, garis
+    sinyal dan rata-rata Wilder RSI dihitung bersama dalam satu loop atas bar,
+    sedangkan jendela rolling 20 bar dipakai bersama untuk mean dan std BB.
+    Hasilnya setara dengan backend `ta` (termasuk periode warm-up NaN).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    n = close.shape[-1]
+    nan = np.nan
+
+    diff = np.zeros_like(close)
+    diff[..., 1:] = close[..., 1:] - close[..., :-1]
+    up = np.maximum(diff, 0.0)
+    down = np.maximum(-diff, 0.0)
+
+    a_fast, a_slow, a_sig = 2 / (MACD_FAST + 1), 2 / (MACD_SLOW + 1), 2 / (MACD_SIGNAL + 1)
+    a_rsi = 1 / RSI_WINDOW
+    macd = np.full_like(close, nan)
+    macd_signal = np.full_like(close, nan)
+    avg_up = np.empty_like(close)
+    avg_down = np.empty_like(close)
+
+    if n:
+        # Iterasi per bar; untuk 1-D memakai float Python agar overhead skalar NumPy hilang,
+        # untuk 2-D setiap langkah memproses semua pair sekaligus (transpose = view per bar).
+        cols = (lambda a: a.tolist()) if close.ndim == 1 else (lambda a: a.T)
+        xs, ups, downs = cols(close), cols(up), cols(down)
+        macd_t, signal_t, avg_up_t, avg_down_t = macd.T, macd_signal.T, avg_up.T, avg_down.T
+        ema_fast = ema_slow = xs[0]
+        up_t, down_t = ups[0], downs[0]
+        signal = None
+        avg_up_t[0], avg_down_t[0] = up_t, down_t
+        for t in range(1, n):
+            x = xs[t]
+            ema_fast = ema_fast + a_fast * (x - ema_fast)
+            ema_slow = ema_slow + a_slow * (x - ema_slow)
+            up_t = up_t + a_rsi * (ups[t] - up_t)
+            down_t = down_t + a_rsi * (downs[t] - down_t)
+            avg_up_t[t], avg_down_t[t] = up_t, down_t
+            if t >= MACD_SLOW - 1:
+                m = ema_fast - ema_slow
+                macd_t[t] = m
+                signal = m if signal is None else signal + a_sig * (m - signal)
+                if t >= MACD_SLOW + MACD_SIGNAL - 2:
+                    signal_t[t] = signal
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+    rsi[..., :RSI_WINDOW - 1] = nan
+
+    bb_mean = np.full_like(close, nan)
+    bb_std = np.full_like(close, nan)
+    if n >= BB_WINDOW:
+        windows = sliding_window_view(close, BB_WINDOW, axis=-1)
+        bb_mean[..., BB_WINDOW - 1:] = windows.mean(axis=-1)
+        bb_std[..., BB_WINDOW - 1:] = windows.std(axis=-1)
+
+    volume_sma = np.full_like(volume, nan)
+    if n >= VOLUME_SMA_WINDOW:
+        volume_sma[..., VOLUME_SMA_WINDOW - 1:] = sliding_window_view(volume, VOLUME_SMA_WINDOW, axis=-1).mean(axis=-1)
+
+    return {
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd - macd_signal,
+        'volume_sma_20': volume_sma,
+        'volume_spike': (volume > 2 * volume_sma).astype(int),
+        'rsi': rsi,
+        'bb_upper': bb_mean + BB_DEV * bb_std,
+        'bb_lower': bb_mean - BB_DEV * bb_std,
+    }
+
+
+# === Mesin indikator inkremental ===
+INDICATOR_COLUMNS = ['macd', 'macd_signal', 'macd_histogram', 'volume_sma_20',
+                     'volume_spike', 'rsi', 'bb_upper', 'bb_lower']
+BUFFER_COLUMNS = ['open', 'high', 'low', 'close', 'volume'] + INDICATOR_COLUMNS
+INDICATOR_BUFFER_BARS = 1024  # kapasitas default ring buffer per pair+timeframe
+
+
+class IncrementalIndicators:
+    """Indikator MACD, RSI, Bollinger Bands dan volume SMA yang diperbarui per bar.
+
+    State EMA/Wilder dan jendela rolling disimpan sehingga bar baru (atau revisi
+    bar terakhir yang belum close) cukup diproses dalam O(1), tanpa menghitung
+    ulang seluruh DataFrame. Hasilnya setara dengan apply_indicators (batch `ta`).
+    OHLCV dan hasil indikator `max_bars` bar terakhir disimpan di `buffer`
+    (CandleRingBuffer) yang dialokasikan sekali.
+    """
+
+    def __init__(self, max_bars=INDICATOR_BUFFER_BARS):
+        self.max_bars = max_bars
+        self.buffer = None
+        self.reset()
+
+    def reset(self):
+        self._committed = self._initial_state()
+        self._state = self._committed
+        self._last_ts = None
+        if self.buffer is not None and self.buffer.capacity == self.max_bars:
+            self.buffer.clear()
+        else:
+            self.buffer = None  # dibuat saat bar pertama, mengikuti tipe timestamp
+
+    @staticmethod
+    def _initial_state():
+        return {
+            'count': 0, 'ema_fast': None, 'ema_slow': None,
+            'macd_count': 0, 'signal': None,
+            'prev_close': None, 'avg_up': None, 'avg_down': None,
+            'closes': deque(maxlen=BB_WINDOW), 'volumes': deque(maxlen=VOLUME_SMA_WINDOW),
+        }
+
+    @staticmethod
+    def _ema(prev, value, alpha):
+        return value if prev is None else prev + alpha * (value - prev)
+
+    def _step(self, prev, close, volume):
+        state = dict(prev)
+        state['closes'] = deque(prev['closes'], maxlen=BB_WINDOW)
+        state['volumes'] = deque(prev['volumes'], maxlen=VOLUME_SMA_WINDOW)
+        state['count'] += 1
+        n = state['count']
+        nan = float('nan')
+
+        # MACD (EMA adjust=False, sama seperti ta.trend)
+        state['ema_fast'] = self._ema(prev['ema_fast'], close, 2 / (MACD_FAST + 1))
+        state['ema_slow'] = self._ema(prev['ema_slow'], close, 2 / (MACD_SLOW + 1))
+        macd = macd_signal = nan
+        if n >= MACD_SLOW:
+            macd = state['ema_fast'] - state['ema_slow']
+            state['macd_count'] += 1
+            state['signal'] = self._ema(prev['signal'], macd, 2 / (MACD_SIGNAL + 1))
+            if state['macd_count'] >= MACD_SIGNAL:
+                macd_signal = state['signal']
+
+        # RSI (Wilder, alpha=1/window); bar pertama dianggap tanpa perubahan
+        diff = 0.0 if prev['prev_close'] is None else close - prev['prev_close']
+        alpha = 1 / RSI_WINDOW
+        state['avg_up'] = self._ema(prev['avg_up'], max(diff, 0.0), alpha)
+        state['avg_down'] = self._ema(prev['avg_down'], max(-diff, 0.0), alpha)
+        state['prev_close'] = close
+        rsi = nan
+        if n >= RSI_WINDOW:
+            rsi = 100.0 if state['avg_down'] == 0 else 100 - 100 / (1 + state['avg_up'] / state['avg_down'])
+
+        # Bollinger Bands & volume SMA (jendela tetap, std ddof=0)
+        state['closes'].append(close)
+        state['volumes'].append(volume)
+        bb_upper = bb_lower = volume_sma = nan
+        if len(state['closes']) == BB_WINDOW:
+            window = np.fromiter(state['closes'], dtype=float, count=BB_WINDOW)
+            mean, std = window.mean(), window.std()
+            bb_upper, bb_lower = mean + BB_DEV * std, mean - BB_DEV * std
+        if len(state['volumes']) == VOLUME_SMA_WINDOW:
+            volume_sma = sum(state['volumes']) / VOLUME_SMA_WINDOW
+
+        values = {
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd - macd_signal,
+            'volume_sma_20': volume_sma,
+            'volume_spike': int(volume > 2 * volume_sma),
+            'rsi': rsi,
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
+        }
+        return state, values
+
+    def update(self, timestamp, close, volume):
+        """Proses satu bar. Timestamp yang sama dengan bar terakhir dianggap revisi bar tersebut."""
+        if self._last_ts is not None and timestamp < self._last_ts:
+            raise ValueError(f"Bar {timestamp} lebih lama dari bar terakhir {self._last_ts}")
+
+        revise = timestamp == self._last_ts
+        if not revise:
+            self._committed = self._state
+        self._state, values = self._step(self._committed, float(close), float(volume))
+
+        if self.buffer is None:
+            self.buffer = CandleRingBuffer(self.max_bars, BUFFER_COLUMNS, np.asarray(timestamp).dtype)
+        row = dict(values, close=close, volume=volume)
+        if revise:
+            self.buffer.update_last(row)
+        else:
+            self.buffer.append(timestamp, row)
+        self._last_ts = timestamp
+        return values
+
+    def sync(self, df):
+        """Sinkronkan state dengan DataFrame candle dan kembalikan df berisi kolom indikator.
+
+        Hanya bar terakhir yang sudah dikenal (revisi) dan bar baru yang diproses;
+        jika df bukan kelanjutan dari riwayat sebelumnya, state dibangun ulang.
+        """
+        if df.empty:
+            return df
+        self.sync_buffer(df)
+        first_ts = df['date'].to_numpy()[0] if 'date' in df.columns else df.index.to_numpy()[0]
+        first = np.searchsorted(self.buffer.timestamps(), first_ts)
+        for col in INDICATOR_COLUMNS:
+            values = self.buffer.column(col)[first:first + len(df)]
+            df[col] = values.astype(int) if col == 'volume_spike' else values
+        return df
+
+    def sync_buffer(self, df):
+        """Sinkronkan state dengan DataFrame candle dan kembalikan ring buffer (tanpa menyalin ke df)."""
+        timestamps = df['date'].to_numpy() if 'date' in df.columns else df.index.to_numpy()
+        closes = df['close'].to_numpy(dtype=float)
+        volumes = df['volume'].to_numpy(dtype=float)
+        ohlc = {col: df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low') if col in df.columns}
+
+        if len(timestamps) > self.max_bars:
+            self.max_bars = len(timestamps)
+            self.reset()
+
+        start = 0
+        if self._last_ts is not None:
+            pos = np.searchsorted(timestamps, self._last_ts)
+            known = pos < len(timestamps) and timestamps[pos] == self._last_ts
+            covered = len(timestamps) and timestamps[0] >= self.buffer.timestamps()[0]
+            if known and covered:
+                start = pos
+            else:
+                self.reset()
+
+        for i in range(start, len(timestamps)):
+            self.update(timestamps[i], closes[i], volumes[i])
+            if ohlc:
+                self.buffer.update_last({col: values[i] for col, values in ohlc.items()})
+        return self.buffer
+
+
+_incremental_engines = {}
+_engine_locks = {}
+_incremental_lock = threading.Lock()
+
+def _get_engine(pair, tf):
+    key = (pair, tf)
+    with _incremental_lock:
+        engine = _incremental_engines.get(key)
+        if engine is None:
+            engine = _incremental_engines[key] = IncrementalIndicators()
+        return engine, _engine_locks.setdefault(key, threading.Lock())
+
+@timed("indicators.incremental")
+def apply_indicators_incremental(df, pair, tf):
+    """Seperti apply_indicators, tetapi memakai state inkremental per pair+timeframe."""
+    try:
+        if df.empty:
+            logger.warning("DataFrame kosong diterima")
+            return df
+
+        required_columns = ['close', 'volume']
+        if not all(col in df.columns for col in required_columns):
+            logger.error(f"Kolom yang diperlukan tidak ada: {required_columns}")
+            return df
+
+        engine, engine_lock = _get_engine(pair, tf)
+        with engine_lock:
+            return engine.sync(df)
+
+    except Exception as e:
+        logger.error(f"Error dalam apply_indicators_incremental: {str(e)}", exc_info=True)
+        return apply_indicators(df)
+
+
+@timed("indicators.incremental")
+def get_indicator_snapshot(df, pair, tf, n=2):
+    """Sinkronkan engine pair+timeframe dan kembalikan n bar terakhir sebagai dict kolom -> array.
+
+    Array dibaca langsung dari ring buffer engine lalu disalin hanya untuk n
+    bar tersebut (di bawah lock engine), sehingga jalur alert tidak perlu
+    membangun DataFrame indikator lengkap.
+    """
+    try:
+        if df.empty:
+            return {}
+        engine, engine_lock = _get_engine(pair, tf)
+        with engine_lock:
+            buffer = engine.sync_buffer(df)
+            snapshot = {col: buffer.column(col, n).copy() for col in buffer.columns}
+            snapshot['date'] = buffer.timestamps(n).copy()
+            return snapshot
+    except Exception as e:
+        logger.error(f"Error dalam get_indicator_snapshot: {str(e)}", exc_info=True)
+        return {}
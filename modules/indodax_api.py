@@ -1,17 +1,196 @@
+import os
 import requests
 import pandas as pd
 import json
 import logging
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from modules.trades import TradesSnapshot
+from modules.trade_store import get_trade_store
+from modules.candles import get_candle_series
+from utils import helpers
+from utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# Bisa diarahkan ke server lain (mis. benchmarks.replay_server) lewat env INDODAX_BASE_URL atau set_base_url().
+INDODAX_BASE_URL = os.environ.get("INDODAX_BASE_URL", "https://indodax.com/api").rstrip("/")
+
+# === Konfigurasi HTTP client bersama ===
+HTTP_CONNECT_TIMEOUT = 3.05  # detik
+HTTP_READ_TIMEOUT = 10  # detik
+HTTP_POOL_SIZE = 32  # koneksi keep-alive per host, cukup untuk worker auto-scan
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5  # jeda 0.5s, 1s, 2s antar percobaan
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+# Fungsi untuk membuat session HTTP dengan connection pooling dan retry
+def _build_session():
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=HTTP_MAX_RETRIES,
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUS,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        "User-Agent": "ReadOneTrade/1.0",
+    })
+    return session
+
+# Fungsi untuk mendapatkan session HTTP bersama (dibuat sekali per proses)
+def get_http_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+# === Cache respons bersama (TTL per endpoint + LRU) ===
+# Cache ini level modul sehingga dipakai bersama oleh semua sesi Streamlit
+# dan thread scheduler di proses yang sama.
+CACHE_TTL = {
+    "pairs": 6 * 3600,  # daftar pair jarang berubah
+    "tickers": 10,
+    "ticker": 5,
+    "trades": 15,
+}
+CACHE_MAX_ENTRIES = 1024
+PAIRS_CACHE_PATH = os.path.join("data", "cache", "pairs.json")  # salinan daftar pair untuk cold start
+
+
+class TTLCache:
+    """Cache LRU thread-safe dengan TTL per entri dan penghitung hit/miss per endpoint."""
+
+    def __init__(self, maxsize=CACHE_MAX_ENTRIES):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stats = {}
+
+    def _count(self, key, field):
+        endpoint = key[0] if isinstance(key, tuple) else key
+        stats = self._stats.setdefault(endpoint, {"hits": 0, "misses": 0, "evictions": 0})
+        stats[field] += 1
+
+    def get(self, key):
+        """Kembalikan (True, value) jika key ada dan belum kedaluwarsa, selain itu (False, None)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._count(key, "hits")
+                    return True, entry[1]
+                del self._data[key]
+            self._count(key, "misses")
+            return False, None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted_key, _ = self._data.popitem(last=False)
+                self._count(evicted_key, "evictions")
+
+    def get_or_load(self, key, ttl, loader):
+        """Ambil dari cache atau panggil loader(); hanya satu thread yang memuat key yang sama."""
+        found, value = self.get(key)
+        if found:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Thread lain mungkin sudah memuat key ini selama kita menunggu lock.
+            with self._lock:
+                entry = self._data.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    # Koreksi: permintaan ini akhirnya terlayani dari cache.
+                    stats = self._stats[key[0] if isinstance(key, tuple) else key]
+                    stats["misses"] -= 1
+                    stats["hits"] += 1
+                    return entry[1]
+            value = loader()
+            self.set(key, value, ttl)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._key_locks.clear()
+
+    def stats(self):
+        with self._lock:
+            per_endpoint = {k: dict(v) for k, v in self._stats.items()}
+            hits = sum(v["hits"] for v in per_endpoint.values())
+            misses = sum(v["misses"] for v in per_endpoint.values())
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "endpoints": per_endpoint,
+            }
+
+
+_response_cache = TTLCache()
+
+# Fungsi untuk melihat statistik cache respons (hit/miss per endpoint)
+def get_cache_stats():
+    return _response_cache.stats()
+
+# Fungsi untuk mengosongkan cache respons
+def clear_cache():
+    _response_cache.clear()
+
+# Fungsi untuk mengganti base URL API saat runtime; cache respons dikosongkan agar tidak tercampur
+def set_base_url(url):
+    global INDODAX_BASE_URL
+    INDODAX_BASE_URL = url.rstrip("/")
+    clear_cache()
+    logger.info(f"Base URL API diarahkan ke {INDODAX_BASE_URL}")
+
+# Fungsi untuk GET JSON dari endpoint Indodax melalui session bersama
+def _fetch_json(path):
+    url = f"{INDODAX_BASE_URL}/{path}"
+    with timed(f"api.{path.rsplit('/', 1)[-1]}"):
+        response = get_http_session().get(url, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+        response.raise_for_status()
+        return response.json()
+
+# Fungsi untuk GET JSON dengan cache TTL sesuai jenis endpoint.
+# Hasil dari cache dipakai bersama, jadi jangan dimodifikasi oleh pemanggil.
+def _get_json(path, endpoint):
+    return _response_cache.get_or_load((endpoint, path), CACHE_TTL[endpoint], lambda: _fetch_json(path))
+
 # Fungsi untuk mendapatkan summary dari pair tertentu
 def get_indodax_summary(pair):
-    url = f"https://indodax.com/api/{pair}/ticker"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        json_data = response.json()
+        json_data = _get_json(f"{pair}/ticker", "ticker")
         if "ticker" not in json_data:
             raise ValueError(f"Pair '{pair}' tidak ditemukan atau tidak valid.")
         data = json_data["ticker"]
@@ -25,69 +204,114 @@ def get_indodax_summary(pair):
         logger.error(f"Gagal mengambil data ticker dari Indodax: {e}")
         raise RuntimeError from e
 
+# Fungsi untuk mendapatkan snapshot trades (sekali fetch & parse) dari pair tertentu
+def get_trades_snapshot(pair):
+    return _response_cache.get_or_load(
+        ("trades", f"{pair}/trades"), CACHE_TTL["trades"],
+        lambda: TradesSnapshot.from_json(pair, _fetch_json(f"{pair}/trades"))
+    )
+
+# Fungsi untuk mengambil /trades langsung tanpa menunggu TTL (dipakai live feed).
+# Hasilnya juga mengisi cache bersama sehingga pembaca lain mendapat snapshot terbaru.
+def fetch_trades_snapshot(pair):
+    snapshot = TradesSnapshot.from_json(pair, _fetch_json(f"{pair}/trades"))
+    _response_cache.set(("trades", f"{pair}/trades"), snapshot, CACHE_TTL["trades"])
+    return snapshot
+
+# Fungsi untuk poll /trades dan menyimpan trade baru (tid belum tersimpan) ke trade store lokal
+def ingest_trades(pair):
+    try:
+        added = get_trade_store(pair).append_snapshot(get_trades_snapshot(pair))
+        if added:
+            logger.debug(f"{added} trade baru disimpan untuk {pair}.")
+        return added
+    except Exception as e:
+        logger.error(f"Gagal menyimpan trade baru untuk {pair}: {e}")
+        return 0
+
 # Fungsi untuk mendapatkan volume perdagangan buy dan sell dari pair tertentu
 def get_trade_volume(pair):
-    url = f"https://indodax.com/api/{pair}/trades"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        trades = response.json()
-        df = pd.DataFrame(trades)
-        df["price"] = df["price"].astype(float)
-        df["amount"] = df["amount"].astype(float)
-        df["type"] = df["type"].astype(str)
-        buy_volume = df[df["type"] == "buy"]["amount"].sum()
-        sell_volume = df[df["type"] == "sell"]["amount"].sum()
-        return buy_volume, sell_volume
+        return get_trades_snapshot(pair).buy_sell_volume()
     except Exception as e:
         logger.error(f"Gagal mengambil data volume perdagangan: {e}")
         return 0, 0
 
 # Fungsi untuk memuat daftar pair yang tersedia di Indodax
 def load_indodax_pairs():
-    url = "https://indodax.com/api/tickers"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return sorted(data["tickers"].keys())
+        pairs = _response_cache.get_or_load(("pairs",), CACHE_TTL["pairs"], _fetch_pairs)
+        return list(pairs)
     except Exception as e:
         logger.error(f"Gagal mengambil daftar pair: {e}")
         return []
 
-# Fungsi untuk mendapatkan data candlestick (ohlc) dari pair tertentu
-def get_candlestick_data(pair, tf='5min'):
-    url = f"https://indodax.com/api/{pair}/trades"
+# Fungsi untuk mengambil daftar pair dari API dan menyimpan salinannya ke disk
+def _fetch_pairs():
+    pairs = sorted(_get_json("tickers", "tickers")["tickers"].keys())
+    _save_cached_pairs(pairs)
+    return pairs
+
+# Fungsi untuk membaca salinan daftar pair di disk; (pairs, umur detik) atau ([], None)
+def load_cached_pairs(path=PAIRS_CACHE_PATH):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        trades = response.json()
-        df = pd.DataFrame(trades)
+        with open(path, "r", encoding="utf-8") as f:
+            pairs = json.load(f)
+        return [p for p in pairs if isinstance(p, str)], time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return [], None
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Salinan daftar pair '{path}' tidak terbaca: {e}")
+        return [], None
 
-        if df.empty:
-            return pd.DataFrame()
+def _save_cached_pairs(pairs, path=PAIRS_CACHE_PATH):
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".pairs.", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(pairs, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Gagal menyimpan salinan daftar pair ke '{path}': {e}")
 
-        df['date'] = pd.to_datetime(df['date'], unit='s')
-        df['price'] = df['price'].astype(float)
-        df['amount'] = df['amount'].astype(float)
-        df.set_index('date', inplace=True)
+_pairs_refresh_lock = threading.Lock()
 
-        ohlc = df['price'].resample(tf).ohlc().dropna()
-        ohlc['volume'] = df['amount'].resample(tf).sum()
+# Fungsi untuk daftar pair tanpa menunggu jaringan saat cold start.
+# Salinan disk langsung dipakai; jika sudah lebih tua dari TTL, diperbarui di thread background.
+def load_indodax_pairs_cached():
+    pairs, age = load_cached_pairs()
+    if not pairs:
+        return load_indodax_pairs()
+    if age > CACHE_TTL["pairs"] and _pairs_refresh_lock.acquire(blocking=False):
+        def _refresh():
+            try:
+                load_indodax_pairs()
+            finally:
+                _pairs_refresh_lock.release()
+        threading.Thread(target=_refresh, name="pairs-refresh", daemon=True).start()
+    return pairs
 
-        return ohlc.reset_index()
+# Fungsi untuk mendapatkan data candlestick (ohlc) dari pair tertentu
+# history=True membangun candle dari trade store lokal (riwayat panjang) setelah ingest trade terbaru.
+@timed("candles.load")
+def get_candlestick_data(pair, tf='5min', limit=None, history=False):
+    try:
+        if not history:
+            return get_trades_snapshot(pair).ohlcv(tf, limit=limit)
 
+        # Semua timeframe diturunkan dari satu seri bar dasar 1 menit per pair.
+        ingest_trades(pair)
+        return get_candle_series(pair).ohlcv(tf, limit=limit)
     except Exception as e:
         logger.error(f"Gagal mengambil data candlestick: {e}")
         return pd.DataFrame()
 
 # ✅ Fungsi untuk mengambil semua tickers lengkap dengan buy/sell
+@timed("tickers.load")
 def fetch_all_tickers():
-    url = "https://indodax.com/api/tickers"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()["tickers"]
+        data = _get_json("tickers", "tickers")["tickers"]
 
         tickers_data = {}
         for pair, info in data.items():
@@ -104,7 +328,9 @@ def fetch_all_tickers():
                     "change": ((last - low) / low * 100) if low else 0,
                     "vol_idr": vol_idr,
                     "buy": buy,
-                    "sell": sell
+                    "sell": sell,
+                    "high": high,
+                    "low": low
                 }
 
             except (ValueError, TypeError) as e:
@@ -117,17 +343,6 @@ def fetch_all_tickers():
         logger.error(f"Gagal mengambil data tickers: {e}")
         return {}
 
-# Fungsi untuk mendapatkan top movers
-def get_top_movers(tickers):
-    try:
-        top_gainers = sorted(tickers.items(), key=lambda x: x[1]["change"], reverse=True)[:10]
-        top_losers = sorted(tickers.items(), key=lambda x: x[1]["change"])[:10]
-        top_volume = sorted(tickers.items(), key=lambda x: x[1]["vol_idr"], reverse=True)[:10]
-        return (
-            pd.DataFrame(dict(top_gainers)).T,
-            pd.DataFrame(dict(top_losers)).T,
-            pd.DataFrame(dict(top_volume)).T,
-        )
-    except Exception as e:
-        logger.error(f"Gagal memproses data top movers: {e}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+# Fungsi untuk mendapatkan top movers (implementasi bersama di utils.helpers)
+def get_top_movers(tickers, k=10):
+    return helpers.get_top_movers(tickers, k=k)
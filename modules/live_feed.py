@@ -0,0 +1,241 @@
+"""Feed harga live untuk mode streaming dashboard.
+
+Feed berjalan di satu thread background per proses dan hanya menyimpan
+delta per pair+timeframe: harga terakhir dan beberapa bar terakhir yang
+berubah. UI membaca delta ini (latest / bars_since) pada interval pendek
+tanpa memuat ulang riwayat candle.
+
+- PollingFeed: poll /api/{pair}/trades langsung (tanpa cache TTL), simpan
+  trade baru ke trade store dan baca bar terakhir dari seri candle.
+- ReplayFeed: memutar ulang trade dari file JSON (format /trades) atau list
+  di memori, tanpa jaringan; pengganti lokal untuk pengujian.
+"""
+import abc
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0  # detik antar poll per pair (batas wajar API publik Indodax)
+LIVE_BAR_HISTORY = 64  # bar terakhir per pair+timeframe yang disimpan feed
+SUBSCRIPTION_TTL = 30  # detik; langganan yang tidak dibaca selama ini berhenti di-poll
+
+
+class LiveFeed(abc.ABC):
+    """Basis feed: thread poll, langganan pair+timeframe dan penyimpanan delta.
+
+    Subclass mengimplementasikan _poll(pair, timeframes) yang memanggil
+    _publish() untuk setiap bar yang berubah.
+    """
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL, subscription_ttl=SUBSCRIPTION_TTL):
+        self.interval = interval
+        self.subscription_ttl = subscription_ttl
+        self._subscriptions = {}  # (pair, tf) -> waktu terakhir dibaca (monotonic)
+        self._states = {}  # (pair, tf) -> {"seq", "price", "price_ts", "bars"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- API untuk UI ---
+    def subscribe(self, pair, tf):
+        """Mulai (atau perpanjang) langganan pair+timeframe; thread feed dijalankan saat pertama dipakai."""
+        with self._lock:
+            self._subscriptions[(pair, tf)] = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}", daemon=True)
+                self._thread.start()
+
+    def latest(self, pair, tf):
+        """Delta terbaru: dict seq, price, price_ts dan bar (bar terakhir) atau None jika belum ada."""
+        with self._lock:
+            self._touch(pair, tf)
+            state = self._states.get((pair, tf))
+            if state is None:
+                return None
+            return {
+                "seq": state["seq"],
+                "price": state["price"],
+                "price_ts": state["price_ts"],
+                "bar": dict(state["bars"][-1]) if state["bars"] else None,
+            }
+
+    def bars_since(self, pair, tf, since_ms):
+        """Bar dengan ts (epoch ms) >= since_ms, urut waktu naik."""
+        with self._lock:
+            self._touch(pair, tf)
+            state = self._states.get((pair, tf))
+            if state is None:
+                return []
+            return [dict(bar) for bar in state["bars"] if bar["ts"] >= since_ms]
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # --- Internal ---
+    def _touch(self, pair, tf):
+        if (pair, tf) in self._subscriptions:
+            self._subscriptions[(pair, tf)] = time.monotonic()
+
+    def _active_pairs(self):
+        """{pair: [tf, ...]} untuk langganan yang masih dibaca; langganan kedaluwarsa dibuang."""
+        now = time.monotonic()
+        pairs = {}
+        with self._lock:
+            for key, last_read in list(self._subscriptions.items()):
+                if now - last_read > self.subscription_ttl:
+                    del self._subscriptions[key]
+                    self._states.pop(key, None)
+                    continue
+                pairs.setdefault(key[0], []).append(key[1])
+        return pairs
+
+    def _publish(self, pair, tf, price, price_ts, bars):
+        """Simpan harga terakhir dan upsert bar (dict ts/open/high/low/close/volume, ts epoch ms)."""
+        with self._lock:
+            state = self._states.get((pair, tf))
+            if state is None:
+                state = self._states[(pair, tf)] = {
+                    "seq": 0, "price": None, "price_ts": None, "bars": deque(maxlen=LIVE_BAR_HISTORY)
+                }
+            changed = price != state["price"]
+            state["price"], state["price_ts"] = price, price_ts
+            for bar in bars:
+                known = state["bars"]
+                if known and known[-1]["ts"] == bar["ts"]:
+                    changed = changed or known[-1] != bar
+                    known[-1] = bar
+                elif not known or bar["ts"] > known[-1]["ts"]:
+                    known.append(bar)
+                    changed = True
+            if changed:
+                state["seq"] += 1
+
+    @abc.abstractmethod
+    def _poll(self, pair, timeframes):
+        """Ambil data baru untuk pair dan panggil _publish() untuk setiap bar yang berubah."""
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            for pair, timeframes in self._active_pairs().items():
+                try:
+                    self._poll(pair, timeframes)
+                except Exception as e:
+                    logger.warning(f"Live feed gagal memperbarui {pair}: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# Fungsi untuk mengubah satu baris DataFrame candle (kolom date + OHLCV) menjadi dict bar feed
+def bar_from_row(row):
+    return {
+        "ts": int(row["date"].value // 1_000_000),
+        "open": float(row["open"]), "high": float(row["high"]), "low": float(row["low"]),
+        "close": float(row["close"]), "volume": float(row["volume"]),
+    }
+
+
+class PollingFeed(LiveFeed):
+    """Feed dari API Indodax: poll /trades tanpa cache, lalu bar terakhir dari seri candle lokal."""
+
+    def _poll(self, pair, timeframes):
+        from modules.indodax_api import fetch_trades_snapshot
+        from modules.trade_store import get_trade_store
+        from modules.candles import get_candle_series
+
+        snapshot = fetch_trades_snapshot(pair)
+        added = get_trade_store(pair).append_snapshot(snapshot)
+        if snapshot.empty:
+            return
+        price, price_ts = float(snapshot.prices[-1]), int(snapshot.timestamps[-1])
+        series = get_candle_series(pair)
+        for tf in timeframes:
+            # Dua bar terakhir: bar berjalan dan bar sebelumnya (nilai final saat pergantian bar).
+            bars = [] if not added and self._has_state(pair, tf) else \
+                [bar_from_row(row) for _, row in series.ohlcv(tf, limit=2).iterrows()]
+            self._publish(pair, tf, price, price_ts, bars)
+
+    def _has_state(self, pair, tf):
+        with self._lock:
+            return (pair, tf) in self._states
+
+
+class ReplayFeed(LiveFeed):
+    """Memutar ulang trade (format /api/{pair}/trades) dengan kecepatan `speed` kali waktu asli.
+
+    Trade yang sama dipakai untuk setiap pair yang dilanggan. Waktu trade
+    digeser ke saat langganan dimulai sehingga bar replay menyambung ke chart
+    saat ini. Bar dibangun di memori per timeframe; setelah trade habis,
+    replay diulang dari awal sehingga feed tidak pernah berhenti.
+    """
+
+    def __init__(self, trades=None, path=None, speed=1.0, interval=0.25, **kwargs):
+        super().__init__(interval=interval, **kwargs)
+        if trades is None:
+            with open(path, "r", encoding="utf-8") as f:
+                trades = json.load(f)
+        ordered = sorted(trades, key=lambda t: (int(t["date"]), int(t.get("tid", 0))))
+        if not ordered:
+            raise ValueError("ReplayFeed membutuhkan minimal satu trade.")
+        self._trades = [(int(t["date"]), float(t["price"]), float(t["amount"])) for t in ordered]
+        self._span = self._trades[-1][0] - self._trades[0][0] + 1
+        self.speed = speed
+        self._cursors = {}  # pair -> (indeks trade berikutnya, putaran, waktu mulai monotonic, offset detik)
+        self._bars = {}  # (pair, tf) -> dict bar berjalan
+
+    def _poll(self, pair, timeframes):
+        from modules.trades import timeframe_seconds
+
+        first_ts = self._trades[0][0]
+        index, loop, started, offset = self._cursors.setdefault(
+            pair, (0, 0, time.monotonic(), int(time.time()) - first_ts)
+        )
+        replay_now = first_ts + (time.monotonic() - started) * self.speed
+        changed = {tf: [] for tf in timeframes}
+        price = price_ts = None
+        while True:
+            if index >= len(self._trades):
+                index, loop = 0, loop + 1
+            ts, trade_price, amount = self._trades[index]
+            ts += loop * self._span
+            if ts > replay_now:
+                break
+            ts += offset
+            price, price_ts = trade_price, ts
+            for tf in timeframes:
+                seconds = timeframe_seconds(tf) or 60
+                bucket_ms = (ts - ts % seconds) * 1000
+                bar = self._bars.get((pair, tf))
+                if bar is None or bucket_ms > bar["ts"]:
+                    if bar is not None:
+                        changed[tf].append(bar)
+                    bar = self._bars[(pair, tf)] = {
+                        "ts": bucket_ms, "open": trade_price, "high": trade_price,
+                        "low": trade_price, "close": trade_price, "volume": 0.0,
+                    }
+                bar["high"] = max(bar["high"], trade_price)
+                bar["low"] = min(bar["low"], trade_price)
+                bar["close"] = trade_price
+                bar["volume"] += amount
+            index += 1
+        self._cursors[pair] = (index, loop, started, offset)
+        if price is None:
+            return
+        for tf in timeframes:
+            bars = changed[tf] + ([self._bars[(pair, tf)]] if (pair, tf) in self._bars else [])
+            self._publish(pair, tf, price, price_ts, [dict(bar) for bar in bars])
+
+
+# Fungsi untuk membuat feed sesuai konfigurasi ("polling" atau "replay")
+def create_live_feed(kind="polling", **kwargs):
+    if kind == "polling":
+        return PollingFeed(**kwargs)
+    if kind == "replay":
+        return ReplayFeed(**kwargs)
+    raise ValueError(f"Jenis live feed tidak dikenal: {kind}")
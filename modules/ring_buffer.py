@@ -0,0 +1,87 @@
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class CandleRingBuffer:
+    """Ring buffer NumPy berkapasitas tetap untuk candle satu pair+timeframe.
+
+    Semua kolom (OHLCV dan indikator) dialokasikan sekali sebagai array float64
+    kolom-mayor. Setiap bar ditulis dua kali (di posisi p dan p + capacity)
+    sehingga `capacity` bar terakhir selalu berupa potongan kontigu: column()
+    dan timestamps() mengembalikan view tanpa salinan. View hanya valid sampai
+    bar berikutnya ditulis; salin jika perlu disimpan lebih lama.
+    """
+
+    def __init__(self, capacity, columns, ts_dtype="datetime64[ns]"):
+        if capacity <= 0:
+            raise ValueError("Kapasitas ring buffer harus lebih dari 0")
+        self.capacity = int(capacity)
+        self.columns = list(columns)
+        self._index = {col: i for i, col in enumerate(self.columns)}
+        self._ts = np.zeros(2 * self.capacity, dtype=ts_dtype)
+        self._data = np.full((len(self.columns), 2 * self.capacity), np.nan, dtype=np.float64)
+        self._head = 0  # posisi tulis berikutnya di paruh bawah
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def empty(self):
+        return self._size == 0
+
+    @property
+    def nbytes(self):
+        return self._ts.nbytes + self._data.nbytes
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def _write(self, pos, values):
+        for col, value in values.items():
+            i = self._index[col]
+            self._data[i, pos] = self._data[i, pos + self.capacity] = value
+
+    def append(self, timestamp, values):
+        """Tambah bar baru; bar tertua ditimpa jika buffer penuh."""
+        pos = self._head
+        self._ts[pos] = self._ts[pos + self.capacity] = timestamp
+        self._data[:, pos] = self._data[:, pos + self.capacity] = np.nan
+        self._write(pos, values)
+        self._head = (pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def update_last(self, values):
+        """Timpa sebagian kolom bar terakhir (mis. revisi bar yang belum close)."""
+        if self._size == 0:
+            raise IndexError("Ring buffer kosong")
+        self._write((self._head - 1) % self.capacity, values)
+
+    def _window(self, n):
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return end - n, end
+
+    def timestamps(self, n=None):
+        """View timestamp n bar terakhir (default semua), urut waktu naik."""
+        start, end = self._window(n)
+        return self._ts[start:end]
+
+    def column(self, name, n=None):
+        """View kolom `name` untuk n bar terakhir (default semua), tanpa salinan."""
+        start, end = self._window(n)
+        return self._data[self._index[name], start:end]
+
+    def last_timestamp(self):
+        return self._ts[self._head - 1 + self.capacity] if self._size else None
+
+    def to_frame(self, n=None, columns=None):
+        """DataFrame (kolom date + kolom buffer) untuk tampilan; data disalin."""
+        frame = {'date': self.timestamps(n)}
+        for col in columns or self.columns:
+            frame[col] = self.column(col, n)
+        return pd.DataFrame(frame)
@@ -0,0 +1,325 @@
+"""Mesin auto-scan semua pair dan entry point daemon headless.
+
+Jalankan tanpa Streamlit dengan:  python -m modules.scanner [--once]
+
+Modul ini sengaja hanya mengimpor library standar di level atas; pandas,
+ta dan modul API dimuat saat pipeline scan pertama kali dipakai, sehingga
+`--help` dan startup daemon tetap cepat.
+"""
+import os
+import csv
+import math
+import sys
+import time
+import signal
+import logging
+import argparse
+import threading
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.metrics import metrics, timed, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PAIR_TIMEOUT = 30  # detik per pair
+DEFAULT_SCAN_TIMEFRAME = '1h'
+DEFAULT_SCAN_LIMIT = 100  # jumlah candle per pair
+DEFAULT_SCAN_INTERVAL = 3600  # detik antar scan pada mode daemon
+AUTO_SCAN_LOG_PATH = "auto_scan_log.csv"
+SECRETS_PATH = os.path.join(".streamlit", "secrets.toml")
+_POLL_INTERVAL = 0.25  # detik, seberapa sering pair yang macet diperiksa
+
+
+def _percentile(sorted_values, pct):
+    """Persentil sederhana (nearest-rank) dari list yang sudah terurut."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def run_concurrent_scan(pairs, scan_pair_fn, max_workers=DEFAULT_MAX_WORKERS,
+                        pair_timeout=DEFAULT_PAIR_TIMEOUT, on_result=None):
+    """Jalankan scan_pair_fn(pair) untuk semua pair secara paralel.
+
+    Jumlah pair yang berjalan dibatasi max_workers dan setiap pair diberi batas
+    waktu pair_timeout detik. Pair yang melewati batas ditinggalkan dan slot
+    worker-nya langsung dipakai pair berikutnya, sehingga satu pass selesai
+    paling lama sekitar ceil(len(pairs) / max_workers) x pair_timeout detik
+    walaupun ada pair yang macet. on_result(pair, result) dipanggil di thread pemanggil
+    setiap kali satu pair selesai dengan sukses.
+    Mengembalikan tuple (results, summary): results berisi hasil per pair yang
+    sukses (urut sesuai `pairs`), summary berisi statistik waktu scan.
+    """
+    pairs = list(pairs)
+    worker_limit = max(1, int(max_workers))
+    started_at = {}
+    latencies = {}
+    abandoned = set()
+    state_lock = threading.Lock()
+    results = {}
+    failed = []
+    timed_out = []
+
+    def _run(pair):
+        with state_lock:
+            started_at[pair] = time.perf_counter()
+        try:
+            return scan_pair_fn(pair)
+        finally:
+            with state_lock:
+                # Latensi pair yang sudah ditinggalkan karena timeout tidak ditimpa saat thread-nya akhirnya selesai.
+                if pair not in abandoned:
+                    latencies[pair] = time.perf_counter() - started_at[pair]
+
+    wall_start = time.perf_counter()
+    queue = deque(pairs)
+    pending = {}
+    # Thread pair yang macet tidak bisa dihentikan, jadi pool diberi ruang di atas max_workers;
+    # pair baru hanya dikirim selama pair aktif (belum timeout) kurang dari max_workers.
+    executor = ThreadPoolExecutor(max_workers=max(1, len(pairs)), thread_name_prefix="auto-scan")
+    try:
+        while queue or pending:
+            while queue and len(pending) < worker_limit:
+                pair = queue.popleft()
+                pending[executor.submit(_run, pair)] = pair
+            done, _ = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                pair = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Error saat auto-scan pair {pair}: {e}")
+                    failed.append(pair)
+                    continue
+                results[pair] = result
+                if on_result is not None:
+                    try:
+                        on_result(pair, result)
+                    except Exception as e:
+                        logger.error(f"Callback hasil scan gagal untuk pair {pair}: {e}")
+
+            # Tinggalkan pair yang melewati batas waktu agar scan tidak tertahan.
+            now = time.perf_counter()
+            for future, pair in list(pending.items()):
+                if future.done():
+                    continue  # hasilnya diambil pada putaran wait() berikutnya
+                with state_lock:
+                    start = started_at.get(pair)
+                    if start is None or now - start <= pair_timeout:
+                        continue
+                    abandoned.add(pair)
+                    latencies[pair] = now - start
+                pending.pop(future)
+                future.cancel()
+                timed_out.append(pair)
+                logger.warning(f"Auto-scan pair {pair} melewati batas waktu {pair_timeout} detik.")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    wall_clock = time.perf_counter() - wall_start
+    sorted_latencies = sorted(latencies.values())
+    slowest = sorted(latencies.items(), key=lambda x: x[1], reverse=True)[:5]
+    summary = {
+        "total_pairs": len(pairs),
+        "succeeded": len(results),
+        "failed": len(failed),
+        "timed_out": len(timed_out),
+        "failed_pairs": failed,
+        "timed_out_pairs": timed_out,
+        "max_workers": max_workers,
+        "wall_clock_s": wall_clock,
+        "latency_mean_s": (sum(sorted_latencies) / len(sorted_latencies)) if sorted_latencies else 0.0,
+        "latency_p50_s": _percentile(sorted_latencies, 50),
+        "latency_p95_s": _percentile(sorted_latencies, 95),
+        "latency_max_s": sorted_latencies[-1] if sorted_latencies else 0.0,
+        "slowest_pairs": slowest,
+        "pair_latencies_s": dict(latencies),
+    }
+    logger.info(
+        f"Auto-scan selesai: {summary['succeeded']}/{summary['total_pairs']} pair sukses, "
+        f"{summary['failed']} gagal, {summary['timed_out']} timeout dalam {wall_clock:.2f} detik "
+        f"(latensi p50 {summary['latency_p50_s']:.2f}s, p95 {summary['latency_p95_s']:.2f}s, "
+        f"maks {summary['latency_max_s']:.2f}s, {max_workers} worker)."
+    )
+    ordered_results = {p: results[p] for p in pairs if p in results}
+    return ordered_results, summary
+
+
+@timed("scan.pair")
+def evaluate_pair(pair, tf=DEFAULT_SCAN_TIMEFRAME, limit=DEFAULT_SCAN_LIMIT):
+    """Ingest trade terbaru, hitung indikator dan kembalikan (alerts, candle_ts) untuk satu pair."""
+    from modules.indodax_api import get_candlestick_data
+    from modules.indicators import get_indicator_snapshot
+
+    df = get_candlestick_data(pair, tf=tf, limit=limit, history=True)
+    alerts = []
+    candle_ts = None
+    if df is not None and not df.empty:
+        candle_ts = df['date'].iloc[-1]
+        # Hanya dua bar terakhir yang dibaca dari ring buffer indikator pair+timeframe.
+        bars = get_indicator_snapshot(df, pair, tf, n=2)
+        if not bars:
+            return alerts, candle_ts
+        rsi = bars['rsi'][-1]
+        if rsi > 70: alerts.append(f"RSI Overbought ({rsi:.2f})")
+        elif rsi < 30: alerts.append(f"RSI Oversold ({rsi:.2f})")
+
+        macd, macd_signal = bars['macd'][-1], bars['macd_signal'][-1]
+        if not math.isnan(bars['macd_histogram'][-1]):
+            prev_macd_hist = bars['macd_histogram'][-2] if len(bars['macd_histogram']) > 1 else 0
+            if macd > macd_signal and prev_macd_hist <= 0:
+                alerts.append("MACD Bullish Crossover")
+            elif macd < macd_signal and prev_macd_hist >= 0:
+                alerts.append("MACD Bearish Crossover")
+    return alerts, candle_ts
+
+
+def _write_scan_log(alerted_pairs_info, path=AUTO_SCAN_LOG_PATH):
+    try:
+        with open(path, "a", newline='', encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(["Timestamp", "Pair", "Detected Signals"])
+            for item in alerted_pairs_info:
+                writer.writerow([item['timestamp'], item['pair'], ", ".join(item['signals'])])
+        logger.info(f"Hasil auto-scan disimpan ke {path}. Sinyal pada: {', '.join([i['pair'] for i in alerted_pairs_info])}")
+    except IOError as e:
+        logger.error(f"Gagal menulis ke {path}: {e}")
+
+
+@timed("scan.pass")
+def run_scan_pass(pairs, token, chat_id, tf=DEFAULT_SCAN_TIMEFRAME, max_workers=DEFAULT_MAX_WORKERS,
+                  pair_timeout=DEFAULT_PAIR_TIMEOUT):
+    """Satu putaran pipeline ingest -> indikator -> sinyal -> notifikasi untuk semua pair.
+
+    Sinyal yang sudah dikirim untuk candle yang sama dilewati (store dedup
+    bersama), alert baru dikirim lewat antrean Telegram dan dicatat ke CSV.
+    Mengembalikan list alerted_pairs_info.
+    """
+    from modules.signal_store import get_signal_store
+    from modules.telegram_bot import enqueue_telegram_message
+
+    logger.info(f"Memulai auto-scan {len(pairs)} pair ({max_workers} worker)...")
+    alerted_pairs_info = []
+    signal_store = get_signal_store()
+
+    def on_pair_scanned(p, result):
+        alerts, candle_ts = result
+        # Lewati sinyal yang sudah dikirim untuk candle yang sama (nilai dalam kurung diabaikan).
+        alerts = [a for a in alerts if signal_store.check_and_mark(p, tf, a.split(" (")[0], candle_ts, persist=False)]
+        if alerts:
+            signal_message = f"🚨 Sinyal Auto-Scan pada {p.upper()} ({tf.upper()}):\n" + "\n".join([f"- {a}" for a in alerts])
+            if not enqueue_telegram_message(signal_message, token, chat_id):
+                # Pesan dibuang antrean: batalkan tanda agar sinyal dicoba lagi pada scan berikutnya.
+                for a in alerts:
+                    signal_store.unmark(p, tf, a.split(" (")[0], candle_ts, persist=False)
+                logger.error(f"Gagal memasukkan sinyal auto-scan {p.upper()} ke antrean Telegram.")
+                return
+            alerted_pairs_info.append({'pair': p, 'signals': alerts, 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+            logger.info(f"Sinyal auto-scan terdeteksi di {p.upper()}: {', '.join(alerts)}")
+
+    run_concurrent_scan(
+        pairs, lambda p: evaluate_pair(p, tf=tf),
+        max_workers=max_workers, pair_timeout=pair_timeout,
+        on_result=on_pair_scanned
+    )
+    signal_store.save()
+
+    if alerted_pairs_info:
+        _write_scan_log(alerted_pairs_info)
+    else:
+        logger.info("Auto-scan selesai: tidak ada sinyal baru yang signifikan terdeteksi.")
+    return alerted_pairs_info
+
+
+def load_scanner_config(secrets_path=SECRETS_PATH):
+    """Token/chat Telegram dari environment, atau dari secrets.toml Streamlit jika tidak diset."""
+    config = {
+        "telegram_token": os.environ.get("TELEGRAM_TOKEN"),
+        "telegram_chat_id": os.environ.get("TELEGRAM_CHAT_ID"),
+    }
+    if all(config.values()) or not os.path.exists(secrets_path):
+        return config
+    try:
+        import tomllib
+        with open(secrets_path, "rb") as f:
+            secrets = tomllib.load(f)
+        for key in config:
+            config[key] = config[key] or secrets.get(key)
+    except Exception as e:
+        logger.error(f"Gagal membaca {secrets_path}: {e}")
+    return config
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.scanner",
+        description="Daemon auto-scan Read ONE Trade tanpa UI Streamlit."
+    )
+    parser.add_argument("--once", action="store_true", help="jalankan satu putaran scan lalu keluar")
+    parser.add_argument("--interval", type=float, default=DEFAULT_SCAN_INTERVAL, help="detik antar putaran scan")
+    parser.add_argument("--timeframe", default=DEFAULT_SCAN_TIMEFRAME, help="timeframe candle, mis. 1h atau 15min")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="jumlah worker paralel")
+    parser.add_argument("--pair-timeout", type=float, default=DEFAULT_PAIR_TIMEOUT, help="batas waktu per pair (detik)")
+    parser.add_argument("--pairs", nargs="*", help="daftar pair (default: semua pair Indodax)")
+    parser.add_argument("--api-base-url", help="base URL API (default: env INDODAX_BASE_URL atau API Indodax)")
+    parser.add_argument("--metrics-port", type=int, help="jalankan endpoint Prometheus /metrics di port ini")
+    parser.add_argument("--metrics-file", help="tulis metrik format Prometheus ke file ini setelah tiap putaran")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+
+    config = load_scanner_config()
+    if not (config["telegram_token"] and config["telegram_chat_id"]):
+        logger.warning("Telegram token/chat_id belum diset; sinyal hanya dicatat ke log.")
+
+    stopping = {"flag": False}
+
+    def _request_stop(signum, frame):
+        logger.info("Sinyal berhenti diterima, daemon akan keluar setelah putaran ini.")
+        stopping["flag"] = True
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    from modules.indodax_api import load_indodax_pairs, set_base_url
+    from modules.telegram_bot import get_telegram_dispatcher
+
+    if args.api_base_url:
+        set_base_url(args.api_base_url)
+
+    try:
+        while not stopping["flag"]:
+            started = time.monotonic()
+            pairs = args.pairs or load_indodax_pairs()
+            if not pairs:
+                logger.error("Daftar pair kosong, scan dilewati.")
+            else:
+                run_scan_pass(pairs, config["telegram_token"], config["telegram_chat_id"], tf=args.timeframe,
+                              max_workers=args.workers, pair_timeout=args.pair_timeout)
+            if args.metrics_file:
+                metrics.write_prometheus_file(args.metrics_file)
+            if args.once:
+                break
+            remaining = args.interval - (time.monotonic() - started)
+            while remaining > 0 and not stopping["flag"]:
+                time.sleep(min(remaining, 1.0))
+                remaining = args.interval - (time.monotonic() - started)
+    except KeyboardInterrupt:
+        logger.info("Daemon auto-scan dihentikan.")
+    finally:
+        get_telegram_dispatcher().flush(timeout=30)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
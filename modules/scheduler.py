@@ -0,0 +1,153 @@
+import time
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_TICK_SECONDS = 1.0
+
+
+class ScheduledJob:
+    """Satu job periodik beserta status eksekusi terakhirnya."""
+
+    def __init__(self, name, func, interval_seconds, args=(), kwargs=None, run_immediately=False):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.next_run = time.monotonic() + (0 if run_immediately else interval_seconds)
+        self.running = False
+        self.last_run = None
+        self.last_duration = None
+        self.last_status = "menunggu"
+        self.last_error = None
+        self.run_count = 0
+        self.error_count = 0
+
+    def status(self):
+        return {
+            "job": self.name,
+            "interval_detik": self.interval_seconds,
+            "status": "berjalan" if self.running else self.last_status,
+            "terakhir_jalan": self.last_run.strftime("%Y-%m-%d %H:%M:%S") if self.last_run else "-",
+            "durasi_detik": round(self.last_duration, 2) if self.last_duration is not None else None,
+            "jalan_berikutnya_detik": max(0, round(self.next_run - time.monotonic())),
+            "jumlah_jalan": self.run_count,
+            "jumlah_error": self.error_count,
+            "error_terakhir": self.last_error or "",
+        }
+
+
+class SchedulerService:
+    """Scheduler background tunggal per proses dengan registry job.
+
+    Satu thread pengatur memeriksa job setiap detik; setiap job dijalankan di
+    thread-nya sendiri sehingga job lama (mis. auto-scan) tidak menahan job
+    lain, dan satu job tidak pernah berjalan paralel dengan dirinya sendiri.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, func, interval_seconds, *args, run_immediately=False, **kwargs):
+        """Daftarkan job, atau perbarui job dengan nama yang sama (tidak membuat duplikat)."""
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None:
+                self._jobs[name] = ScheduledJob(name, func, interval_seconds, args, kwargs, run_immediately)
+                logger.info(f"Job '{name}' didaftarkan setiap {interval_seconds} detik.")
+                return
+            job.func, job.args, job.kwargs = func, args, kwargs
+            if job.interval_seconds != interval_seconds:
+                job.next_run = job.next_run - job.interval_seconds + interval_seconds
+                job.interval_seconds = interval_seconds
+                logger.info(f"Interval job '{name}' diubah menjadi {interval_seconds} detik.")
+
+    def unregister(self, name):
+        with self._lock:
+            if self._jobs.pop(name, None) is not None:
+                logger.info(f"Job '{name}' dihapus dari scheduler.")
+
+    def has_job(self, name):
+        with self._lock:
+            return name in self._jobs
+
+    def get_interval(self, name):
+        with self._lock:
+            job = self._jobs.get(name)
+            return job.interval_seconds if job else 0
+
+    def run_now(self, name):
+        """Jadwalkan job untuk segera dijalankan pada tick berikutnya."""
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is not None:
+                job.next_run = time.monotonic()
+
+    def status(self):
+        with self._lock:
+            return [job.status() for job in self._jobs.values()]
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="scheduler-service", daemon=True)
+            self._thread.start()
+            logger.info("Scheduler background dimulai.")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due = [job for job in self._jobs.values() if not job.running and job.next_run <= now]
+                for job in due:
+                    job.running = True
+                    job.next_run = now + job.interval_seconds
+            for job in due:
+                threading.Thread(target=self._execute, args=(job,), name=f"job-{job.name}", daemon=True).start()
+            self._stop.wait(_TICK_SECONDS)
+
+    def _execute(self, job):
+        started = time.perf_counter()
+        job.last_run = datetime.now()
+        try:
+            job.func(*job.args, **job.kwargs)
+            job.last_status = "sukses"
+            job.last_error = None
+        except Exception as e:
+            job.last_status = "error"
+            job.last_error = str(e)
+            job.error_count += 1
+            logger.error(f"Job '{job.name}' gagal: {e}", exc_info=True)
+        finally:
+            job.last_duration = time.perf_counter() - started
+            job.run_count += 1
+            job.running = False
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# === get_scheduler ===
+def get_scheduler():
+    """SchedulerService bersama untuk seluruh proses (dibuat dan dijalankan sekali)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SchedulerService()
+        _scheduler.start()
+        return _scheduler
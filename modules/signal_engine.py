@@ -1,10 +1,54 @@
+import numpy as np
 import pandas as pd
 import logging
 
+from utils.metrics import timed
+
 logger = logging.getLogger(__name__)
 
-def scan_signals(pair, df):
-    """Scan sinyal trading berdasarkan indikator."""
+# Bitmask sinyal per bar (kolom `signal_flags`)
+SIGNAL_MACD_CROSS = 1
+SIGNAL_VOLUME_SPIKE = 2
+SIGNAL_RSI_OVERSOLD = 4
+SIGNAL_RSI_OVERBOUGHT = 8
+SIGNAL_BB_BREAKOUT = 16
+SIGNAL_BB_BREAKDOWN = 32
+SIGNAL_COMBO_SPIKE = 64
+
+SIGNAL_LABELS = {
+    SIGNAL_MACD_CROSS: "Bullish Cross",
+    SIGNAL_VOLUME_SPIKE: "Volume Spike",
+    SIGNAL_RSI_OVERSOLD: "Oversold",
+    SIGNAL_RSI_OVERBOUGHT: "Overbought",
+    SIGNAL_BB_BREAKOUT: "Breakout",
+    SIGNAL_BB_BREAKDOWN: "Breakdown",
+    SIGNAL_COMBO_SPIKE: "Strong Up Spike",
+}
+
+RSI_OVERSOLD_LEVEL = 30
+RSI_OVERBOUGHT_LEVEL = 70
+COMBO_PRICE_CHANGE_PCT = 3
+
+
+def _label_column(mask, label):
+    """Kolom kategorikal '' / label dari mask boolean (string tidak disalin per baris)."""
+    return pd.Categorical.from_codes(mask.astype(np.int8), categories=["", label])
+
+
+def describe_signal_flags(flags):
+    """Ubah bitmask signal_flags menjadi list label sinyal."""
+    flags = int(flags)
+    return [label for bit, label in SIGNAL_LABELS.items() if flags & bit]
+
+
+@timed("signals.scan")
+def scan_signals(pair, df, last_bar_only=False):
+    """Scan sinyal trading berdasarkan indikator.
+
+    Semua aturan dihitung tervektorisasi di atas array NumPy. Hasilnya berisi
+    kolom bitmask `signal_flags` dan kolom label kategorikal untuk tampilan.
+    last_bar_only=True hanya mengevaluasi bar terakhir (untuk jalur alert).
+    """
     try:
         if df.empty:
             logger.warning("DataFrame kosong diterima")
@@ -15,39 +59,72 @@ def scan_signals(pair, df):
             logger.error(f"Kolom indikator tidak lengkap: {required_columns}")
             return pd.DataFrame()
 
-        signals = df.copy()
+        # Bar sebelumnya diperlukan untuk MACD cross dan perubahan harga.
+        source = df.iloc[-2:] if last_bar_only else df
 
-        # MACD Cross
-        signals['macd_cross_flag'] = (
-            (signals['macd'] > signals['macd_signal']) & 
-            (signals['macd'].shift(1) <= signals['macd_signal'].shift(1))
-        )
-        signals['macd_signal_label'] = signals['macd_cross_flag'].map({True: "Bullish Cross", False: ""})
+        def col(name):
+            return source[name].to_numpy(dtype=np.float64)
+
+        macd, macd_signal = col('macd'), col('macd_signal')
+        close, rsi = col('close'), col('rsi')
+        volume_spike = col('volume_spike') == 1
 
-        # Volume Spike
-        signals['volume_spike_label'] = signals['volume_spike'].map({1: "Volume Spike", 0: ""})
+        prev_macd = np.r_[np.nan, macd[:-1]]
+        prev_macd_signal = np.r_[np.nan, macd_signal[:-1]]
+        prev_close = np.r_[np.nan, close[:-1]]
 
-        # RSI Overbought/Oversold
-        signals['rsi_signal'] = signals['rsi'].apply(
-            lambda x: "Oversold" if x < 30 else ("Overbought" if x > 70 else "")
-        )
+        # MACD Cross
+        macd_cross = (macd > macd_signal) & (prev_macd <= prev_macd_signal)
+
+        # RSI Overbought/Oversold: 0 = netral, 1 = oversold, 2 = overbought
+        rsi_state = np.select([rsi < RSI_OVERSOLD_LEVEL, rsi > RSI_OVERBOUGHT_LEVEL], [1, 2], default=0)
 
         # Bollinger Band Breakout/Breakdown
-        signals['bb_breakout'] = (signals['close'] > signals['bb_upper']).map({True: "Breakout", False: ""})
-        signals['bb_breakdown'] = (signals['close'] < signals['bb_lower']).map({True: "Breakdown", False: ""})
+        bb_breakout = close > col('bb_upper')
+        bb_breakdown = close < col('bb_lower')
 
         # Kombinasi Volume & Price Spike
-        signals['price_change'] = signals['close'].pct_change() * 100
-        signals['combo_spike'] = (
-            (signals['volume_spike'] == 1) & (signals['price_change'] > 3)
-        ).map({True: "Strong Up Spike", False: ""})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = (close / prev_close - 1) * 100
+        combo_spike = volume_spike & (price_change > COMBO_PRICE_CHANGE_PCT)
+
+        flags = (
+            macd_cross * SIGNAL_MACD_CROSS
+            | volume_spike * SIGNAL_VOLUME_SPIKE
+            | (rsi_state == 1) * SIGNAL_RSI_OVERSOLD
+            | (rsi_state == 2) * SIGNAL_RSI_OVERBOUGHT
+            | bb_breakout * SIGNAL_BB_BREAKOUT
+            | bb_breakdown * SIGNAL_BB_BREAKDOWN
+            | combo_spike * SIGNAL_COMBO_SPIKE
+        ).astype(np.uint8)
+
+        if last_bar_only:
+            source = source.iloc[-1:]
+            macd, flags, rsi_state = macd[-1:], flags[-1:], rsi_state[-1:]
+            macd_cross, volume_spike = macd_cross[-1:], volume_spike[-1:]
+            bb_breakout, bb_breakdown, combo_spike = bb_breakout[-1:], bb_breakdown[-1:], combo_spike[-1:]
 
-        signals['pair'] = pair
-        signals['timestamp'] = signals.index
+        signals = pd.DataFrame({
+            'pair': pd.Categorical([pair] * len(source)),
+            'timestamp': source.index,
+            'open': source['open'].to_numpy() if 'open' in source.columns else np.nan,
+            'high': source['high'].to_numpy() if 'high' in source.columns else np.nan,
+            'low': source['low'].to_numpy() if 'low' in source.columns else np.nan,
+            'close': source['close'].to_numpy(),
+            'macd': macd,
+            'macd_signal_label': _label_column(macd_cross, SIGNAL_LABELS[SIGNAL_MACD_CROSS]),
+            'volume_spike_label': _label_column(volume_spike, SIGNAL_LABELS[SIGNAL_VOLUME_SPIKE]),
+            'rsi_signal': pd.Categorical.from_codes(
+                rsi_state.astype(np.int8),
+                categories=["", SIGNAL_LABELS[SIGNAL_RSI_OVERSOLD], SIGNAL_LABELS[SIGNAL_RSI_OVERBOUGHT]]
+            ),
+            'bb_breakout': _label_column(bb_breakout, SIGNAL_LABELS[SIGNAL_BB_BREAKOUT]),
+            'bb_breakdown': _label_column(bb_breakdown, SIGNAL_LABELS[SIGNAL_BB_BREAKDOWN]),
+            'combo_spike': _label_column(combo_spike, SIGNAL_LABELS[SIGNAL_COMBO_SPIKE]),
+            'signal_flags': flags,
+        }, index=source.index)
 
-        return signals[['pair', 'timestamp', 'open', 'high', 'low', 'close', 
-                        'macd', 'macd_signal_label', 'volume_spike_label', 'rsi_signal',
-                        'bb_breakout', 'bb_breakdown', 'combo_spike']]
+        return signals
 
     except Exception as e:
         logger.error(f"Error dalam scan_signals: {str(e)}", exc_info=True)
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+SENT_SIGNALS_PATH = os.path.join("data", "sent_signals.json")
+SIGNAL_DEDUP_TTL = 24 * 3600  # detik; sinyal yang sama boleh dikirim lagi setelah ini
+STORE_VERSION = 1
+
+
+def _normalize_ts(value):
+    """Timestamp candle -> string ISO agar key stabil di memori maupun di JSON."""
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class SentSignalStore:
+    """Store deduplikasi sinyal terkirim, dipakai bersama UI dan auto-scan.
+
+    Key berupa (pair, timeframe, signal, candle_ts) sehingga lookup O(1).
+    Entri kedaluwarsa setelah ttl detik dan store disimpan ke disk secara
+    atomik (tulis ke file sementara lalu os.replace).
+    """
+
+    def __init__(self, path=SENT_SIGNALS_PATH, ttl=SIGNAL_DEDUP_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = {}  # key -> {"sent_at": float, "expires_at": float}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(pair, timeframe, signal, candle_ts):
+        return (str(pair).lower(), timeframe, signal, _normalize_ts(candle_ts))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Gagal membaca store sinyal terkirim '{self.path}': {e}")
+            return
+
+        now = time.time()
+        if isinstance(data, dict) and "entries" in data:
+            for item in data["entries"]:
+                if item.get("expires_at", 0) > now:
+                    key = self._key(item["pair"], item.get("timeframe"), item["signal"], item.get("candle_ts"))
+                    self._entries[key] = {"sent_at": item.get("sent_at", now), "expires_at": item["expires_at"]}
+        elif data:
+            # Format lama ({"PAIR": {"signal", "time"}}) tidak menyimpan timeframe maupun candle, sehingga
+            # tidak bisa dipetakan ke key baru; diabaikan dan ditimpa pada penyimpanan berikutnya.
+            logger.warning(f"Store sinyal terkirim '{self.path}' memakai format lama, entri lama diabaikan.")
+
+    def _purge_locked(self, now):
+        expired = [k for k, v in self._entries.items() if v["expires_at"] <= now]
+        for k in expired:
+            del self._entries[k]
+        return len(expired)
+
+    def purge_expired(self):
+        with self._lock:
+            return self._purge_locked(time.time())
+
+    def seen(self, pair, timeframe, signal, candle_ts):
+        """True jika sinyal ini sudah dikirim dan belum kedaluwarsa."""
+        entry = self._entries.get(self._key(pair, timeframe, signal, candle_ts))
+        return entry is not None and entry["expires_at"] > time.time()
+
+    def check_and_mark(self, pair, timeframe, signal, candle_ts, persist=True):
+        """Tandai sinyal sebagai terkirim. Mengembalikan True jika sinyal ini baru."""
+        key = self._key(pair, timeframe, signal, candle_ts)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] > now:
+                return False
+            self._entries[key] = {"sent_at": now, "expires_at": now + self.ttl}
+        if persist:
+            self.save()
+        return True
+
+    def unmark(self, pair, timeframe, signal, candle_ts, persist=True):
+        """Batalkan tanda terkirim (mis. jika pengiriman gagal)."""
+        with self._lock:
+            removed = self._entries.pop(self._key(pair, timeframe, signal, candle_ts), None)
+        if removed is not None and persist:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        """Simpan store ke disk secara atomik; entri kedaluwarsa dibuang terlebih dahulu."""
+        with self._lock:
+            self._purge_locked(time.time())
+            payload = {
+                "version": STORE_VERSION,
+                "entries": [
+                    {"pair": k[0], "timeframe": k[1], "signal": k[2], "candle_ts": k[3], **v}
+                    for k, v in self._entries.items()
+                ],
+            }
+            directory = os.path.dirname(self.path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=".sent_signals.", suffix=".tmp", dir=directory)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"Gagal menyimpan store sinyal terkirim '{self.path}': {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+# === get_signal_store ===
+def get_signal_store():
+    """Store deduplikasi sinyal bersama untuk seluruh proses."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SentSignalStore()
+        return _store
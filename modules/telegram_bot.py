@@ -1,12 +1,21 @@
 import os
+import time
+import queue
 import logging
+import threading
 import requests
+
+from utils.metrics import timed
+
 # import streamlit as st # Tidak diperlukan lagi di sini jika token/chat_id dilewatkan
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_API_URL = "https://api.telegram.org"
+
 # === send_telegram_message ===
 # Fungsi diubah untuk menerima token dan chat_id sebagai parameter
+@timed("telegram.send")
 def send_telegram_message(message, token, chat_id):
     """Kirim pesan ke Telegram menggunakan token dan chat_id yang diberikan."""
     if not token or not chat_id:
@@ -14,7 +23,7 @@ def send_telegram_message(message, token, chat_id):
         return False # Langsung keluar jika token/chat_id tidak ada
 
     try:
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
+        url = f"{TELEGRAM_API_URL}/bot{token}/sendMessage"
         payload = {
             "chat_id": chat_id,
             "text": message,
@@ -36,6 +45,7 @@ def send_telegram_message(message, token, chat_id):
 
 # === send_telegram_photo ===
 # Fungsi diubah untuk menerima token dan chat_id sebagai parameter
+@timed("telegram.photo")
 def send_telegram_photo(photo_path, token, chat_id, caption="📸 Screenshot UI"):
     """Kirim foto ke Telegram menggunakan token dan chat_id yang diberikan."""
     if not os.path.exists(photo_path):
@@ -47,7 +57,7 @@ def send_telegram_photo(photo_path, token, chat_id, caption="📸 Screenshot UI"
         return False
 
     try:
-        url = f"https://api.telegram.org/bot{token}/sendPhoto"
+        url = f"{TELEGRAM_API_URL}/bot{token}/sendPhoto"
         with open(photo_path, 'rb') as photo:
             files = {"photo": photo}
             data = {"chat_id": chat_id, "caption": caption}
@@ -63,6 +73,241 @@ def send_telegram_photo(photo_path, token, chat_id, caption="📸 Screenshot UI"
         logger.error(f"❌ Terjadi kesalahan lain saat mengirim foto Telegram: {e}")
         return False
 
+# === Antrean pengiriman Telegram (background) ===
+# Batas Telegram: ~1 pesan/detik per chat dan ~30 pesan/detik total per bot.
+TELEGRAM_QUEUE_MAXSIZE = 500
+TELEGRAM_PER_CHAT_INTERVAL = 1.0  # detik antar pesan ke chat yang sama
+TELEGRAM_GLOBAL_RATE = 30  # pesan per detik untuk semua chat
+TELEGRAM_DIGEST_WINDOW = 5.0  # detik; sinyal yang masuk dalam jendela ini digabung
+TELEGRAM_MAX_RETRIES = 3
+TELEGRAM_MESSAGE_LIMIT = 4096  # panjang maksimum teks satu pesan Telegram
+
+
+class TelegramDispatcher:
+    """Worker background yang mengirim pesan Telegram dari antrean terbatas.
+
+    Pesan untuk chat yang sama yang masuk dalam TELEGRAM_DIGEST_WINDOW detik
+    digabung menjadi satu pesan ringkasan. Pengiriman mengikuti batas per chat
+    dan global, menghormati retry_after dari respons 429, dan mencatat metrik
+    antrean (terkirim, digabung, dibuang karena antrean penuh, retry, gagal).
+    """
+
+    def __init__(self, maxsize=TELEGRAM_QUEUE_MAXSIZE, digest_window=TELEGRAM_DIGEST_WINDOW,
+                 per_chat_interval=TELEGRAM_PER_CHAT_INTERVAL, global_rate=TELEGRAM_GLOBAL_RATE,
+                 max_retries=TELEGRAM_MAX_RETRIES):
+        self.digest_window = digest_window
+        self.per_chat_interval = per_chat_interval
+        self.global_interval = 1.0 / global_rate if global_rate else 0.0
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = {}  # (token, chat_id) -> {"first_at": float, "messages": [...]}
+        self._next_chat_send = {}
+        self._next_global_send = 0.0
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._metrics = {
+            "enqueued": 0, "dropped": 0, "sent_messages": 0, "sent_requests": 0,
+            "coalesced": 0, "retries": 0, "rate_limited": 0, "failed": 0,
+            "max_queue_depth": 0,
+        }
+
+    def _count(self, field, amount=1):
+        with self._lock:
+            self._metrics[field] += amount
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telegram-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def enqueue(self, message, token, chat_id, coalesce=True, block=False, timeout=None):
+        """Masukkan pesan ke antrean. Mengembalikan False jika antrean penuh (pesan dibuang)."""
+        if not token or not chat_id:
+            return False
+        self.start()
+        item = (token, chat_id, message, coalesce, time.monotonic())
+        try:
+            self._queue.put(item, block=block, timeout=timeout)
+        except queue.Full:
+            self._count("dropped")
+            logger.warning("❌ Antrean Telegram penuh, pesan dibuang.")
+            return False
+        with self._lock:
+            self._metrics["enqueued"] += 1
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self._queue.qsize())
+        return True
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["pending_digests"] = sum(len(p["messages"]) for p in self._pending.values())
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+    def flush(self, timeout=30.0):
+        """Tunggu hingga antrean dan ringkasan tertunda habis terkirim (atau timeout)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                idle = self._queue.unfinished_tasks == 0 and not self._pending
+            if idle:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                token, chat_id, message, coalesce, queued_at = self._queue.get(timeout=0.1)
+                with self._lock:
+                    pending = self._pending.setdefault((token, chat_id), {"first_at": queued_at, "messages": []})
+                    pending["messages"].append(message)
+                    if not coalesce:
+                        pending["first_at"] = 0.0  # kirim segera
+                self._queue.task_done()
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            with self._lock:
+                ready = [key for key, p in self._pending.items()
+                         if now - p["first_at"] >= self.digest_window
+                         and now >= self._next_chat_send.get(key, 0.0)]
+            for key in ready:
+                with self._lock:
+                    messages = self._pending[key]["messages"]
+                for text, count in self._build_digest(messages):
+                    # Hanya pesan yang benar-benar terkirim yang dihitung; kegagalan tercatat di "failed".
+                    if self._deliver(key, text):
+                        self._count("sent_messages", count)
+                        if count > 1:
+                            self._count("coalesced", count - 1)
+                with self._lock:
+                    self._pending.pop(key, None)
+
+    @staticmethod
+    def _split_message(message, limit=TELEGRAM_MESSAGE_LIMIT):
+        """Potong pesan panjang di batas baris (tag HTML per baris tidak terbelah); baris > limit terpaksa dipotong."""
+        pieces, lines, size = [], [], -1
+        for line in message.split("\n"):
+            while len(line) > limit:
+                if lines:
+                    pieces.append("\n".join(lines))
+                    lines, size = [], -1
+                pieces.append(line[:limit])
+                line = line[limit:]
+            if lines and size + 1 + len(line) > limit:
+                pieces.append("\n".join(lines))
+                lines, size = [], -1
+            lines.append(line)
+            size += 1 + len(line)
+        if lines:
+            pieces.append("\n".join(lines))
+        return pieces
+
+    @staticmethod
+    def _build_digest(messages):
+        """Gabungkan pesan menjadi satu atau beberapa (teks <= TELEGRAM_MESSAGE_LIMIT karakter, jumlah pesan).
+
+        Pesan hanya dipisah di batas pesan; setiap digest membawa header dengan
+        jumlah pesan di dalamnya. Pesan tunggal yang terlalu panjang dipotong di
+        batas baris dan dihitung pada potongan terakhirnya.
+        """
+        # Ruang untuk header terpanjang yang mungkin (jumlah pesan per digest <= len(messages)).
+        budget = TELEGRAM_MESSAGE_LIMIT - len(f"📬 Ringkasan {len(messages)} sinyal:\n\n")
+        groups, current, size = [], [], 0
+        for message in messages:
+            if current and (len(message) > budget or size + 2 + len(message) > budget):
+                groups.append(current)
+                current, size = [], 0
+            size += (2 if current else 0) + len(message)
+            current.append(message)
+        if current:
+            groups.append(current)
+
+        chunks = []
+        for group in groups:
+            if len(group) > 1:
+                chunks.append((f"📬 Ringkasan {len(group)} sinyal:\n\n" + "\n\n".join(group), len(group)))
+                continue
+            pieces = TelegramDispatcher._split_message(group[0])
+            chunks.extend((piece, 0) for piece in pieces[:-1])
+            chunks.append((pieces[-1], 1))
+        return chunks
+
+    def _wait_for_slot(self, key):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            wait = max(self._next_chat_send.get(key, 0.0), self._next_global_send) - now
+            if wait <= 0:
+                self._next_chat_send[key] = now + self.per_chat_interval
+                self._next_global_send = now + self.global_interval
+                return
+            time.sleep(min(wait, 0.5))
+
+    def _deliver(self, key, text):
+        token, chat_id = key
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot(key)
+            self._count("sent_requests")
+            try:
+                with timed("telegram.send"):
+                    response = self._session.post(
+                        f"{TELEGRAM_API_URL}/bot{token}/sendMessage",
+                        json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
+                        timeout=10
+                    )
+                if response.status_code == 429:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                    self._count("rate_limited")
+                    self._next_chat_send[key] = time.monotonic() + float(retry_after)
+                    logger.warning(f"Telegram membatasi laju, coba lagi dalam {retry_after} detik.")
+                elif response.status_code >= 500:
+                    logger.warning(f"Telegram error {response.status_code}, mencoba ulang.")
+                    self._next_chat_send[key] = time.monotonic() + 2 ** attempt
+                elif response.status_code >= 400:
+                    # Error klien (token/chat salah, HTML tidak valid) tidak akan berhasil jika diulang.
+                    logger.error(f"❌ Telegram menolak pesan ({response.status_code}): {response.text[:200]}")
+                    break
+                else:
+                    return True
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"❌ Gagal mengirim pesan Telegram (percobaan {attempt + 1}): {e}")
+                self._next_chat_send[key] = time.monotonic() + 2 ** attempt
+            if attempt < self.max_retries:
+                self._count("retries")
+        self._count("failed")
+        logger.error("❌ Pesan Telegram gagal dikirim setelah beberapa percobaan.")
+        return False
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+# === get_telegram_dispatcher ===
+def get_telegram_dispatcher():
+    """Dispatcher Telegram bersama untuk seluruh proses."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = TelegramDispatcher()
+        return _dispatcher
+
+# === enqueue_telegram_message ===
+def enqueue_telegram_message(message, token, chat_id, coalesce=True):
+    """Kirim pesan lewat antrean background (tidak memblokir). False jika pesan dibuang."""
+    return get_telegram_dispatcher().enqueue(message, token, chat_id, coalesce=coalesce)
+
 # === get_current_config ===
 # Fungsi ini mungkin tidak lagi dibutuhkan jika konfigurasi dibaca di skrip utama
 # Namun, saya biarkan saja jika ada bagian lain yang menggunakannya.
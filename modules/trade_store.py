@@ -0,0 +1,166 @@
+import os
+import logging
+import threading
+import numpy as np
+
+from modules.trades import TradesSnapshot
+from modules.file_lock import exclusive_lock
+
+logger = logging.getLogger(__name__)
+
+TRADE_STORE_DIR = os.path.join("data", "trades")
+
+# Satu record fixed-width per trade; file hanya di-append (urut tid naik).
+TRADE_RECORD_DTYPE = np.dtype([
+    ("tid", "<i8"),
+    ("date", "<i8"),
+    ("price", "<f8"),
+    ("amount", "<f8"),
+    ("is_buy", "u1"),
+])
+
+
+class TradeStore:
+    """Penyimpanan trade lokal per pair dalam file kolumnar append-only.
+
+    Trade baru hanya disimpan jika tid-nya lebih besar dari tid terakhir yang
+    sudah ada, sehingga polling /trades berulang tidak menimbulkan duplikat.
+    File urut tid; date biasanya ikut urut, tetapi trade yang terlambat
+    (tid baru, date lebih lama) bisa muncul dan tetap ditangani snapshot().
+    Append dikunci dengan flock sehingga dashboard dan daemon scanner bisa
+    berbagi file store yang sama.
+    """
+
+    def __init__(self, pair, directory=TRADE_STORE_DIR):
+        self.pair = pair
+        self.path = os.path.join(directory, f"{pair}.trades")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._count = 0  # jumlah record yang sudah terbaca ke _last_tid/_max_date
+        self._last_tid, self._last_date = 0, None
+        self._max_date, self._dates_sorted = None, True
+        self._repair_tail()
+        with self._lock:
+            self._sync_locked()
+
+    def _repair_tail(self):
+        # Buang record terakhir yang terpotong (mis. proses mati saat menulis).
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f, exclusive_lock(f):
+            # Di bawah kunci: penulis di proses lain sudah selesai, ekor yang tersisa benar-benar terpotong.
+            size = os.fstat(f.fileno()).st_size
+            extra = size % TRADE_RECORD_DTYPE.itemsize
+            if extra:
+                logger.warning(f"Trade store {self.pair}: membuang {extra} byte record yang tidak lengkap.")
+                f.truncate(size - extra)
+
+    def _sync_locked(self):
+        # Baca record yang ditambahkan sejak sinkron terakhir (oleh proses ini atau proses lain).
+        count = len(self)
+        if count <= self._count:
+            return
+        added = np.memmap(self.path, dtype=TRADE_RECORD_DTYPE, mode="r", offset=self._count * TRADE_RECORD_DTYPE.itemsize,
+                          shape=(count - self._count,))
+        dates = added["date"]
+        if self._dates_sorted and ((self._max_date is not None and dates[0] < self._max_date)
+                                   or np.any(dates[1:] < dates[:-1])):
+            self._dates_sorted = False
+        self._max_date = int(dates.max()) if self._max_date is None else max(self._max_date, int(dates.max()))
+        self._last_tid = int(added["tid"][-1])
+        self._last_date = int(dates[-1])
+        self._count = count
+
+    @property
+    def last_tid(self):
+        with self._lock:
+            self._sync_locked()
+            return self._last_tid
+
+    @property
+    def last_date(self):
+        """Timestamp (detik epoch) trade terakhir yang tersimpan, None jika store kosong."""
+        with self._lock:
+            self._sync_locked()
+            return self._last_date
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // TRADE_RECORD_DTYPE.itemsize
+
+    def append_snapshot(self, snapshot):
+        """Simpan trade dari snapshot yang tid-nya belum tersimpan. Mengembalikan jumlah trade baru."""
+        with self._lock, open(self.path, "ab") as f, exclusive_lock(f):
+            # Dashboard dan daemon scanner bisa menulis store yang sama: tid terakhir dibaca ulang
+            # dari file di bawah kunci agar trade yang sudah ditulis proses lain tidak terduplikasi.
+            self._sync_locked()
+            new = snapshot.tids > self._last_tid
+            count = int(new.sum())
+            if count == 0:
+                return 0
+
+            tids = snapshot.tids[new]
+            order = np.argsort(tids, kind="stable")
+            if self._last_tid and tids[order[0]] > self._last_tid + 1:
+                logger.warning(
+                    f"Trade store {self.pair}: kemungkinan ada trade terlewat antara tid "
+                    f"{self._last_tid} dan {int(tids[order[0]])}."
+                )
+
+            records = np.empty(count, dtype=TRADE_RECORD_DTYPE)
+            records["tid"] = tids[order]
+            records["date"] = snapshot.timestamps[new][order]
+            records["price"] = snapshot.prices[new][order]
+            records["amount"] = snapshot.amounts[new][order]
+            records["is_buy"] = snapshot.is_buy[new][order]
+
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+            self._sync_locked()
+            return count
+
+    def snapshot(self, since=None, after_tid=None):
+        """TradesSnapshot dari trade tersimpan; opsional hanya date >= since (detik epoch) dan/atau tid > after_tid."""
+        with self._lock:
+            self._sync_locked()
+            count = self._count
+            dates_sorted = self._dates_sorted
+            if count == 0:
+                empty = np.empty(0)
+                return TradesSnapshot(self.pair, empty.astype(np.int64), empty, empty,
+                                      empty.astype(bool), empty.astype(np.int64))
+            records = np.memmap(self.path, dtype=TRADE_RECORD_DTYPE, mode="r", shape=(count,))
+        if after_tid is not None:
+            records = records[np.searchsorted(records["tid"], after_tid, side="right"):]
+        if since is not None:
+            if dates_sorted:
+                records = records[np.searchsorted(records["date"], since, side="left"):]
+            else:
+                # Ada trade terlambat: maksimum berjalan date tetap urut, lalu saring sisanya.
+                start = np.searchsorted(np.maximum.accumulate(records["date"]), since, side="left")
+                records = records[start:]
+                records = records[records["date"] >= since]
+        return TradesSnapshot(
+            self.pair,
+            np.asarray(records["date"]),
+            np.asarray(records["price"]),
+            np.asarray(records["amount"]),
+            np.asarray(records["is_buy"]).astype(bool),
+            np.asarray(records["tid"]),
+        )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+# Fungsi untuk mendapatkan TradeStore bersama untuk satu pair
+def get_trade_store(pair, directory=TRADE_STORE_DIR):
+    key = (directory, pair)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = TradeStore(pair, directory)
+            _stores[key] = store
+        return store
@@ -0,0 +1,110 @@
+import re
+import logging
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+# Alias frekuensi yang sudah deprecated di pandas 2.2 (FutureWarning) -> alias barunya.
+_DEPRECATED_FREQ_ALIASES = {'H': 'h', 'T': 'min', 'S': 's', 'L': 'ms', 'U': 'us', 'N': 'ns'}
+_FREQ_PATTERN = re.compile(r'^(\d*)([A-Za-z]+)$')
+
+
+# Fungsi untuk menormalkan alias timeframe lama ('1H', '15T') ke alias pandas terbaru ('1h', '15min').
+def normalize_timeframe(tf):
+    match = _FREQ_PATTERN.match(str(tf).strip())
+    if not match:
+        return tf
+    count, unit = match.groups()
+    return f"{count}{_DEPRECATED_FREQ_ALIASES.get(unit, unit)}"
+
+
+# Fungsi untuk mengubah timeframe ('5min', '1H', '1D', ...) menjadi detik.
+# Mengembalikan None untuk timeframe yang panjangnya tidak tetap (mis. bulanan).
+def timeframe_seconds(tf):
+    try:
+        return int(to_offset(normalize_timeframe(tf)).nanos // 1_000_000_000)
+    except ValueError:
+        return None
+
+
+class TradesSnapshot:
+    """Data trades satu pair yang di-parse sekali ke array kolumnar (urut waktu naik).
+
+    Dipakai bersama untuk membangun OHLCV di timeframe apa pun dan agregat
+    volume buy/sell tanpa mengunduh atau mem-parse ulang payload /trades.
+    """
+
+    def __init__(self, pair, timestamps, prices, amounts, is_buy, tids):
+        order = np.lexsort((tids, timestamps))
+        self.pair = pair
+        self.timestamps = np.ascontiguousarray(timestamps[order], dtype=np.int64)
+        self.prices = np.ascontiguousarray(prices[order], dtype=np.float64)
+        self.amounts = np.ascontiguousarray(amounts[order], dtype=np.float64)
+        self.is_buy = np.ascontiguousarray(is_buy[order], dtype=bool)
+        self.tids = np.ascontiguousarray(tids[order], dtype=np.int64)
+
+    @classmethod
+    def from_json(cls, pair, trades):
+        """Bangun snapshot dari list JSON endpoint /api/{pair}/trades."""
+        n = len(trades)
+        timestamps = np.fromiter((int(t["date"]) for t in trades), dtype=np.int64, count=n)
+        prices = np.fromiter((float(t["price"]) for t in trades), dtype=np.float64, count=n)
+        amounts = np.fromiter((float(t["amount"]) for t in trades), dtype=np.float64, count=n)
+        is_buy = np.fromiter((t.get("type") == "buy" for t in trades), dtype=bool, count=n)
+        tids = np.fromiter((int(t.get("tid", 0)) for t in trades), dtype=np.int64, count=n)
+        return cls(pair, timestamps, prices, amounts, is_buy, tids)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def empty(self):
+        return len(self.timestamps) == 0
+
+    def buy_sell_volume(self):
+        """Total amount untuk trade buy dan sell."""
+        buy_volume = float(self.amounts[self.is_buy].sum())
+        sell_volume = float(self.amounts[~self.is_buy].sum())
+        return buy_volume, sell_volume
+
+    def ohlcv(self, tf='5min', limit=None):
+        """DataFrame OHLCV (kolom date, open, high, low, close, volume) untuk timeframe tf."""
+        if self.empty:
+            return pd.DataFrame()
+
+        seconds = timeframe_seconds(tf)
+        if seconds is None:
+            ohlc = self._ohlcv_resample(tf)
+        else:
+            ohlc = self._ohlcv_buckets(seconds)
+
+        if limit:
+            ohlc = ohlc.tail(limit).reset_index(drop=True)
+        return ohlc
+
+    def _ohlcv_buckets(self, seconds):
+        buckets = self.timestamps - self.timestamps % seconds
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)] - 1
+        return pd.DataFrame({
+            'date': pd.to_datetime(buckets[starts], unit='s'),
+            'open': self.prices[starts],
+            'high': np.maximum.reduceat(self.prices, starts),
+            'low': np.minimum.reduceat(self.prices, starts),
+            'close': self.prices[ends],
+            'volume': np.add.reduceat(self.amounts, starts),
+        })
+
+    def _ohlcv_resample(self, tf):
+        index = pd.to_datetime(self.timestamps, unit='s')
+        tf = normalize_timeframe(tf)
+        prices = pd.Series(self.prices, index=index)
+        ohlc = prices.resample(tf).ohlc().dropna()
+        ohlc['volume'] = pd.Series(self.amounts, index=index).resample(tf).sum()
+        ohlc.index.name = 'date'
+        return ohlc.reset_index()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul diimpor sebagai paket dari root repo (modules.*, utils.*), sama seperti saat aplikasi dijalankan.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+from modules.trades import TradesSnapshot
+from modules.trade_store import TradeStore
+from modules.candles import CandleSeries
+
+T0 = 1_700_000_000 - 1_700_000_000 % 3600  # awal jam
+
+
+def _trades(*rows):
+    return TradesSnapshot.from_json("btc_idr", [
+        {"tid": str(tid), "date": str(date), "price": str(price), "amount": str(amount), "type": "buy"}
+        for tid, date, price, amount in rows
+    ])
+
+
+def _series(tmp_path):
+    store = TradeStore("btc_idr", str(tmp_path / "trades"))
+    return store, CandleSeries("btc_idr", store, str(tmp_path / "candles"))
+
+
+def test_late_trade_before_last_base_bar_is_included(tmp_path):
+    store, series = _series(tmp_path)
+    store.append_snapshot(_trades(*[(i + 1, T0 + 60 * i + 5, 100.0 + i, 1.0) for i in range(10)]))
+    assert list(series.ohlcv('1min')['volume']) == [1.0] * 10
+    assert series.ohlcv('1H')['volume'].iloc[-1] == 10.0
+
+    # Trade terlambat (tid baru, date di menit pertama, sebelum bar dasar terakhir) diikuti trade normal.
+    store.append_snapshot(_trades((11, T0 + 30, 90.0, 0.5), *[(i + 12, T0 + 60 * (i + 10) + 5, 110.0, 1.0) for i in range(9)]))
+    minutes = series.ohlcv('1min')
+    assert len(minutes) == 19
+    assert minutes['volume'].iloc[0] == 1.5
+    assert minutes['low'].iloc[0] == 90.0
+    assert minutes['close'].iloc[0] == 90.0
+    assert series.ohlcv('1H')['volume'].iloc[-1] == 19.5
+
+
+def test_store_snapshot_since_with_late_trade(tmp_path):
+    store, _ = _series(tmp_path)
+    store.append_snapshot(_trades((1, T0 + 5, 100.0, 1.0), (2, T0 + 65, 110.0, 2.0)))
+    store.append_snapshot(_trades((3, T0 + 70, 105.0, 1.0), (4, T0 + 10, 95.0, 1.0)))
+    assert sorted(store.snapshot(since=T0 + 60).tids) == [2, 3]
+    assert sorted(store.snapshot(since=T0 + 6).tids) == [2, 3, 4]
+    assert list(store.snapshot(after_tid=2).tids) == [4, 3]  # urut waktu
+
+    reopened = TradeStore("btc_idr", str(tmp_path / "trades"))
+    assert sorted(reopened.snapshot(since=T0 + 6).tids) == [2, 3, 4]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from modules.charts import apply_live_bars
+
+
+def _data(bars_per_candle):
+    candles = {
+        "x": np.array([0.0, 60_000.0]),
+        "open": np.array([1.0, 2.0]),
+        "high": np.array([3.0, 4.0]),
+        "low": np.array([0.5, 1.5]),
+        "close": np.array([2.0, 3.0]),
+        "volume": np.array([5.0, 10.0]),
+    }
+    return {"n_source": 2 * bars_per_candle, "candles": candles, "lines": {}, "bars_per_candle": bars_per_candle}
+
+
+def _bar(ts, close, volume, high=None, low=None):
+    return {"ts": ts, "open": close, "high": high or close, "low": low or close, "close": close, "volume": volume}
+
+
+def test_replaces_last_candle_and_appends_newer_bar():
+    data = _data(1)
+    out = apply_live_bars(data, [_bar(60_000, 7.0, 3.0, high=9.0, low=1.0), _bar(120_000, 8.0, 1.0)])
+    assert list(out["candles"]["x"]) == [0.0, 60_000.0, 120_000.0]
+    assert list(out["candles"]["close"]) == [2.0, 7.0, 8.0]
+    assert out["candles"]["volume"][1] == 3.0
+    assert list(data["candles"]["close"]) == [2.0, 3.0]  # data asli tidak diubah
+
+
+def test_merge_mode_counts_each_live_bar_once():
+    data = _data(10)
+    # Bar terakhir riwayat lalu versi terbarunya dari feed (ts sama): hanya versi terakhir yang dihitung.
+    out = apply_live_bars(data, [_bar(120_000, 5.0, 1.0), _bar(120_000, 6.0, 1.5, high=6.5, low=0.8)])
+    candles = out["candles"]
+    assert len(candles["x"]) == 2
+    assert candles["volume"][-1] == 11.5
+    assert candles["close"][-1] == 6.0
+    assert candles["high"][-1] == 6.5
+    assert candles["low"][-1] == 0.8
+    assert data["candles"]["volume"][-1] == 10.0
+
+
+def test_merge_mode_adds_distinct_bars():
+    out = apply_live_bars(_data(10), [_bar(120_000, 5.0, 1.0), _bar(180_000, 6.0, 2.0)])
+    assert out["candles"]["volume"][-1] == 13.0
+    assert out["candles"]["close"][-1] == 6.0
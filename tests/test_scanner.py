@@ -0,0 +1,45 @@
+import time
+import threading
+
+from modules.scanner import run_concurrent_scan
+
+
+def test_hanging_pairs_do_not_stall_the_pass():
+    release = threading.Event()
+
+    def scan_pair(pair):
+        if pair.startswith("hang"):
+            release.wait(3)
+        return pair.upper()
+
+    pairs = ["hang_a", "hang_b", "hang_c", "hang_d", "btc_idr", "eth_idr"]
+    try:
+        start = time.perf_counter()
+        results, summary = run_concurrent_scan(pairs, scan_pair, max_workers=2, pair_timeout=0.5)
+        elapsed = time.perf_counter() - start
+    finally:
+        release.set()
+
+    assert elapsed < 2.0
+    assert results == {"btc_idr": "BTC_IDR", "eth_idr": "ETH_IDR"}
+    assert summary["timed_out_pairs"] == ["hang_a", "hang_b", "hang_c", "hang_d"]
+    assert all(summary["pair_latencies_s"][p] < 1.0 for p in summary["timed_out_pairs"])
+
+
+def test_failed_enqueue_unmarks_auto_scan_signal(tmp_path, monkeypatch):
+    from modules import scanner, signal_store, telegram_bot
+
+    monkeypatch.chdir(tmp_path)  # auto_scan_log.csv ditulis relatif ke direktori kerja
+    store = signal_store.SentSignalStore(str(tmp_path / "sent_signals.json"))
+    monkeypatch.setattr(signal_store, "get_signal_store", lambda: store)
+    monkeypatch.setattr(scanner, "evaluate_pair", lambda pair, tf: (["RSI Oversold (25.00)"], "2024-01-01T10:00:00"))
+    sent = []
+    monkeypatch.setattr(telegram_bot, "enqueue_telegram_message", lambda *args, **kwargs: bool(sent))
+
+    assert scanner.run_scan_pass(["btc_idr"], "token", "chat", tf="1h") == []
+    assert not store.seen("btc_idr", "1h", "RSI Oversold", "2024-01-01T10:00:00")
+
+    sent.append(True)  # antrean menerima pesan pada scan berikutnya
+    alerted = scanner.run_scan_pass(["btc_idr"], "token", "chat", tf="1h")
+    assert [item["pair"] for item in alerted] == ["btc_idr"]
+    assert store.seen("btc_idr", "1h", "RSI Oversold", "2024-01-01T10:00:00")
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from modules.signal_engine import scan_signals
+
+
+def _indicator_frame(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+        'macd': rng.normal(0, 1, n), 'macd_signal': rng.normal(0, 1, n),
+        'volume_spike': (rng.random(n) < 0.3).astype(int), 'rsi': rng.uniform(10, 90, n),
+        'bb_upper': close * rng.uniform(0.97, 1.03, n), 'bb_lower': close * rng.uniform(0.95, 1.0, n),
+    })
+
+
+def test_last_bar_only_matches_full_scan():
+    df = _indicator_frame()
+    full = scan_signals("btc_idr", df)
+    last = scan_signals("btc_idr", df, last_bar_only=True)
+    assert len(last) == 1
+    assert last.index[-1] == full.index[-1]
+    assert last['signal_flags'].iloc[-1] == full['signal_flags'].iloc[-1]
+    assert last['macd_signal_label'].iloc[-1] == full['macd_signal_label'].iloc[-1]
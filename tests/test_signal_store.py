@@ -0,0 +1,57 @@
+import json
+
+from modules import signal_store
+from modules.signal_store import SentSignalStore
+
+
+class _Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _store(tmp_path, monkeypatch, ttl=60):
+    clock = _Clock()
+    monkeypatch.setattr(signal_store.time, "time", clock)
+    return SentSignalStore(str(tmp_path / "sent_signals.json"), ttl=ttl), clock
+
+
+def test_entry_expires_after_ttl(tmp_path, monkeypatch):
+    store, clock = _store(tmp_path, monkeypatch)
+    assert store.check_and_mark("btc_idr", "1h", "RSI Overbought", "2024-01-01T10:00:00")
+    assert not store.check_and_mark("btc_idr", "1h", "RSI Overbought", "2024-01-01T10:00:00")
+    clock.now += 61
+    assert not store.seen("btc_idr", "1h", "RSI Overbought", "2024-01-01T10:00:00")
+    assert store.check_and_mark("btc_idr", "1h", "RSI Overbought", "2024-01-01T10:00:00")
+
+
+def test_save_load_round_trip(tmp_path, monkeypatch):
+    store, clock = _store(tmp_path, monkeypatch)
+    store.check_and_mark("btc_idr", "1h", "MACD Bullish Crossover", "2024-01-01T10:00:00")
+    clock.now += 30
+    store.check_and_mark("eth_idr", "15min", "RSI Oversold", "2024-01-01T10:15:00")
+
+    reloaded = SentSignalStore(store.path, ttl=60)
+    assert len(reloaded) == 2
+    assert reloaded.seen("BTC_IDR", "1h", "MACD Bullish Crossover", "2024-01-01T10:00:00")
+    assert not reloaded.seen("btc_idr", "4h", "MACD Bullish Crossover", "2024-01-01T10:00:00")
+
+    clock.now += 40  # entri pertama kedaluwarsa, yang kedua belum
+    assert len(SentSignalStore(store.path, ttl=60)) == 1
+
+
+def test_unmark_allows_resend(tmp_path, monkeypatch):
+    store, _ = _store(tmp_path, monkeypatch)
+    store.check_and_mark("btc_idr", "1h", "RSI Oversold", "2024-01-01T10:00:00")
+    store.unmark("btc_idr", "1h", "RSI Oversold", "2024-01-01T10:00:00")
+    assert len(SentSignalStore(store.path, ttl=60)) == 0
+    assert store.check_and_mark("btc_idr", "1h", "RSI Oversold", "2024-01-01T10:00:00")
+
+
+def test_legacy_format_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "sent_signals.json"
+    path.write_text(json.dumps({"BTC_IDR": {"signal": "RSI Oversold", "time": "2023-11-14T22:13:20"}}))
+    store, _ = _store(tmp_path, monkeypatch)
+    assert len(store) == 0
@@ -0,0 +1,63 @@
+from modules.telegram_bot import TelegramDispatcher
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = "{}"
+
+    def json(self):
+        return {"ok": self.status_code == 200}
+
+
+class _Session:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.posts = []
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(json)
+        return _Response(self.status_code)
+
+
+def _run_dispatcher(status_code, n_messages=3):
+    dispatcher = TelegramDispatcher(digest_window=0.2, per_chat_interval=0, global_rate=0, max_retries=0)
+    dispatcher._session = _Session(status_code)
+    for i in range(n_messages):
+        assert dispatcher.enqueue(f"sinyal {i}", "token", "chat")
+    assert dispatcher.flush(timeout=5)
+    dispatcher.stop()
+    return dispatcher.stats(), dispatcher._session
+
+
+def test_counts_sent_and_coalesced_messages_on_success():
+    stats, session = _run_dispatcher(200)
+    assert len(session.posts) == 1
+    assert stats["sent_messages"] == 3
+    assert stats["coalesced"] == 2
+    assert stats["failed"] == 0
+
+
+def test_failed_delivery_is_not_counted_as_sent():
+    stats, session = _run_dispatcher(400)
+    assert len(session.posts) == 1
+    assert stats["sent_messages"] == 0
+    assert stats["coalesced"] == 0
+    assert stats["failed"] == 1
+
+
+def test_digest_chunks_carry_message_counts():
+    chunks = TelegramDispatcher._build_digest(["a" * 3500, "b" * 1000, "c" * 1000, "d"])
+    assert [count for _, count in chunks] == [1, 3]
+    assert chunks[0][0] == "a" * 3500
+    assert chunks[1][0] == "📬 Ringkasan 3 sinyal:\n\n" + "\n\n".join(["b" * 1000, "c" * 1000, "d"])
+    assert all(len(text) <= 4096 for text, _ in chunks)
+
+
+def test_long_message_is_split_on_line_boundaries():
+    lines = [f"<b>Pair {i}</b>: " + "x" * 80 for i in range(100)]
+    chunks = TelegramDispatcher._build_digest(["\n".join(lines)])
+    assert len(chunks) > 1
+    assert [count for _, count in chunks] == [0] * (len(chunks) - 1) + [1]
+    assert all(len(text) <= 4096 for text, _ in chunks)
+    assert [line for text, _ in chunks for line in text.split("\n")] == lines
@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+
+from modules.trades import TradesSnapshot
+from modules.trade_store import TradeStore
+from modules.candle_archive import CandleArchive, CANDLE_RECORD_DTYPE
+
+T0 = 1_700_000_000
+
+
+def _trades(tids):
+    return TradesSnapshot.from_json("btc_idr", [
+        {"tid": str(tid), "date": str(T0 + tid), "price": "100", "amount": "1", "type": "buy"}
+        for tid in tids
+    ])
+
+
+def _bars(*timestamps):
+    records = np.zeros(len(timestamps), dtype=CANDLE_RECORD_DTYPE)
+    records["ts"] = timestamps
+    records["close"] = 100.0
+    return records
+
+
+def test_two_stores_on_same_file_do_not_duplicate(tmp_path):
+    # Seperti dashboard dan daemon scanner: dua instance, masing-masing dengan tid terakhir di memori.
+    dashboard = TradeStore("btc_idr", str(tmp_path))
+    daemon = TradeStore("btc_idr", str(tmp_path))
+    assert dashboard.append_snapshot(_trades([1, 2, 3])) == 3
+    assert daemon.append_snapshot(_trades([1, 2, 3, 4, 5])) == 2
+    assert dashboard.append_snapshot(_trades([3, 4, 5])) == 0
+    assert list(dashboard.snapshot().tids) == [1, 2, 3, 4, 5]
+    assert dashboard.last_tid == 5
+
+
+def test_concurrent_appends_from_two_stores(tmp_path):
+    stores = [TradeStore("btc_idr", str(tmp_path)) for _ in range(2)]
+
+    def poll(store):
+        # Jendela /trades yang bergeser dan saling tumpang tindih antar penulis.
+        for end in range(10, 210, 10):
+            store.append_snapshot(_trades(range(max(1, end - 30), end + 1)))
+
+    threads = [threading.Thread(target=poll, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert list(TradeStore("btc_idr", str(tmp_path)).snapshot().tids) == list(range(1, 201))
+
+
+def test_two_archives_write_from_file_position(tmp_path):
+    first = CandleArchive("btc_idr", 60, str(tmp_path))
+    second = CandleArchive("btc_idr", 60, str(tmp_path))
+    first.write_from(_bars(0, 60, 120))
+    second.write_from(_bars(120, 180))
+    assert list(first.read()["ts"]) == [0, 60, 120, 180]
+
+
+def test_archive_shrink_keeps_file_size(tmp_path):
+    archive = CandleArchive("btc_idr", 60, str(tmp_path))
+    archive.write_from(_bars(0, 60, 120, 180, 240))
+    view = archive.read()
+    size = (tmp_path / "btc_idr" / "60s.candles").stat().st_size
+
+    archive.write_from(_bars(120))
+    assert (tmp_path / "btc_idr" / "60s.candles").stat().st_size == size
+    assert len(view) == 5 and view["ts"][1] == 60  # view lama tetap bisa dibaca
+    assert list(archive.read()["ts"]) == [0, 60, 120]
+    assert len(CandleArchive("btc_idr", 60, str(tmp_path))) == 3
+
+    archive.write_from(_bars(120, 180))
+    assert list(CandleArchive("btc_idr", 60, str(tmp_path)).read()["ts"]) == [0, 60, 120, 180]
@@ -0,0 +1,19 @@
+import warnings
+
+import pytest
+
+from modules.trades import timeframe_seconds, normalize_timeframe
+
+
+@pytest.mark.parametrize("tf, seconds", [("1H", 3600), ("4h", 14400), ("15T", 900), ("15min", 900), ("30S", 30), ("1D", 86400)])
+def test_timeframe_seconds_without_deprecated_aliases(tf, seconds):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        assert timeframe_seconds(tf) == seconds
+
+
+def test_normalize_timeframe_keeps_other_units():
+    assert normalize_timeframe("1H") == "1h"
+    assert normalize_timeframe("5T") == "5min"
+    assert normalize_timeframe("1D") == "1D"
+    assert normalize_timeframe("1W") == "1W"
@@ -1,46 +1,347 @@
+import numpy as np
 import pandas as pd
 import logging
+import threading
+
+from utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
-def get_top_movers(tickers):
+# Ranking top movers: nama -> (kolom metrik, urut menurun)
+TOP_MOVER_RANKINGS = {
+    'gainers': ('change', True),
+    'losers': ('change', False),
+    'volume': ('vol_idr', True),
+    'spread': ('spread_pct', True),
+    'spike': ('spike_pct', True),
+}
+DEFAULT_TOP_K = 10
+
+
+def _tickers_frame(tickers):
+    """DataFrame ticker numerik plus metrik turunan spread_pct dan spike_pct."""
+    df = pd.DataFrame.from_dict(tickers, orient='index')
+    if df.empty:
+        return df
+
+    required_columns = ['last', 'change', 'vol_idr']
+    if not all(col in df.columns for col in required_columns):
+        logger.error(f"Kolom yang diperlukan tidak ada: {required_columns}. Kolom yang tersedia: {df.columns.tolist()}")
+        return pd.DataFrame()
+
+    for col in ['last', 'change', 'vol_idr', 'buy', 'sell', 'high', 'low']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Filter NaN values
+    df = df.dropna(subset=required_columns)
+    df['spread_pct'] = _spread_pct(df.get('buy'), df.get('sell'), len(df))
+    df['spike_pct'] = _spike_pct(df.get('high'), df.get('low'), len(df))
+    return df
+
+
+def _spread_pct(buy, sell, n):
+    if buy is None or sell is None:
+        return np.full(n, np.nan)
+    buy, sell = np.asarray(buy, dtype=np.float64), np.asarray(sell, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(sell > 0, (sell - buy) / sell * 100, np.nan)
+
+
+def _spike_pct(high, low, n):
+    if high is None or low is None:
+        return np.full(n, np.nan)
+    high, low = np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(low > 0, (high - low) / low * 100, np.nan)
+
+
+def _top_k_positions(values, k, descending=True):
+    """Posisi k nilai teratas (urut) memakai argpartition, NaN diabaikan."""
+    scores = values if descending else -values
+    valid = np.flatnonzero(~np.isnan(scores))
+    if len(valid) == 0 or k <= 0:
+        return valid[:0]
+    if len(valid) > k:
+        part = np.argpartition(-scores[valid], k - 1)[:k]
+        valid = valid[part]
+    return valid[np.argsort(-scores[valid], kind='stable')]
+
+
+def rank_top_movers(tickers, k=DEFAULT_TOP_K, rankings=('gainers', 'losers', 'volume')):
+    """Top-k pair untuk setiap ranking (lihat TOP_MOVER_RANKINGS) dari satu DataFrame ticker.
+
+    Mengembalikan dict nama ranking -> DataFrame. Tabel ticker dibangun sekali,
+    lalu setiap ranking memakai seleksi parsial (argpartition), bukan sort penuh.
+    """
+    df = _tickers_frame(tickers) if tickers else pd.DataFrame()
+    if df.empty:
+        return {name: pd.DataFrame() for name in rankings}
+
+    result = {}
+    for name in rankings:
+        column, descending = TOP_MOVER_RANKINGS[name]
+        positions = _top_k_positions(df[column].to_numpy(dtype=np.float64), k, descending)
+        result[name] = df.iloc[positions]
+    return result
+
+
+@timed("market.top_movers")
+def get_top_movers(tickers, k=DEFAULT_TOP_K):
     """Ambil top gainers, top losers dan top volume movers."""
     try:
         if not tickers:
             logger.warning("Data tickers kosong")
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-        df = pd.DataFrame.from_dict(tickers, orient='index')
+        ranked = rank_top_movers(tickers, k=k)
+        return ranked['gainers'], ranked['losers'], ranked['volume']
 
-        if df.empty:
-            logger.warning("DataFrame tickers kosong")
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    except Exception as e:
+        logger.error(f"Error dalam get_top_movers: {str(e)}", exc_info=True)
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-        required_columns = ['last', 'change', 'vol_idr']
-        if not all(col in df.columns for col in required_columns):
-            logger.error(f"Kolom yang diperlukan tidak ada: {required_columns}. Kolom yang tersedia: {df.columns.tolist()}")
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-        # Konversi tipe data
-        df['last'] = pd.to_numeric(df['last'], errors='coerce')
-        df['change'] = pd.to_numeric(df['change'], errors='coerce')
-        df['vol_idr'] = pd.to_numeric(df['vol_idr'], errors='coerce')
+class RollingTopMovers:
+    """Ranking top movers yang diperbarui bertahap setiap snapshot ticker masuk.
+
+    Nilai metrik disimpan dalam array per pair. Snapshot baru hanya menulis
+    pair yang berubah, dan ranking dihitung ulang hanya jika perubahan itu bisa
+    memengaruhi top-k (pair sudah ada di top-k atau nilainya melewati batas ke-k).
+    """
 
-        # Filter NaN values
-        df = df.dropna(subset=['last', 'change', 'vol_idr'])
+    METRICS = ['last', 'change', 'vol_idr', 'spread_pct', 'spike_pct']
 
-        # Top gainers (nilai 'change' terbesar)
-        top_gainers = df.sort_values(by='change', ascending=False).head(10)
+    def __init__(self, k=DEFAULT_TOP_K, rankings=tuple(TOP_MOVER_RANKINGS)):
+        self.k = k
+        self.rankings = tuple(rankings)
+        self._index = {}
+        self._pairs = []
+        self._values = {m: np.empty(0) for m in self.METRICS}
+        self._top = {name: np.empty(0, dtype=np.int64) for name in self.rankings}
+        self._dirty = set(self.rankings)
+        self._lock = threading.Lock()
 
-        # Top losers (nilai 'change' terkecil)
-        top_losers = df.sort_values(by='change').head(10)
+    def _metric_rows(self, infos):
+        def column(key):
+            return np.array([float(info[key]) if key in info else np.nan for info in infos], dtype=np.float64)
+        n = len(infos)
+        return {
+            'last': column('last'),
+            'change': column('change'),
+            'vol_idr': column('vol_idr'),
+            'spread_pct': _spread_pct(column('buy'), column('sell'), n),
+            'spike_pct': _spike_pct(column('high'), column('low'), n),
+        }
+
+    def update(self, tickers):
+        """Masukkan snapshot ticker baru (format fetch_all_tickers)."""
+        with self._lock:
+            new_pairs = [p for p in tickers if p not in self._index]
+            if new_pairs:
+                for p in new_pairs:
+                    self._index[p] = len(self._pairs)
+                    self._pairs.append(p)
+                for m in self.METRICS:
+                    self._values[m] = np.concatenate([self._values[m], np.full(len(new_pairs), np.nan)])
+                self._dirty.update(self.rankings)
+
+            # Pair yang hilang dari snapshot dikeluarkan dari ranking.
+            missing = [self._index[p] for p in self._pairs if p not in tickers]
+            pairs = list(tickers)
+            rows = np.fromiter((self._index[p] for p in pairs), dtype=np.int64, count=len(pairs))
+            fresh = self._metric_rows([tickers[p] for p in pairs])
+            if missing:
+                rows = np.concatenate([rows, np.asarray(missing, dtype=np.int64)])
+                for m in self.METRICS:
+                    fresh[m] = np.concatenate([fresh[m], np.full(len(missing), np.nan)])
+
+            for m in self.METRICS:
+                old = self._values[m][rows]
+                changed = ~((old == fresh[m]) | (np.isnan(old) & np.isnan(fresh[m])))
+                if not changed.any():
+                    continue
+                changed_rows = rows[changed]
+                self._values[m][changed_rows] = fresh[m][changed]
+                for name in self.rankings:
+                    if name not in self._dirty and TOP_MOVER_RANKINGS[name][0] == m:
+                        if self._affects_top(name, changed_rows):
+                            self._dirty.add(name)
+
+    def _affects_top(self, name, changed_rows):
+        top = self._top[name]
+        if len(top) < self.k or np.isin(changed_rows, top).any():
+            return True
+        column, descending = TOP_MOVER_RANKINGS[name]
+        scores = self._values[column] if descending else -self._values[column]
+        threshold = scores[top[-1]]
+        return bool((scores[changed_rows] > threshold).any())
+
+    def top(self, name):
+        """DataFrame top-k untuk satu ranking (index = pair)."""
+        with self._lock:
+            if name in self._dirty:
+                column, descending = TOP_MOVER_RANKINGS[name]
+                self._top[name] = _top_k_positions(self._values[column], self.k, descending)
+                self._dirty.discard(name)
+            positions = self._top[name]
+            return pd.DataFrame(
+                {m: self._values[m][positions] for m in self.METRICS},
+                index=pd.Index([self._pairs[i] for i in positions], name='Pair'),
+            )
+
+
+def format_price(price, pair_symbol):
+    """Format harga sesuai mata uang quote pair (USD/USDT/USDC, IDR, lainnya)."""
+    try:
+        price = float(price)
+        pair_symbol = str(pair_symbol).lower()
+        if any(currency in pair_symbol for currency in ["usdt", "usdc", "usd"]):
+            return f"{price:,.8f}"
+        elif "idr" in pair_symbol:
+            return f"{price:,.0f}" if price >= 1 else f"{price:,.6f}"
+        else:
+            return f"{price:,.2f}"
+    except (ValueError, TypeError):
+        return str(price)
 
-        # Top volume movers (volume terbesar)
-        top_volume = df.sort_values(by='vol_idr', ascending=False).head(10)
 
-        logger.info(f"Kolom top_gainers sebelum return: {top_gainers.columns.tolist()}")
-        return top_gainers, top_losers, top_volume
+# Ambang sinyal pasar: buy > sell * 1.2 -> STRONG BUY, sell > buy * 1.2 -> STRONG SELL
+MARKET_SIGNAL_STRONG_RATIO = 1.2
+
+MARKET_TABLE_COLUMNS = ['Harga', 'Volume IDR (24j)', 'Volume Buy', 'Volume Sell',
+                        'Rasio B/S', 'Sinyal Pasar', 'Saran Posisi', 'Spike (%)']
+
+
+def generate_market_signal(buy_vol, sell_vol):
+    """Sinyal pasar dari perbandingan buy dan sell untuk satu pair."""
+    if buy_vol > sell_vol * MARKET_SIGNAL_STRONG_RATIO: return "STRONG BUY"
+    if buy_vol > sell_vol: return "BUY"
+    if buy_vol == sell_vol: return "HOLD"
+    if sell_vol > buy_vol * MARKET_SIGNAL_STRONG_RATIO: return "STRONG SELL"
+    return "SELL"
+
+
+def get_position_suggestion(signal):
+    """Saran posisi untuk sinyal pasar."""
+    if signal in ["STRONG BUY", "BUY"]: return "Pertimbangkan LONG"
+    if signal in ["STRONG SELL", "SELL"]: return "Pertimbangkan SHORT"
+    return "-"
+
+
+def _format_prices(prices, pairs):
+    """Versi format_price per kolom: format dipilih dengan mask, bukan per baris."""
+    pairs = pairs.str.lower()
+    is_usd = pairs.str.contains("usd").to_numpy()
+    is_idr = pairs.str.contains("idr").to_numpy() & ~is_usd
+    formats = np.select(
+        [is_usd, is_idr & (prices >= 1), is_idr],
+        ["{:,.8f}", "{:,.0f}", "{:,.6f}"],
+        default="{:,.2f}"
+    )
+    return [fmt.format(p) for fmt, p in zip(formats, prices)]
+
+
+def _tickers_fingerprint(tickers):
+    return hash(tuple(
+        (pair, info.get('last'), info.get('buy'), info.get('sell'),
+         info.get('vol_idr'), info.get('high'), info.get('low'))
+        for pair, info in tickers.items()
+    ))
+
+
+_market_table_cache = {"key": None, "table": None}
+_market_table_lock = threading.Lock()
+
+
+@timed("market.table")
+def build_market_table(tickers):
+    """Bangun tabel 'Deteksi Pasar Global' yang sudah diformat dari data fetch_all_tickers.
+
+    Klasifikasi sinyal, saran posisi dan spike dihitung dengan mask NumPy.
+    Hasil terakhir di-cache berdasarkan isi snapshot ticker, sehingga rerun
+    dengan data yang sama langsung memakai tabel yang sudah jadi.
+    """
+    try:
+        if not tickers:
+            logger.warning("Data tickers kosong")
+            return pd.DataFrame(columns=MARKET_TABLE_COLUMNS)
+
+        key = _tickers_fingerprint(tickers)
+        with _market_table_lock:
+            if _market_table_cache["key"] == key:
+                return _market_table_cache["table"]
+
+        df = pd.DataFrame.from_dict(tickers, orient='index')
+        df.index.name = 'Pair'
+        for col in ['last', 'buy', 'sell', 'vol_idr', 'high', 'low']:
+            if col not in df.columns:
+                logger.warning(f"Kolom '{col}' tidak ditemukan di data ticker. Ditambahkan dengan nilai default 0.")
+                df[col] = 0
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+        df = df.sort_values(by='vol_idr', ascending=False)
+        buy = df['buy'].to_numpy(dtype=np.float64)
+        sell = df['sell'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+
+        ratio = np.select([buy > sell, sell > buy], ["Demand > Supply", "Supply > Demand"], default="Seimbang")
+        signal = np.select(
+            [buy > sell * MARKET_SIGNAL_STRONG_RATIO, buy > sell, buy == sell, sell > buy * MARKET_SIGNAL_STRONG_RATIO],
+            ["STRONG BUY", "BUY", "HOLD", "STRONG SELL"],
+            default="SELL"
+        )
+        position = np.select(
+            [np.isin(signal, ["STRONG BUY", "BUY"]), np.isin(signal, ["STRONG SELL", "SELL"])],
+            ["Pertimbangkan LONG", "Pertimbangkan SHORT"],
+            default="-"
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spike = np.where(low > 0, (high - low) / low * 100, 0.0)
+
+        table = pd.DataFrame({
+            'Harga': _format_prices(df['last'].to_numpy(dtype=np.float64), df.index.to_series()),
+            'Volume IDR (24j)': [f"{x:,.0f} IDR" for x in df['vol_idr'].to_numpy()],
+            'Volume Buy': [f"{x:,.0f}" for x in buy],
+            'Volume Sell': [f"{x:,.0f}" for x in sell],
+            'Rasio B/S': ratio,
+            'Sinyal Pasar': signal,
+            'Saran Posisi': position,
+            'Spike (%)': [f"{x:.2f}%" for x in spike],
+        }, index=df.index)
+
+        with _market_table_lock:
+            _market_table_cache["key"] = key
+            _market_table_cache["table"] = table
+        return table
 
     except Exception as e:
-        logger.error(f"Error dalam get_top_movers: {str(e)}", exc_info=True)
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
\ No newline at end of file
+        logger.error(f"Error dalam build_market_table: {str(e)}", exc_info=True)
+        return pd.DataFrame(columns=MARKET_TABLE_COLUMNS)
+
+
+SIGNAL_COLUMN_STYLES = {
+    "STRONG BUY": "background-color: green; color: white",
+    "BUY": "background-color: lightgreen; color: black",
+    "HOLD": "background-color: gray; color: white",
+    "SELL": "background-color: orange; color: black",
+    "STRONG SELL": "background-color: red; color: white",
+}
+
+
+def style_signal_column(val):
+    """CSS sel kolom 'Sinyal Pasar' sesuai sinyalnya."""
+    return SIGNAL_COLUMN_STYLES.get(val, "")
+
+
+def style_market_table(df_market):
+    """Styler tabel 'Deteksi Pasar Global' seperti yang ditampilkan dashboard (dipakai juga oleh benchmark)."""
+    styler = df_market[MARKET_TABLE_COLUMNS].style
+    # Styler.map menggantikan applymap sejak pandas 2.1.
+    map_cells = styler.map if hasattr(styler, "map") else styler.applymap
+    return map_cells(style_signal_column, subset=['Sinyal Pasar']) \
+        .set_properties(**{'text-align': 'right'}, subset=['Harga', 'Volume IDR (24j)', 'Volume Buy', 'Volume Sell', 'Spike (%)']) \
+        .set_properties(**{'text-align': 'left'}, subset=['Rasio B/S', 'Saran Posisi']) \
+        .set_properties(**{'text-align': 'center'}, subset=['Sinyal Pasar']) \
+        .format({'Harga': '{}', 'Volume Buy': '{}', 'Volume Sell': '{}', 'Spike (%)': '{}'})
@@ -0,0 +1,210 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import functools
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+METRICS_WINDOW = 1024  # jumlah sampel terakhir per stage untuk persentil
+METRIC_PREFIX = "readonetrade"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _percentiles(samples, quantiles=QUANTILES):
+    # Persentil interpolasi linear (sama dengan np.percentile) tanpa mengimpor NumPy.
+    ordered = sorted(samples)
+    if not ordered:
+        return [0.0 for _ in quantiles]
+    values = []
+    for q in quantiles:
+        pos = (len(ordered) - 1) * q
+        lower = int(pos)
+        upper = min(lower + 1, len(ordered) - 1)
+        values.append(ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower))
+    return values
+
+
+class _StageStats:
+    __slots__ = ("samples", "count", "total", "errors", "max")
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.max = 0.0
+
+
+class MetricsRegistry:
+    """Registry durasi per stage (API, indikator, sinyal, Telegram, UI).
+
+    Menyimpan jumlah, total dan `window` sampel terakhir per stage sehingga
+    p50/p95/p99 bisa dihitung kapan saja dengan memori tetap.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=False):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats(self.window)
+            stats.samples.append(seconds)
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            if error:
+                stats.errors += 1
+
+    def timed(self, stage):
+        """Decorator/context manager yang mencatat durasi blok ke `stage`."""
+        return _Timer(self, stage)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self):
+        """List dict per stage: count, error, mean, p50/p95/p99 dan max (ms), urut total waktu."""
+        with self._lock:
+            snapshot = [(stage, list(s.samples), s.count, s.total, s.errors, s.max)
+                        for stage, s in self._stages.items()]
+        rows = []
+        for stage, samples, count, total, errors, max_s in snapshot:
+            p50, p95, p99 = _percentiles(samples)
+            rows.append({
+                "stage": stage,
+                "count": count,
+                "errors": errors,
+                "total_s": round(total, 3),
+                "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+                "p50_ms": round(p50 * 1000, 2),
+                "p95_ms": round(p95 * 1000, 2),
+                "p99_ms": round(p99 * 1000, 2),
+                "max_ms": round(max_s * 1000, 2),
+            })
+        rows.sort(key=lambda r: r["total_s"], reverse=True)
+        return rows
+
+    def prometheus_text(self):
+        """Metrik dalam format teks eksposisi Prometheus (tipe summary)."""
+        name = f"{METRIC_PREFIX}_duration_seconds"
+        lines = [
+            f"# HELP {name} Durasi operasi hot path per stage.",
+            f"# TYPE {name} summary",
+        ]
+        errors = [
+            f"# HELP {METRIC_PREFIX}_errors_total Jumlah eksekusi stage yang berakhir dengan exception.",
+            f"# TYPE {METRIC_PREFIX}_errors_total counter",
+        ]
+        with self._lock:
+            snapshot = [(stage, list(s.samples), s.count, s.total, s.errors)
+                        for stage, s in sorted(self._stages.items())]
+        for stage, samples, count, total, error_count in snapshot:
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            if samples:
+                for q, value in zip(QUANTILES, _percentiles(samples)):
+                    lines.append(f'{name}{{stage="{label}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{label}"}} {total:.6f}')
+            lines.append(f'{name}_count{{stage="{label}"}} {count}')
+            errors.append(f'{METRIC_PREFIX}_errors_total{{stage="{label}"}} {error_count}')
+        return "\n".join(lines + errors) + "\n"
+
+    def write_prometheus_file(self, path):
+        """Tulis metrik ke file secara atomik (untuk node_exporter textfile collector)."""
+        directory = os.path.dirname(path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".metrics.", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Gagal menulis file metrik '{path}': {e}")
+
+
+class _Timer:
+    """Bisa dipakai sebagai `with timed(...)` maupun `@timed(...)`."""
+
+    __slots__ = ("registry", "stage", "_started")
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self._started, error=exc_type is not None)
+        return False
+
+    def __call__(self, func):
+        registry, stage = self.registry, self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                registry.observe(stage, time.perf_counter() - started, error=error)
+        return wrapper
+
+
+metrics = MetricsRegistry()
+
+
+def timed(stage):
+    """Catat durasi ke registry global, mis. `@timed("api.tickers")` atau `with timed("ui.chart"):`."""
+    return _Timer(metrics, stage)
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+# Fungsi untuk menjalankan endpoint HTTP /metrics (format Prometheus), sekali per proses
+def start_metrics_server(port, host="127.0.0.1", registry=None):
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    global _metrics_server
+    registry = registry or metrics
+    with _metrics_server_lock:
+        if _metrics_server is not None:
+            return _metrics_server
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((host, int(port)), Handler)
+        except OSError as e:
+            logger.error(f"Gagal menjalankan endpoint metrik di {host}:{port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Endpoint metrik Prometheus aktif di http://{host}:{port}/metrics")
+        _metrics_server = server
+        return server